@@ -0,0 +1,60 @@
+"""
+Semantic analysis benchmark.
+
+Usage:
+    python -m benchmarks.bench_analyzer [--lines N] [--repeat N] [--expressions]
+
+Analyzes synthetic sources of --lines lines and of two and four times as
+many, printing the time per AST node of each: with linear-time name
+resolution it stays about the same as the program grows.
+"""
+
+import gc
+import time
+from argparse import ArgumentParser
+
+from benchmarks.corpus import generate_expression_source, generate_source
+from src.analyzer import SemanticAnalyzer
+from src.lexer import Lexer
+from src.parser import ASTArena, Parser
+
+
+def bench_analyze(source: str, repeat: int) -> tuple[float, int]:
+    """Returns the best analysis time in seconds over repeat runs, and the number of AST nodes."""
+    lines = source.splitlines()
+    lexer = Lexer(filename="bench.sl", lines=lines)
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True)
+    ast = parser.parse()
+    nodes = len(ASTArena.from_ast(ast["body"]))
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best, nodes
+
+
+def main():
+    args = ArgumentParser()
+    args.add_argument("--lines", type=int, default=50_000, help="Lines of the smallest synthetic source")
+    args.add_argument("--repeat", type=int, default=3, help="Analysis runs")
+    args.add_argument("--expressions", action="store_true", help="Generate an expression-heavy source")
+    args = args.parse_args()
+
+    generate = generate_expression_source if args.expressions else generate_source
+    for scale in (1, 2, 4):
+        source = generate(args.lines * scale)
+        elapsed, nodes = bench_analyze(source, args.repeat)
+        print(
+            f"{source.count(chr(10)):>10,} lines: {elapsed:8.3f} s "
+            f"({nodes:,} nodes, {elapsed / nodes * 1e9:6.0f} ns/node)"
+        )
+
+
+if __name__ == "__main__":
+    main()
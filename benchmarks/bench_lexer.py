@@ -0,0 +1,89 @@
+"""
+Lexer throughput benchmark.
+
+Usage:
+    python -m benchmarks.bench_lexer [file.sl] [--lines N] [--repeat N] [--parallel N] [--memory]
+
+Without a file, a synthetic source of --lines lines is generated.
+"""
+
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+
+from benchmarks.corpus import generate_source
+from src.lexer import Lexer, SpanLexer, TableLexer, TokenBuffer
+
+LEXERS: dict[str, type[Lexer]] = {
+    "classic": Lexer,
+    "table": TableLexer,
+    "span": SpanLexer,
+}
+
+
+def bench_throughput(lexer_cls: type[Lexer], lines: list[str], repeat: int, parallel: int = 1) -> tuple[float, int]:
+    """Returns the best tokens/sec over repeat runs and the token count."""
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        options: dict[str, Any] = {"parallel": parallel} if parallel > 1 else {}
+        tokens = lexer_cls(filename="bench.sl", lines=lines, **options).tokenize()
+        best = min(best, time.perf_counter() - start)
+        count = len(tokens)
+    return count / best, count
+
+
+def bench_memory(lines: list[str]) -> None:
+    """Compares the memory held by a list of Token objects, a TokenBuffer and a SpanTokenBuffer."""
+    tracemalloc.start()
+    tokens = Lexer(filename="bench.sl", lines=lines).tokenize()
+    token_list_bytes = tracemalloc.get_traced_memory()[0]
+    del tokens
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    buffer = TokenBuffer.from_tokens(Lexer(filename="bench.sl").iter_tokens(lines))
+    token_buffer_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    source = "".join(line + "\n" for line in lines)
+    tracemalloc.start()
+    spans = SpanLexer(filename="bench.sl", source=source).tokenize()
+    span_buffer_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del spans
+
+    count = len(buffer)
+    print(f"{'list':>10}: {token_list_bytes / 1e6:8.1f} MB ({token_list_bytes / count:6.1f} bytes/token)")
+    print(f"{'buffer':>10}: {token_buffer_bytes / 1e6:8.1f} MB ({token_buffer_bytes / count:6.1f} bytes/token)")
+    print(f"{'spans':>10}: {span_buffer_bytes / 1e6:8.1f} MB ({span_buffer_bytes / count:6.1f} bytes/token)")
+
+
+def main():
+    args = ArgumentParser()
+    args.add_argument("file", type=Path, nargs="?", help="Sigil source to lex")
+    args.add_argument("--lines", type=int, default=200_000, help="Lines of synthetic source")
+    args.add_argument("--repeat", type=int, default=3, help="Runs per lexer")
+    args.add_argument("--parallel", type=int, default=1, help="Worker processes per lexer")
+    args.add_argument("--memory", action="store_true", help="Measure token storage instead of throughput")
+    args = args.parse_args()
+
+    source = args.file.read_text() if args.file else generate_source(args.lines)
+    lines = source.splitlines()
+    print(f"Source: {len(lines)} lines, {len(source.encode()) / 1e6:.1f} MB")
+
+    if args.memory:
+        bench_memory(lines)
+        return
+
+    for name, lexer_cls in LEXERS.items():
+        if args.parallel > 1 and lexer_cls is SpanLexer:
+            continue  # Span lexing is single-process
+        rate, count = bench_throughput(lexer_cls, lines, args.repeat, args.parallel)
+        print(f"{name:>10}: {rate:12,.0f} tokens/sec ({count} tokens)")
+
+
+if __name__ == "__main__":
+    main()
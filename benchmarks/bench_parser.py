@@ -0,0 +1,156 @@
+"""
+Parser throughput benchmark.
+
+Usage:
+    python -m benchmarks.bench_parser [file.sl] [--lines N] [--repeat N] [--expressions] [--parallel N] [--arena] [--cache] [--lazy]
+
+Tokens are produced once up front, so only parsing is timed. Without a file,
+a synthetic source of --lines lines is generated; --expressions makes it
+mostly long arithmetic and logical expressions. --parallel parses
+in worker processes, whatever the number of tokens. --arena also compares the
+memory and traversal time of the ASTNode tree with its ASTArena. --cache
+compares lexing and parsing with loading both from a CompilationCache. --lazy
+compares a full parse with a lazy one whose top-level names are indexed by the
+SemanticAnalyzer, which leaves the function bodies unparsed.
+"""
+
+import gc
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+
+from benchmarks.corpus import generate_expression_source, generate_source
+from src.analyzer import SemanticAnalyzer
+from src.cache import CacheEntry, CompilationCache
+from src.lexer import Lexer, Token, TokenBuffer
+from src.parser import ASTArena, ASTNode, ASTType, Parser
+
+
+def bench_parse(tokens: list[Token], repeat: int, parallel: int = 1) -> float:
+    """
+    Returns the best parse time in seconds over repeat runs.
+
+    Like timeit, the cyclic garbage collector is paused while timing: its
+    passes over the token list would otherwise dominate, and vary from run to run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            Parser(tokens, parallel=parallel, parallel_threshold=0).parse()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def _timed(function, *args) -> tuple[float, Any]:
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = function(*args)
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def _count_tree_identifiers(body: list[ASTNode]) -> int:
+    count, stack = 0, list(body)
+    while stack:
+        node = stack.pop()
+        count += node.type == ASTType.IDENTIFIER
+        stack.extend(node.children)
+        if isinstance(node.value, ASTNode):
+            stack.append(node.value)
+    return count
+
+
+def bench_arena(tokens: list[Token]) -> None:
+    """Prints the memory per node and the time of a full traversal of the tree and of the arena."""
+    tracemalloc.start()
+    body = Parser(tokens).parse()["body"]
+    tree_bytes = tracemalloc.get_traced_memory()[0]
+    arena = ASTArena.from_ast(body)
+    arena_bytes = tracemalloc.get_traced_memory()[0] - tree_bytes
+    tracemalloc.stop()
+    nodes = len(arena)
+    print(f"{'nodes':>10}: {nodes:,}")
+    print(f"{'tree':>10}: {tree_bytes / nodes:8.1f} bytes/node")
+    print(f"{'arena':>10}: {arena_bytes / nodes:8.1f} bytes/node ({arena.nbytes() / nodes:.1f} in columns)")
+
+    tree_time, _ = _timed(_count_tree_identifiers, body)
+    arena_time, _ = _timed(lambda: sum(1 for _ in arena.indices_of(ASTType.IDENTIFIER)))
+    print(f"{'tree walk':>10}: {tree_time:8.3f} s")
+    print(f"{'arena scan':>10}: {arena_time:8.3f} s")
+
+
+def bench_cache(lines: list[str]) -> None:
+    """Prints the time to lex and parse a source and to load its tokens and AST from the cache, and the entry size."""
+
+    def compile_source() -> CacheEntry:
+        lexer = Lexer(filename="bench.sl", lines=lines)
+        tokens = lexer.tokenize()
+        parser = Parser(tokens, lexer.constants, lexer.symbols, lean=True)
+        ast = parser.parse()
+        return CacheEntry(TokenBuffer.from_tokens(tokens), parser.constants, parser.symbols, ast)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompilationCache(directory)
+        key = cache.key("\n".join(lines).encode(), lean=True)
+        compile_time, entry = _timed(compile_source)
+        path = cache.store(key, entry)
+        if path is None:
+            print(f"{'cache':>10}: AST too deep to cache")
+            return
+        size = path.stat().st_size
+        load_time, _ = _timed(cache.load, key)
+    print(f"{'lex+parse':>10}: {compile_time:8.3f} s")
+    print(f"{'cache load':>10}: {load_time:8.3f} s ({size / len(entry.tokens):.1f} bytes/token)")
+
+
+def bench_lazy(tokens: list[Token]) -> None:
+    """Prints the time to parse every body and to parse only the signatures the analyzer indexes."""
+    eager_time, _ = _timed(lambda: Parser(tokens, lean=True).parse())
+    lazy_time, declarations = _timed(lambda: SemanticAnalyzer(Parser(tokens, lean=True, lazy=True).parse()).index())
+    print(f"{'eager':>10}: {eager_time:8.3f} s")
+    print(f"{'lazy':>10}: {lazy_time:8.3f} s ({len(declarations):,} declarations indexed)")
+
+
+def main():
+    args = ArgumentParser()
+    args.add_argument("file", type=Path, nargs="?", help="Sigil source to parse")
+    args.add_argument("--lines", type=int, default=100_000, help="Lines of synthetic source")
+    args.add_argument("--repeat", type=int, default=3, help="Parse runs")
+    args.add_argument("--expressions", action="store_true", help="Generate an expression-heavy source")
+    args.add_argument("--parallel", type=int, default=1, help="Parser worker processes")
+    args.add_argument("--arena", action="store_true", help="Compare the AST tree with its ASTArena")
+    args.add_argument("--cache", action="store_true", help="Compare lexing and parsing with a cache load")
+    args.add_argument("--lazy", action="store_true", help="Compare a full parse with a signatures-only lazy parse")
+    args = args.parse_args()
+
+    if args.file:
+        source = args.file.read_text()
+    else:
+        source = (generate_expression_source if args.expressions else generate_source)(args.lines)
+    lines = source.splitlines()
+    tokens = Lexer(filename="bench.sl", lines=lines).tokenize()
+    print(f"Source: {len(lines)} lines, {len(tokens)} tokens")
+
+    elapsed = bench_parse(tokens, args.repeat, args.parallel)
+    print(f"{'parse':>10}: {elapsed:8.3f} s ({len(tokens) / elapsed:12,.0f} tokens/sec)")
+    if args.arena:
+        bench_arena(tokens)
+    if args.cache:
+        bench_cache(lines)
+    if args.lazy:
+        bench_lazy(tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Synthetic Sigil sources used by the benchmarks."""
+
+from textwrap import dedent
+
+_FUNCTION = dedent(
+    """
+    fn compute_{n}(a: int32, b: float64) -> float64:
+        let total: float64 = (a + {n}) * b / 2.5 - 1_000
+        let ratio = total // 3 ** 2 % 7
+        if total >= 10 and ratio != 3 or not a:
+            print(`total {{total}} for {{a}}`)
+        else:
+            total = total - 1e-3
+        return total
+
+    """
+)
+
+_CLASS = dedent(
+    """
+    class Point{n}(Base):
+        pub x: float64 = 0.0
+        pub y: float64
+        static const ORIGIN: string = 'origin \\'{n}\\''
+
+        fn move(dx: float64, dy: float64) -> none:
+            self.x = self.x + dx
+            self.y = self.y + dy
+
+    """
+)
+
+
+_EXPRESSIONS = dedent(
+    """
+    fn evaluate_{n}(a: int64, b: float64, c: int64) -> bool:
+        let x = (a + {n}) * b - c / 2 ** 3 % 7 + a * (b - c) // 4 - (a + b) * (c - 1)
+        let y = x * x + 2 * x * a - b / (c + 1) - -a * 3 + add(a, b * 2, c - 1) * 0.5
+        let z = a < b and b <= c or not (x == y) and x != 0 or y >= 1 and c > 2
+        let w = a + b + c + x + y + 1 - 2 + 3 - 4 + 5 * 6 * 7 / 8 % 9 - a * b * c
+        x = z ? x + y * 2 : w - x / 3
+        return x * y + w > z and a % 2 == 0 or b - c * a < {n}
+
+    """
+)
+
+# The function the expressions call
+_ADD = "fn add(a: int64, b: float64, c: int64) -> float64:\n    return a + b + c\n"
+
+
+def generate_source(target_lines: int) -> str:
+    """Generates a source of roughly target_lines lines of Sigil code."""
+    chunks: list[str] = []
+    lines, n = 0, 0
+    while lines < target_lines:
+        chunk = (_CLASS if n % 5 == 0 else _FUNCTION).format(n=n)
+        chunks.append(chunk)
+        lines += chunk.count("\n")
+        n += 1
+    chunks.append("fn main() -> none:\n    let c = compute_1(3, 4.0)\n")
+    return "".join(chunks)
+
+
+def generate_expression_source(target_lines: int) -> str:
+    """Generates a source of roughly target_lines lines of arithmetic and logical expressions."""
+    chunks: list[str] = [_ADD]
+    lines, n = 0, 0
+    while lines < target_lines:
+        chunk = _EXPRESSIONS.format(n=n)
+        chunks.append(chunk)
+        lines += chunk.count("\n")
+        n += 1
+    chunks.append("fn main() -> none:\n    let c = evaluate_1(3, 4.0, 5)\n")
+    return "".join(chunks)
@@ -1 +1,3 @@
-from src.analyzer.analyzer import SemanticAnalyzer  # noqa
+from src.analyzer.analyzer import BUILTINS, SemanticAnalyzer, SemanticError  # noqa
+from src.analyzer.symbols import CONSTRUCTOR, Scope, ScopeKind, Symbol, SymbolKind  # noqa
+from src.analyzer.types import DEFAULT_PARAMETER_TYPE, TypeInference, common_type  # noqa
@@ -1,14 +1,278 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import Any
 
+from src.analyzer.symbols import Scope, ScopeKind, Symbol, SymbolKind
+from src.analyzer.types import TypeInference
+from src.ast_visit import SKIP, Visitor
+from src.lexer import ConstantPool, SymbolInterner
+from src.parser import ASTNode, ASTType, ASTTypeValue, member_chain
+
+# Names callable without a declaration
+BUILTINS = ("print",)
+# Declarations visible in their whole scope, so they can be used before them
+_HOISTED_KINDS: dict[str, SymbolKind] = {
+    ASTType.FUNCTION_DECLARATION: SymbolKind.FUNCTION,
+    ASTType.MAIN_DECLARATION: SymbolKind.FUNCTION,
+    ASTType.CLASS_DECLARATION: SymbolKind.CLASS,
+}
+
 
 class SemanticError(Exception): ...
 
 
-class SemanticAnalyzer:
-    def __init__(self, ast: dict[str, Any]):
+def _error(message: str, node: ASTNode | None) -> SemanticError:
+    """Returns an error about a node, located by its span when the parser recorded one."""
+    if node is not None and node.span:
+        message = f"{message} at line {node.span[0]}, column {node.span[1]}"
+    return SemanticError(message)
+
+
+class SemanticAnalyzer(Visitor):
+    """
+    Resolves every name of the program to its declaration, in a single walk.
+
+    The program, each function, method, class, block and lambda get a Scope
+    chained to the one around them. Functions and classes are declared when
+    the scope around them is entered, so they can be used before their
+    declaration; variables and parameters are visible from their declaration
+    on. Class members are reached through self rather than by their bare
+    names, so method scopes chain to the scope around their class.
+
+    Identifiers, calls and the objects of member accesses get the Symbol
+    they resolve to in ASTNode.binding, and declarations get their own, so
+    later stages never search the scopes again. TypeInference then types
+    the resolved program.
+    """
+
+    def __init__(
+        self,
+        ast: dict[str, Any],
+        constants: ConstantPool | None = None,
+        symbols: SymbolInterner | None = None,
+    ):
         self._ast = ast
+        # Decoded literal values, indexed by ASTNode.const
+        self._constants = constants if constants is not None else ConstantPool()
+        # With the parser's interner, the symbol IDs of the AST key the scopes; otherwise names are interned here
+        self._token_symbols = symbols is not None
+        self._symbols = symbols if symbols is not None else SymbolInterner()
+        self.builtins = Scope(ScopeKind.BUILTIN)
+        for name in BUILTINS:
+            self.builtins.declare(self._key(name), Symbol(name, SymbolKind.BUILTIN, self.builtins))
+        # The scope of the top-level declarations, and the innermost scope of the walk
+        self.scope = Scope(ScopeKind.PROGRAM, self.builtins)
+        self._scope = self.scope
 
     def analyze(self) -> dict[str, Any]:
-        return {}
+        """Resolves and types the whole program, and returns its top-level names with their declaration type."""
+        body = self._ast["body"]
+        self._enter_program(body)
+        self.visit_all(body)
+        TypeInference(self._ast, self._constants).infer()
+        return self._table()
+
+    def index(self) -> dict[str, Any]:
+        """
+        Declares the top-level names only, like analyze() returns them.
+
+        Function bodies and initializers are not walked, so the bodies of a
+        lazy parse stay unparsed.
+        """
+        body = self._ast["body"]
+        self._enter_program(body)
+        for node in body:
+            if node.type == ASTType.VARIABLE_DECLARATION:
+                self.leave_variable_declaration(node)
+        return self._table()
+
+    def _enter_program(self, body: list[ASTNode]) -> None:
+        self.scope = self._scope = Scope(ScopeKind.PROGRAM, self.builtins)
+        self._hoist(body)
+
+    def _table(self) -> dict[str, Any]:
+        return {symbol.name: symbol.node.type for symbol in self.scope}
+
+    # Scopes and declarations
+
+    def _key(self, name: Any, symbol: int = -1) -> int:
+        """Returns the symbol ID a name is keyed on in scopes."""
+        if self._token_symbols and symbol >= 0:
+            return symbol
+        return self._symbols.intern(str(name))
+
+    def _declare(self, name: Any, key: int, kind: SymbolKind, node: Any, at: ASTNode) -> Symbol:
+        symbol = Symbol(str(name), kind, self._scope, node)
+        if self._scope.declare(key, symbol) is not None:
+            raise _error(f"{name} is already declared in this scope", at)
+        return symbol
+
+    def _push(self, kind: ScopeKind, statements: Iterable[ASTNode] = (), parent: Scope | None = None) -> Scope:
+        """Enters a new scope, declaring the functions and classes among its statements."""
+        self._scope = Scope(kind, self._scope if parent is None else parent)
+        self._hoist(statements)
+        return self._scope
+
+    def _pop(self) -> None:
+        assert self._scope.parent is not None
+        self._scope = self._scope.parent
+
+    def _hoist(self, statements: Iterable[ASTNode]) -> None:
+        for node in statements:
+            kind = _HOISTED_KINDS.get(node.type)
+            if kind is None:
+                continue
+            if kind == SymbolKind.CLASS:
+                node.binding = self._declare(node.value, self._key(node.value, node.symbol), kind, node, node)
+            else:
+                name = node.value.name
+                node.binding = self._declare(name, self._key(name, node.value.symbol), kind, node, node)
+
+    def _declare_params(self, params: list[ASTTypeValue], node: ASTNode) -> None:
+        for param in params:
+            symbol = self._declare(param.name, self._key(param.name, param.symbol), SymbolKind.PARAMETER, param, node)
+            symbol.declared_class = self._annotated_class(param.class_name, node)
+
+    def _annotated_class(self, name: str | None, node: ASTNode, scope: Scope | None = None) -> Symbol | None:
+        """Returns the class a type annotation names, or None for annotations without a class name."""
+        if name is None:
+            return None
+        symbol = (scope or self._scope).lookup(self._key(name))
+        if symbol is None or symbol.kind != SymbolKind.CLASS:
+            raise _error(f"Unknown class {name}", node)
+        return symbol
+
+    def _resolve(self, name: Any, symbol: int, node: ASTNode) -> Symbol:
+        binding = self._scope.lookup(self._key(name, symbol))
+        if binding is None:
+            raise _error(f"Unknown name {name}", node)
+        node.binding = binding
+        return binding
+
+    # Declarations
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        symbol = node.binding
+        if symbol is None:  # Walked on its own, outside of the scope around it
+            self._hoist((node,))
+            symbol = node.binding
+        symbol.declared_class = self._annotated_class(node.value.class_name, node)
+        symbol.members = self._push(ScopeKind.FUNCTION)
+        self._declare_params(node.value.params, node)
+        self._hoist(node.children)
+
+    visit_main_declaration = visit_function_declaration
+
+    def leave_function_declaration(self, node: ASTNode) -> None:
+        self._pop()
+
+    leave_main_declaration = leave_function_declaration
+
+    def visit_class_declaration(self, node: ASTNode) -> Any:
+        if node.binding is None:
+            self._hoist((node,))
+        node.binding.members = self._push(ScopeKind.CLASS)
+        named_members = node.binding.named_members = {}
+        for member in node.children:
+            if member.type == ASTType.CLASS_ATTRIBUTE:
+                declaration, kind = member.value, SymbolKind.ATTRIBUTE
+            elif member.type == ASTType.CLASS_METHOD:
+                declaration, kind = member.value.fn, SymbolKind.METHOD
+            else:
+                continue
+            key = self._key(declaration.name, declaration.symbol)
+            member.binding = self._declare(declaration.name, key, kind, member, member)
+            named_members[member.binding.name] = member.binding
+            # Class names are looked up around the class, whose scope only holds its members
+            member.binding.declared_class = self._annotated_class(declaration.class_name, member, self._scope.parent)
+
+    def leave_class_declaration(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_class_method(self, node: ASTNode) -> Any:
+        method = node.value
+        # Like in Python, the class members are not in scope in its methods, but reached through self
+        node.binding.members = self._push(ScopeKind.FUNCTION, parent=self._scope.parent)
+        if not method.is_static:
+            self._declare("self", self._key("self"), SymbolKind.PARAMETER, None, node)
+        self._declare_params(method.fn.params, node)
+        self._hoist(node.children)
+
+    def leave_class_method(self, node: ASTNode) -> None:
+        # The scope of a method is not nested in its class scope, which stays the current one after it
+        self._scope = node.binding.scope
+
+    def leave_variable_declaration(self, node: ASTNode) -> None:
+        # Declared after its initializer is resolved, which sees the names around it
+        declaration = node.value
+        key = self._key(declaration.name, declaration.symbol)
+        node.binding = self._declare(declaration.name, key, SymbolKind.VARIABLE, node, node)
+        node.binding.declared_class = self._annotated_class(declaration.class_name, node)
+
+    def visit_lambda_expression(self, node: ASTNode) -> Any:
+        self._push(ScopeKind.LAMBDA)
+        self._declare_params(node.value.params, node)
+
+    def leave_lambda_expression(self, node: ASTNode) -> None:
+        self._pop()
+
+    # Blocks
+
+    def visit_if_statement(self, node: ASTNode) -> Any:
+        self._push(ScopeKind.BLOCK, node.children)
+
+    def leave_if_statement(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_else_if_statement(self, node: ASTNode) -> Any:
+        # Else branches are the last children of the branch before them: their block replaces its block
+        self._pop()
+        self._push(ScopeKind.BLOCK, node.children)
+
+    visit_else_statement = visit_else_if_statement
+
+    def visit_loop_statement(self, node: ASTNode) -> Any:
+        self._push(ScopeKind.BLOCK, node.children)
+
+    def leave_loop_statement(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_match_case(self, node: ASTNode) -> Any:
+        self._push(ScopeKind.BLOCK, node.children)
+
+    def leave_match_case(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_for_statement(self, node: ASTNode) -> Any:
+        iterator, iterable, *body = node.children
+        self.visit(iterable)  # Before the iterator is declared, which it cannot refer to
+        self._push(ScopeKind.BLOCK, body)
+        iterator.binding = self._declare(
+            iterator.value, self._key(iterator.value, iterator.symbol), SymbolKind.VARIABLE, iterator, iterator
+        )
+        self.visit_all(body)
+        self._pop()
+        return SKIP
+
+    # Uses
+
+    def visit_identifier(self, node: ASTNode) -> Any:
+        self._resolve(node.value, node.symbol, node)
+
+    def visit_call_expression(self, node: ASTNode) -> Any:
+        self._resolve(node.value, node.symbol, node)
+
+    def visit_class_member_access(self, node: ASTNode) -> Any:
+        # Only the object is resolved: its members depend on its type
+        self._resolve(node.value, node.symbol, node)
+        _, arguments = member_chain(node)
+        return arguments
+
+    def leave_assignment_expression(self, node: ASTNode) -> None:
+        target = node.children[0]
+        symbol = target.binding if target.type == ASTType.IDENTIFIER else None
+        if symbol is None or symbol.kind != SymbolKind.VARIABLE:
+            return
+        if symbol.node.type == ASTType.VARIABLE_DECLARATION and symbol.node.value.is_const:
+            raise _error(f"Cannot assign to constant {target.value}", node)
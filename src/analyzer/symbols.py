@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+# Name of the method a class call runs to initialize the new object
+CONSTRUCTOR = "new"
+
+
+class ScopeKind(StrEnum):
+    BUILTIN = "Builtin"
+    PROGRAM = "Program"
+    FUNCTION = "Function"
+    CLASS = "Class"
+    BLOCK = "Block"
+    LAMBDA = "Lambda"
+
+
+class SymbolKind(StrEnum):
+    BUILTIN = "Builtin"
+    VARIABLE = "Variable"
+    PARAMETER = "Parameter"
+    FUNCTION = "Function"
+    CLASS = "Class"
+    ATTRIBUTE = "Attribute"
+    METHOD = "Method"
+
+
+@dataclass(eq=False, slots=True)
+class Symbol:
+    """
+    A declared name: what it names, where it is declared and the declaration node.
+
+    Symbols compare by identity, so later stages can key their own tables
+    (e.g. the code generator's variable pointers) on the symbol an identifier
+    resolved to.
+    """
+
+    name: str
+    kind: SymbolKind
+    scope: Scope
+    # The declaration: a VariableDeclaration, FunctionDeclaration, ClassDeclaration... node, or a parameter's ASTTypeValue
+    node: Any = None
+    # The scope a function, method or class declaration opens
+    members: Scope | None = None
+    # Type of a variable, parameter or attribute, or of a function's result (a TokenAnnotationTypes, or the class
+    # Symbol of an object), once inferred
+    type: Any = None
+    # The class a name (or a function's result) is annotated with, resolved by the semantic analyzer
+    declared_class: Symbol | None = None
+    # The attributes and methods of a class by name, filled as the semantic analyzer declares them
+    named_members: dict[str, Symbol] | None = None
+
+    def parameters(self) -> list[Symbol]:
+        """The parameters of a function or method, in order."""
+        if self.members is None:
+            return []
+        return [symbol for symbol in self.members if symbol.kind == SymbolKind.PARAMETER]
+
+    def member(self, name: str) -> Symbol | None:
+        """The attribute or method of a class with a name, or None."""
+        if self.named_members is None:
+            return None
+        return self.named_members.get(name)
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.name!r}, {self.kind})"
+
+
+@dataclass(eq=False, slots=True)
+class Scope:
+    """
+    A hash table of the names declared in a program, function, class, block or lambda.
+
+    Each scope is chained to the scope enclosing it; lookup() tries the
+    scopes from the innermost out, one dict lookup each. Names are keyed on
+    their symbol ID.
+    """
+
+    kind: ScopeKind
+    parent: Scope | None = None
+    symbols: dict[int, Symbol] = field(default_factory=dict)
+
+    def declare(self, key: int, symbol: Symbol) -> Symbol | None:
+        """Adds a symbol under key, and returns the symbol already declared under it instead, if any."""
+        existing = self.symbols.setdefault(key, symbol)
+        return None if existing is symbol else existing
+
+    def lookup(self, key: int) -> Symbol | None:
+        """Returns the symbol of the innermost scope declaring key, or None."""
+        scope: Scope | None = self
+        while scope is not None:
+            symbol = scope.symbols.get(key)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
+
+    def __iter__(self) -> Iterator[Symbol]:
+        """The symbols of this scope, in declaration order."""
+        return iter(self.symbols.values())
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __repr__(self) -> str:
+        return f"Scope({self.kind}, {list(self.symbols.values())!r})"
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+from typing import Any
+
+from src.analyzer.symbols import CONSTRUCTOR, Symbol, SymbolKind
+from src.ast_visit import Visitor
+from src.lexer import ConstantPool, TokenAnnotationTypes, TokenKeyword
+from src.parser import ASTNode, ASTType, member_chain
+
+# Numeric types by rank: arithmetic converts both operands to the higher ranked one
+_NUMERIC_RANKS = {
+    TokenAnnotationTypes.BOOL: 0,
+    TokenAnnotationTypes.BYTE: 1,
+    TokenAnnotationTypes.INT8: 1,
+    TokenAnnotationTypes.INT32: 2,
+    TokenAnnotationTypes.INT64: 3,
+    TokenAnnotationTypes.FLOAT32: 4,
+    TokenAnnotationTypes.FLOAT64: 5,
+    TokenAnnotationTypes.COMPLEX: 6,
+}
+_INTEGERS = frozenset(
+    {TokenAnnotationTypes.BYTE, TokenAnnotationTypes.INT8, TokenAnnotationTypes.INT32, TokenAnnotationTypes.INT64}
+)
+_FLOATS = frozenset({TokenAnnotationTypes.FLOAT32, TokenAnnotationTypes.FLOAT64})
+# Types of decoded literal values
+_VALUE_TYPES: dict[type, TokenAnnotationTypes] = {
+    bool: TokenAnnotationTypes.BOOL,
+    int: TokenAnnotationTypes.INT64,
+    float: TokenAnnotationTypes.FLOAT64,
+    complex: TokenAnnotationTypes.COMPLEX,
+    str: TokenAnnotationTypes.STRING,
+}
+_LAYOUT = frozenset({ASTType.NEWLINE, ASTType.INDENT, ASTType.DEDENT, ASTType.EOF})
+# Annotations that leave the type to inference; names annotated with a class are typed by its Symbol instead
+_UNTYPED = (None, TokenAnnotationTypes.NONE, TokenAnnotationTypes.OBJECT)
+# Type of the parameters no annotation or call gives a type
+DEFAULT_PARAMETER_TYPE = TokenAnnotationTypes.INT64
+
+
+def common_type(left: Any, right: Any) -> Any:
+    """
+    Returns the type arithmetic converts two operand types to, or None when one is not numeric.
+
+    Complex numbers win over floats, and floats over integers, where the wider
+    integer wins; booleans count as integers, and two of them add up to an int64.
+    """
+    if left not in _NUMERIC_RANKS or right not in _NUMERIC_RANKS:
+        return None
+    if TokenAnnotationTypes.COMPLEX in (left, right):
+        return TokenAnnotationTypes.COMPLEX
+    if left in _FLOATS or right in _FLOATS:
+        return (
+            TokenAnnotationTypes.FLOAT64
+            if TokenAnnotationTypes.FLOAT64 in (left, right)
+            else TokenAnnotationTypes.FLOAT32
+        )
+    integers = [kind for kind in (left, right) if kind != TokenAnnotationTypes.BOOL]
+    return max(integers, key=_NUMERIC_RANKS.__getitem__) if integers else TokenAnnotationTypes.INT64
+
+
+def annotation(symbol: Symbol) -> Any:
+    """Returns the type annotation of a variable, parameter or attribute, or None when it has none."""
+    if symbol.declared_class is not None:
+        return symbol.declared_class
+    declaration = symbol.node
+    if symbol.kind == SymbolKind.PARAMETER and declaration is not None:
+        kind = declaration.value
+    elif symbol.kind == SymbolKind.VARIABLE and declaration.type == ASTType.VARIABLE_DECLARATION:
+        kind = declaration.value.var_type
+    elif symbol.kind == SymbolKind.ATTRIBUTE:
+        kind = declaration.value.attr_type
+    else:
+        return None
+    return None if kind in _UNTYPED else kind
+
+
+def instance_class(symbol: Symbol | None) -> Symbol | None:
+    """Returns the class whose members are reached through a name: its own for a class, its type's for an object."""
+    if symbol is None:
+        return None
+    if symbol.kind == SymbolKind.CLASS:
+        return symbol
+    kind = symbol.type
+    return kind if isinstance(kind, Symbol) and kind.kind == SymbolKind.CLASS else None
+
+
+def _join(current: Any, new: Any) -> Any:
+    """Widens the type of a variable to hold a new value; a value of another kind leaves it unchanged."""
+    if current is None or current == new:
+        return new if current is None else current
+    return common_type(current, new) or current
+
+
+class TypeInference(Visitor):
+    """
+    Infers the type of every expression, variable and parameter of a resolved program.
+
+    Types are TokenAnnotationTypes. Annotated variables and parameters keep
+    their annotation; the others take the type of every value stored in them,
+    widened like arithmetic would (an int64 variable that is later assigned a
+    float64 becomes a float64), and parameters the types of the arguments of
+    every call. Since a wider variable can widen the expressions that used
+    it before, the program is walked again until no symbol widens after
+    being read: types only grow, so this takes a few walks, and a single one
+    for programs whose variables keep the type of their initializer.
+    Parameters still without a type are int64.
+
+    Objects are typed by the Symbol of their class: a class call creates one,
+    self is one in its class's methods, and names and functions annotated
+    with a class name have the class the analyzer resolved it to. The
+    members of an object, whose class is only known once it is typed, are
+    resolved here: the member node of a member access gets the attribute or
+    method Symbol in ASTNode.binding.
+
+    Each expression gets its type in ASTNode.static_type, or None when it is
+    unknown (e.g. a chain of member accesses), and each symbol in Symbol.type.
+    """
+
+    def __init__(self, ast: dict[str, Any], constants: ConstantPool | None = None):
+        self._ast = ast
+        self._constants = constants if constants is not None else ConstantPool()
+        self._changed = False
+        # Symbols whose type was read during the current walk
+        self._read: set[Symbol] = set()
+        # Functions and methods met by the walk, whose untyped parameters get the default type
+        self._functions: list[Symbol] = []
+        # The functions and classes the walk is in, innermost last
+        self._enclosing: list[Symbol] = []
+
+    def infer(self) -> None:
+        body = self._ast["body"]
+        while True:
+            self._changed = False
+            self._read = set()
+            self._functions = []
+            self.visit_all(body)
+            if not self._changed and not self._default_parameters():
+                return
+
+    def _widen(self, symbol: Symbol | None, kind: Any) -> None:
+        """Widens an unannotated variable or parameter to hold a value of a type."""
+        if symbol is None or kind is None or annotation(symbol) is not None:
+            return
+        widened = _join(symbol.type, kind)
+        if widened != symbol.type:
+            symbol.type = widened
+            self._changed = self._changed or symbol in self._read
+
+    def _default_parameters(self) -> bool:
+        """Gives the parameters no call gave a type the default type, and returns whether one was read untyped."""
+        read = False
+        for function in self._functions:
+            for parameter in function.parameters():
+                if parameter.type is None and parameter.node is not None:
+                    parameter.type = DEFAULT_PARAMETER_TYPE
+                    read = read or parameter in self._read
+        return read
+
+    # Declarations
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        self._declare_function(node.binding, node.value)
+
+    visit_main_declaration = visit_function_declaration
+
+    def leave_function_declaration(self, node: ASTNode) -> None:
+        if node.binding is not None:
+            self._enclosing.pop()
+
+    leave_main_declaration = leave_class_method = leave_class_declaration = leave_function_declaration
+
+    def visit_class_declaration(self, node: ASTNode) -> Any:
+        if node.binding is not None:
+            self._enclosing.append(node.binding)
+
+    def visit_class_method(self, node: ASTNode) -> Any:
+        self._declare_function(node.binding, node.value.fn)
+        if node.binding is not None and not node.value.is_static and self._enclosing[-2:-1]:
+            # self, declared without a node, is an object of the class around the method
+            for parameter in node.binding.parameters():
+                if parameter.node is None:
+                    parameter.type = self._enclosing[-2]
+
+    def _declare_function(self, symbol: Symbol | None, declaration: Any) -> None:
+        if symbol is None:
+            return
+        self._functions.append(symbol)
+        self._enclosing.append(symbol)
+        symbol.type = symbol.declared_class or declaration.return_type
+        for parameter in symbol.parameters():
+            parameter.type = annotation(parameter) or parameter.type
+
+    def leave_class_attribute(self, node: ASTNode) -> None:
+        if node.binding is not None:
+            node.binding.type = annotation(node.binding) or node.binding.type
+            initializer = node.children[0] if node.children else None
+            if initializer is not None and initializer.static_type not in _UNTYPED:
+                self._widen(node.binding, initializer.static_type)
+
+    def leave_variable_declaration(self, node: ASTNode) -> None:
+        if node.binding is not None:
+            node.binding.type = annotation(node.binding) or node.binding.type
+            self._widen(node.binding, node.children[0].static_type)
+
+    # Expressions
+
+    def leave_number_literal(self, node: ASTNode) -> None:
+        constants = self._constants
+        node.static_type = _VALUE_TYPES.get(type(constants[node.const])) if 0 <= node.const < len(constants) else None
+
+    leave_string_literal = leave_number_literal
+    leave_boolean_literal = leave_number_literal
+    leave_complex_literal = leave_number_literal
+
+    def leave_none_literal(self, node: ASTNode) -> None:
+        node.static_type = TokenAnnotationTypes.NONE
+
+    def leave_string_template(self, node: ASTNode) -> None:
+        node.static_type = TokenAnnotationTypes.STRING
+
+    def leave_identifier(self, node: ASTNode) -> None:
+        symbol = node.binding
+        if symbol is None:
+            node.static_type = None
+            return
+        self._read.add(symbol)
+        node.static_type = symbol.type
+
+    def leave_binary_expression(self, node: ASTNode) -> None:
+        left, right = (child.static_type for child in node.children)
+        if node.value == "+" and left == right == TokenAnnotationTypes.STRING:
+            node.static_type = TokenAnnotationTypes.STRING
+            return
+        kind = common_type(left, right)
+        if node.value == "/" and kind in _INTEGERS:
+            kind = TokenAnnotationTypes.FLOAT64  # True division of integers is a float
+        node.static_type = kind
+
+    def leave_logical_expression(self, node: ASTNode) -> None:
+        # Comparisons, and and or, which test the truth of their operands
+        node.static_type = TokenAnnotationTypes.BOOL
+
+    def leave_unary_expression(self, node: ASTNode) -> None:
+        operand = node.children[0].static_type
+        if node.value == TokenKeyword.NOT:
+            node.static_type = TokenAnnotationTypes.BOOL
+        elif operand == TokenAnnotationTypes.BOOL:
+            node.static_type = TokenAnnotationTypes.INT64
+        else:
+            node.static_type = operand if operand in _NUMERIC_RANKS else None
+
+    def leave_ternary_expression(self, node: ASTNode) -> None:
+        _, if_true, if_false = (child for child in node.children if child.type not in _LAYOUT)
+        left, right = if_true.static_type, if_false.static_type
+        node.static_type = left if left == right else common_type(left, right)
+
+    def leave_assignment_expression(self, node: ASTNode) -> None:
+        target, value = node.children
+        if target.type == ASTType.IDENTIFIER:
+            symbol = target.binding
+        elif target.type == ASTType.CLASS_MEMBER_ACCESS and len(target.children) == 1:
+            symbol = target.children[0].binding
+        else:
+            symbol = None
+        if symbol is not None and symbol.kind != SymbolKind.METHOD:
+            self._widen(symbol, value.static_type)
+            node.static_type = symbol.type
+        else:
+            node.static_type = None
+
+    def leave_call_expression(self, node: ASTNode) -> None:
+        symbol = node.binding
+        if symbol is not None and symbol.kind == SymbolKind.CLASS:
+            # A class call creates an object and passes the arguments to its constructor
+            constructor = symbol.member(CONSTRUCTOR)
+            if constructor is not None:
+                self._pass_arguments(constructor, node.children)
+            node.static_type = symbol
+            return
+        if symbol is None or symbol.kind != SymbolKind.FUNCTION:
+            builtin = symbol is not None and symbol.kind == SymbolKind.BUILTIN
+            node.static_type = TokenAnnotationTypes.NONE if builtin else None  # print returns none
+            return
+        self._pass_arguments(symbol, node.children)
+        self._read.add(symbol)
+        node.static_type = symbol.type
+
+    def _pass_arguments(self, function: Symbol, arguments: list[ASTNode]) -> None:
+        """Gives the unannotated parameters of a function or method the types of call arguments."""
+        parameters = function.parameters()
+        if function.kind == SymbolKind.METHOD and not function.node.value.is_static:
+            parameters = parameters[1:]  # self is the object, not an argument
+        for parameter, argument in zip(parameters, arguments):
+            self._widen(parameter, argument.static_type)
+
+    def visit_class_member_access(self, node: ASTNode) -> Any:
+        symbol = node.binding
+        if symbol is not None:
+            self._read.add(symbol)
+        node.static_type = None
+        _, arguments = member_chain(node)
+        return arguments  # Typed before the member is, on leaving
+
+    def leave_class_member_access(self, node: ASTNode) -> None:
+        members, _ = member_chain(node)
+        if len(members) != 1:
+            return  # The class of an attribute's members is not tracked
+        member = members[0]
+        cls = instance_class(node.binding)
+        target = cls.member(str(member.value)) if cls is not None else None
+        member.binding = target
+        if target is None:
+            return
+        self._read.add(target)
+        if target.kind == SymbolKind.METHOD:
+            if member.type == ASTType.CALL_EXPRESSION:
+                self._pass_arguments(target, member.children)
+                node.static_type = target.type
+        elif member.type != ASTType.CALL_EXPRESSION:
+            node.static_type = target.type
@@ -0,0 +1 @@
+from src.ast_visit.visitor import REMOVE, SKIP, Transformer, Visitor, hook_name  # noqa
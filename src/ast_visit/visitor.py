@@ -0,0 +1,202 @@
+from collections.abc import Callable, Iterable
+from typing import Any, ClassVar
+
+from src.parser import ASTNode, ASTType
+
+
+class _Signal:
+    """A hook result that is not a node."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# Returned by a visit hook: do not walk the node's value and children
+SKIP = _Signal("SKIP")
+# Returned by a Transformer hook: remove the node from its parent
+REMOVE = _Signal("REMOVE")
+
+Hook = Callable[[Any, ASTNode], Any]
+
+
+def hook_name(prefix: str, node_type: ASTType) -> str:
+    """Returns the name of the hook for a node type, e.g. visit_if_statement."""
+    return f"{prefix}_{node_type.name.lower()}"
+
+
+class Visitor:
+    """
+    Walks AST trees with an explicit stack, calling per-type hooks.
+
+    Subclasses define visit_<type> hooks, called before a node's value and
+    children are walked, and leave_<type> hooks, called after them, where
+    <type> is the lower-case ASTType member name (visit_if_statement,
+    leave_call_expression). Node types without a hook of their own go to
+    generic_visit and generic_leave. The hooks are looked up once per class,
+    into tables indexed by node type, so dispatch is a single dict lookup and
+    the depth of a tree is not limited by the recursion limit.
+
+    A node stored as another node's value (an if condition) is walked before
+    that node's children, like in ASTArena.preorder(). A visit hook returning
+    SKIP leaves the value and children of its node unwalked; its leave hook
+    is still called. A visit hook returning a list of nodes, such as the
+    arguments ending a member chain, has those walked in place of its node's
+    value and children, on the same stack.
+    """
+
+    _visit_hooks: ClassVar[dict[str, Hook]]
+    # Only the node types with a leave hook, so walks of other nodes never revisit them
+    _leave_hooks: ClassVar[dict[str, Hook]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._build_dispatch_tables()
+
+    @classmethod
+    def _build_dispatch_tables(cls) -> None:
+        hooks = {hook_name(prefix, node_type) for prefix in ("visit", "leave") for node_type in ASTType}
+        for name in dir(cls):
+            if name.startswith(("visit_", "leave_")) and name not in hooks and not hasattr(Visitor, name):
+                raise TypeError(f"{cls.__name__}.{name} does not name a node type")
+
+        generic_leave = None if cls.generic_leave is Visitor.generic_leave else cls.generic_leave
+        cls._visit_hooks = {}
+        cls._leave_hooks = {}
+        for node_type in ASTType:
+            cls._visit_hooks[node_type] = getattr(cls, hook_name("visit", node_type), cls.generic_visit)
+            leave = getattr(cls, hook_name("leave", node_type), generic_leave)
+            if leave is not None:
+                cls._leave_hooks[node_type] = leave
+
+    def generic_visit(self, node: ASTNode) -> Any:
+        """Called for the nodes whose type has no visit hook."""
+        return None
+
+    def generic_leave(self, node: ASTNode) -> Any:
+        """Called for the nodes whose type has no leave hook."""
+        return None
+
+    def visit(self, node: ASTNode) -> None:
+        """Walks the tree under node."""
+        self.visit_all((node,))
+
+    def visit_all(self, nodes: Iterable[ASTNode]) -> None:
+        """Walks the trees under nodes, in order, such as the body of a Program."""
+        visit_hooks, leave_hooks = self._visit_hooks, self._leave_hooks
+        # Nodes to visit, and nodes to leave, each pushed after a None marker
+        stack: list[Any] = list(reversed(list(nodes)))
+        while stack:
+            node = stack.pop()
+            if node is None:
+                node = stack.pop()
+                leave_hooks[node.type](self, node)
+                continue
+            node_type = node.type
+            result = visit_hooks[node_type](self, node)
+            if leave_hooks and node_type in leave_hooks:
+                if result is SKIP:
+                    leave_hooks[node_type](self, node)
+                    continue
+                stack.append(node)
+                stack.append(None)
+            elif result is SKIP:
+                continue
+            if type(result) is list:
+                stack.extend(reversed(result))
+                continue
+            if children := node.children:
+                stack.extend(reversed(children))
+            if isinstance(node.value, ASTNode):
+                stack.append(node.value)
+
+
+class _Slot:
+    """Where a node being transformed is stored: an index in a list of nodes, or the value of a node."""
+
+    __slots__ = ("container", "index")
+
+    def __init__(self, container: Any, index: int):
+        self.container = container
+        self.index = index  # -1 for a node's value
+
+    def replace(self, node: Any) -> None:
+        if self.index < 0:
+            self.container.value = None if node is REMOVE else node
+        else:
+            self.container[self.index] = node
+
+
+class Transformer(Visitor):
+    """
+    A Visitor whose hooks can replace or remove the nodes they are called with.
+
+    A hook returning None keeps the node, returning an ASTNode puts it in the
+    node's place, and returning REMOVE drops the node from its parent's
+    children (or clears the parent's value). A node replaced by its visit hook
+    is walked in its place, without calling a visit hook on it again; a leave
+    hook's result is not walked. The nodes of a list a visit hook returns
+    are replaced and removed in that list. Trees are changed in place.
+    """
+
+    def transform(self, node: ASTNode) -> ASTNode | None:
+        """Transforms the tree under node and returns its new root, or None when it was removed."""
+        nodes = [node]
+        self.transform_all(nodes)
+        return nodes[0] if nodes else None
+
+    def transform_all(self, nodes: list[ASTNode]) -> list[ASTNode]:
+        """Transforms the trees of a list of nodes, such as the body of a Program, in place."""
+        self.visit_all(nodes)
+        return nodes
+
+    def visit_all(self, nodes: Iterable[ASTNode]) -> None:
+        roots = nodes if isinstance(nodes, list) else list(nodes)
+        visit_hooks, leave_hooks = self._visit_hooks, self._leave_hooks
+        # (node, where it is stored, whether to leave it rather than visit it)
+        stack = [(roots[i], _Slot(roots, i), False) for i in reversed(range(len(roots)))]
+        # Lists some node was removed from, by id; REMOVE stands in their removed entries until compacted
+        removed: dict[int, list[Any]] = {}
+        while stack:
+            node, slot, leaving = stack.pop()
+            if leaving:
+                if removed and id(node.children) in removed:
+                    # Compacted before the leave hook, so it sees the final children
+                    node.children[:] = [child for child in removed.pop(id(node.children)) if child is not REMOVE]
+                self._apply(leave_hooks[node.type](self, node), node, slot, removed)
+                continue
+            result = visit_hooks[node.type](self, node)
+            if result is REMOVE:
+                self._apply(REMOVE, node, slot, removed)
+                continue
+            if isinstance(result, ASTNode):
+                self._apply(result, node, slot, removed)
+                node = result
+            if node.type in leave_hooks:
+                stack.append((node, slot, True))
+            if result is SKIP:
+                continue
+            walked = type(result) is list
+            children = result if walked else node.children
+            stack.extend((children[i], _Slot(children, i), False) for i in reversed(range(len(children))))
+            if not walked and isinstance(node.value, ASTNode):
+                stack.append((node.value, _Slot(node, -1), False))
+        for container in removed.values():
+            container[:] = [node for node in container if node is not REMOVE]
+
+    @staticmethod
+    def _apply(result: Any, node: ASTNode, slot: _Slot, removed: dict[int, list[Any]]) -> None:
+        """Puts a hook's replacement in the node's place, or removes the node."""
+        if result is REMOVE:
+            slot.replace(REMOVE)
+            if slot.index >= 0:
+                removed[id(slot.container)] = slot.container
+        elif isinstance(result, ASTNode) and result is not node:
+            slot.replace(result)
+
+
+Visitor._build_dispatch_tables()
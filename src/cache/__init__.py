@@ -0,0 +1 @@
+from src.cache.cache import CACHE_FORMAT, DEFAULT_CACHE_DIR, CacheEntry, CompilationCache, compiler_version  # noqa
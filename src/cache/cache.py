@@ -0,0 +1,142 @@
+import gc
+import os
+import pickle
+from dataclasses import dataclass
+from functools import cache
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from src.lexer import ConstantPool, SymbolInterner, TokenBuffer
+
+DEFAULT_CACHE_DIR = Path(".sigil_cache")
+# Bumped whenever the layout of a cache file changes
+CACHE_FORMAT = 1
+_MAGIC = b"SGLC"
+_HEADER = _MAGIC + CACHE_FORMAT.to_bytes(2, "little")
+# Bytes of a source file hashed at a time
+_CHUNK_SIZE = 1 << 20
+# The sources whose behaviour decides the tokens and the AST
+_FRONTEND_DIRS = ("lexer", "parser")
+
+
+@cache
+def compiler_version() -> str:
+    """
+    Returns the package version and a digest of the lexer and parser sources.
+
+    The digest invalidates the entries written by an edited compiler, whose
+    package version usually stays the same during development.
+    """
+    try:
+        package = version("sigil")
+    except PackageNotFoundError:
+        package = "unknown"
+    digest = blake2b(digest_size=8)
+    root = Path(__file__).resolve().parent.parent
+    for directory in _FRONTEND_DIRS:
+        for path in sorted((root / directory).glob("*.py")):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return f"{package}+{digest.hexdigest()}"
+
+
+@dataclass
+class CacheEntry:
+    """The output of lexing and parsing one source: its tokens, the session tables and the AST."""
+
+    tokens: TokenBuffer
+    constants: ConstantPool
+    symbols: SymbolInterner
+    ast: dict[str, Any]
+
+
+class CompilationCache:
+    """
+    Content-addressed on-disk cache of token streams and ASTs.
+
+    Entries are keyed on a hash of the source bytes, the compiler version and
+    the parser options, so a file that moved or was renamed still hits, and an
+    edit or a new compiler never does. Each entry is a short header followed by
+    a pickle of the entry: tokens as the columns of a TokenBuffer, and AST nodes
+    as their positional fields.
+
+    Entries are unpickled, which runs code chosen by whoever wrote them: the
+    cache directory must only be writable by its user.
+    """
+
+    def __init__(self, directory: Path | str = DEFAULT_CACHE_DIR, version: str | None = None):
+        self.directory = Path(directory)
+        self.version = version if version is not None else compiler_version()
+
+    def key(self, source: bytes | Path, lean: bool = False) -> str:
+        """
+        Returns the key of a source, given as its bytes or as the path of its file.
+
+        Files are hashed a chunk at a time, so the key of a large source never
+        holds it in memory; OSError is raised when the file cannot be read.
+        """
+        digest = blake2b(digest_size=16)
+        if isinstance(source, Path):
+            with source.open("rb") as file:
+                while chunk := file.read(_CHUNK_SIZE):
+                    digest.update(chunk)
+        else:
+            digest.update(source)
+        digest.update(f"\0{self.version}\0{CACHE_FORMAT}\0{lean}".encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.sgc"
+
+    def load(self, key: str, filename: str | None = None) -> CacheEntry | None:
+        """
+        Returns the entry stored under key, or None on a miss.
+
+        Unreadable, truncated or foreign files are misses too. The tokens are
+        given filename, since an entry is shared by every file with the same content.
+        """
+        try:
+            data = self.path(key).read_bytes()
+        except OSError:
+            return None
+        if not data.startswith(_HEADER):
+            return None
+        # Like timeit, the cyclic garbage collector is paused: its passes over the new nodes dominate the load time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            entry = pickle.loads(memoryview(data)[len(_HEADER) :])
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+            return None  # Written by another version of the classes, or damaged
+        finally:
+            if enabled:
+                gc.enable()
+        if not isinstance(entry, CacheEntry):
+            return None
+        if filename is not None:
+            entry.tokens.filename = filename
+        return entry
+
+    def store(self, key: str, entry: CacheEntry) -> Path | None:
+        """
+        Writes an entry under key and returns its path.
+
+        The file is replaced atomically, so concurrent readers never see half
+        of it. ASTs too deep for pickle's recursion (e.g. a machine-generated
+        chain of thousands of operators) are not stored, and None is returned.
+        """
+        path = self.path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with temporary.open("wb") as file:
+                file.write(_HEADER)
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except RecursionError:
+            return None
+        finally:
+            temporary.unlink(missing_ok=True)
+        return path
@@ -1 +1,3 @@
 from src.codegen.codegen import CodeGenerator  # noqa
+from src.codegen.codegen import CodegenError  # noqa
+from src.codegen.decision import DecisionTree, string_hash  # noqa
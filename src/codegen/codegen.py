@@ -4,14 +4,151 @@ from typing import Any
 
 from llvmlite import binding, ir
 
+from src.analyzer import CONSTRUCTOR, Symbol, SymbolKind
+from src.ast_visit import SKIP, Visitor
+from src.codegen.decision import FNV_OFFSET, FNV_PRIME, DecisionTree, signed64
+from src.lexer import ConstantPool, TokenAnnotationTypes, TokenKeyword
+from src.lexer.constants import ConstantValue
+from src.parser import ASTNode, ASTType, member_chain
+
+_BOOL = ir.IntType(1)
+_BYTE = ir.IntType(8)
+_INT32 = ir.IntType(32)
+_INT64 = ir.IntType(64)
+_FLOAT = ir.FloatType()
+_DOUBLE = ir.DoubleType()
+_COMPLEX = ir.LiteralStructType([_DOUBLE, _DOUBLE])
+_STRING = _BYTE.as_pointer()
+_VOID = ir.VoidType()
+
+# LLVM types of the annotations with a native representation
+ANNOTATION_TYPES: dict[str, ir.Type] = {
+    TokenAnnotationTypes.BYTE: _BYTE,
+    TokenAnnotationTypes.INT8: _BYTE,
+    TokenAnnotationTypes.INT32: _INT32,
+    TokenAnnotationTypes.INT64: _INT64,
+    TokenAnnotationTypes.FLOAT32: _FLOAT,
+    TokenAnnotationTypes.FLOAT64: _DOUBLE,
+    TokenAnnotationTypes.COMPLEX: _COMPLEX,
+    TokenAnnotationTypes.BOOL: _BOOL,
+    TokenAnnotationTypes.STRING: _STRING,
+}
+# LLVM types of decoded literal values
+_VALUE_TYPES: dict[type, ir.Type] = {bool: _BOOL, int: _INT64, float: _DOUBLE, complex: _COMPLEX, str: _STRING}
+# C library functions called by the generated code
+_LIBC: dict[str, ir.FunctionType] = {
+    "printf": ir.FunctionType(_INT32, [_STRING], var_arg=True),
+    "snprintf": ir.FunctionType(_INT32, [_STRING, _INT64, _STRING], var_arg=True),
+    "malloc": ir.FunctionType(_STRING, [_INT64]),
+    "memcpy": ir.FunctionType(_STRING, [_STRING, _STRING, _INT64]),
+    "strcmp": ir.FunctionType(_INT32, [_STRING, _STRING]),
+    "strlen": ir.FunctionType(_INT64, [_STRING]),
+}
+
+_FUNCTIONS = frozenset({ASTType.FUNCTION_DECLARATION, ASTType.MAIN_DECLARATION})
+_LAYOUT = frozenset({ASTType.NEWLINE, ASTType.INDENT, ASTType.DEDENT, ASTType.EOF})
+_TOP_LEVEL = _FUNCTIONS | _LAYOUT | {ASTType.CLASS_DECLARATION, ASTType.VARIABLE_DECLARATION}
+_BRANCHES = frozenset({ASTType.ELSE_IF_STATEMENT, ASTType.ELSE_STATEMENT})
+_LITERALS = frozenset(
+    {ASTType.NUMBER_LITERAL, ASTType.STRING_LITERAL, ASTType.BOOLEAN_LITERAL, ASTType.COMPLEX_LITERAL}
+)
+# Nodes that have no lowering yet
+_UNSUPPORTED = frozenset(
+    {
+        ASTType.LAMBDA_EXPRESSION,
+        ASTType.PIPE_EXPRESSION,
+        ASTType.FOR_STATEMENT,
+        ASTType.ELLIPSIS_LITERAL,
+    }
+)
+_COMPARISONS = frozenset({"==", "!=", "<", "<=", ">", ">="})
+
 
 class CodegenError(Exception): ...
 
 
-class CodeGenerator:
-    def __init__(self, ast: dict[str, Any]):
+def _error(message: str, node: ASTNode) -> CodegenError:
+    """Returns an error about a node, located by its span when the parser recorded one."""
+    if node.span:
+        message = f"{message} at line {node.span[0]}, column {node.span[1]}"
+    return CodegenError(message)
+
+
+def _constant_initializer(value: ConstantValue) -> ir.Constant:
+    """Builds the LLVM constant of a decoded literal value."""
+    if isinstance(value, bool):
+        return ir.Constant(ir.IntType(1), int(value))
+    if isinstance(value, int):
+        return ir.Constant(ir.IntType(64), value)
+    if isinstance(value, float):
+        return ir.Constant(ir.DoubleType(), value)
+    if isinstance(value, complex):
+        double = ir.DoubleType()
+        return ir.Constant(ir.LiteralStructType([double, double]), [value.real, value.imag])
+    if isinstance(value, str):
+        data = bytearray(value.encode("utf-8") + b"\0")  # NUL-terminated for C interop
+        return ir.Constant(ir.ArrayType(ir.IntType(8), len(data)), data)
+    raise CodegenError(f"Unsupported constant value: {value!r}")
+
+
+def _literal_value(node: ASTNode, constants: ConstantPool) -> ConstantValue | None:
+    """Returns the value of a literal or a negated number literal, or None for other nodes."""
+    negated = node.type == ASTType.UNARY_EXPRESSION and node.value == "-" and len(node.children) == 1
+    literal = node.children[0] if negated else node
+    if literal.type not in _LITERALS or literal.const < 0:
+        return None
+    value = constants[literal.const]
+    if not negated:
+        return value
+    if isinstance(value, (bool, str)):
+        return None
+    return -value
+
+
+def _is_float(kind: ir.Type) -> bool:
+    return isinstance(kind, (ir.FloatType, ir.DoubleType))
+
+
+class CodeGenerator(Visitor):
+    """
+    Walks the program with per-type hooks, emitting the LLVM IR of its nodes.
+
+    Functions are lowered to native code: numbers are LLVM integers and
+    floats, complex numbers pairs of doubles and strings NUL-terminated byte
+    pointers. Statements are emitted by their visit hooks, which walk their
+    own parts; expressions by their leave hooks, which pop the values of
+    their operands from a stack and push their own.
+
+    Names are looked up by the Symbol the SemanticAnalyzer resolved them to,
+    so the AST must have been analyzed first.
+
+    Classes are lowered to structs of their instance attributes, and their
+    methods to functions named Class.method taking the object first. A class
+    call creates an object on the heap, or in its function's frame when
+    EscapeAnalysis cleared the call's ASTNode.escapes, then runs its new
+    method on it; objects are passed around as pointers.
+    """
+
+    def __init__(self, ast: dict[str, Any], constants: ConstantPool | None = None):
         self._ast = ast
-        self.module = ir.Module(name="sigil")
+        self._constants = constants if constants is not None else ConstantPool()
+        self._constant_globals: dict[int, ir.GlobalVariable] = {}
+        # Format strings and other strings the generated code needs, which are not literals of the program
+        self._strings: dict[str, ir.GlobalVariable] = {}
+        self._functions: dict[Symbol, ir.Function] = {}
+        # Struct types of the classes, and field index of their attributes
+        self._classes: dict[Symbol, ir.IdentifiedStructType] = {}
+        self._fields: dict[Symbol, int] = {}
+        # Pointers to the global and local variables and the parameters
+        self._variables: dict[Symbol, ir.Value] = {}
+        # State of the function being emitted: its builders and its operand stack
+        self._function: ir.Function | None = None
+        self._is_main = False
+        self.builder = ir.IRBuilder()
+        self._allocas = ir.IRBuilder()
+        self._values: list[Any] = []
+        # A context of its own, so the class structs of each generated module are named independently
+        self.module = ir.Module(name="sigil", context=ir.Context())
 
         binding.initialize()
         binding.initialize_native_target()
@@ -21,4 +158,876 @@ class CodeGenerator:
         self.module.triple = binding.get_default_triple()
 
     def generate(self) -> str:
+        body = self._ast["body"]
+        for node in body:
+            if node.type not in _TOP_LEVEL:
+                raise _error(f"{node.type} must be inside a function", node)
+        classes = [node for node in body if node.type == ASTType.CLASS_DECLARATION]
+        for node in classes:
+            self._classes[node.binding] = self.module.context.get_identified_type(str(node.value))
+        for node in classes:
+            self._declare_class(node)
+        for node in body:
+            if node.type in _FUNCTIONS:
+                self._declare_function(node)
+        self.visit_all(body)
         return str(self.module)
+
+    # Module-level values
+
+    def _constant(self, index: int) -> ir.GlobalVariable:
+        """Returns the private global holding a pooled constant, emitting it on first use."""
+        global_value = self._constant_globals.get(index)
+        if global_value is None:
+            initializer = _constant_initializer(self._constants[index])
+            global_value = ir.GlobalVariable(self.module, initializer.type, name=f".const.{index}")
+            global_value.linkage = "private"
+            global_value.global_constant = True
+            global_value.unnamed_addr = True
+            global_value.initializer = initializer
+            self._constant_globals[index] = global_value
+        return global_value
+
+    def _string(self, text: str) -> ir.Constant:
+        """Returns a pointer to a NUL-terminated string that is not a literal of the program, such as a format."""
+        global_value = self._strings.get(text)
+        if global_value is None:
+            initializer = _constant_initializer(text)
+            global_value = ir.GlobalVariable(self.module, initializer.type, name=f".str.{len(self._strings)}")
+            global_value.linkage = "private"
+            global_value.global_constant = True
+            global_value.unnamed_addr = True
+            global_value.initializer = initializer
+            self._strings[text] = global_value
+        return global_value.gep([ir.Constant(_INT32, 0), ir.Constant(_INT32, 0)])
+
+    def _typed_constant(self, value: ConstantValue, kind: ir.Type, node: ASTNode) -> ir.Constant:
+        """Converts a literal value to a constant of an LLVM type, as the initializer of a global."""
+        if isinstance(value, str):
+            if kind == _STRING:
+                index = self._constants.intern(value)
+                return self._constant(index).gep([ir.Constant(_INT32, 0), ir.Constant(_INT32, 0)])
+        elif isinstance(kind, ir.IntType) and isinstance(value, int):
+            return ir.Constant(kind, int(value))
+        elif _is_float(kind) and isinstance(value, (int, float)):
+            return ir.Constant(kind, float(value))
+        elif kind == _COMPLEX:
+            value = complex(value)
+            return ir.Constant(_COMPLEX, [value.real, value.imag])
+        raise _error(f"Cannot store {value!r} as {kind}", node)
+
+    def _extern(self, name: str) -> ir.Function:
+        """Returns a C library function, declaring it on first use."""
+        function = self.module.globals.get(name)
+        if function is None:
+            function = ir.Function(self.module, _LIBC[name], name=name)
+        return function
+
+    def _annotation_type(self, annotation: Any, default: ir.Type, node: ASTNode) -> ir.Type:
+        """Returns the LLVM type of a type annotation or class, or default when there is none."""
+        if annotation is None or annotation == TokenAnnotationTypes.NONE:
+            return default
+        if isinstance(annotation, Symbol):
+            struct = self._classes.get(annotation)
+            if struct is None:
+                raise _error(f"{annotation.name} objects are not supported by the code generator yet", node)
+            return struct.as_pointer()
+        try:
+            return ANNOTATION_TYPES[annotation]
+        except KeyError:
+            raise _error(f"{annotation} values are not supported by the code generator yet", node) from None
+
+    def _declare_class(self, node: ASTNode) -> None:
+        """Defines the struct of a class's instance attributes, and declares its methods."""
+        fields: list[ir.Type] = []
+        for member in node.children:
+            if member.type == ASTType.CLASS_ATTRIBUTE:
+                if member.value.is_static:
+                    raise _error(
+                        f"Static attribute {member.value.name} is not supported by the code generator yet", member
+                    )
+                kind = self._annotation_type(member.binding.type, _VOID, member)
+                if kind == _VOID:
+                    raise _error(f"Attribute {member.value.name} needs a type", member)
+                self._fields[member.binding] = len(fields)
+                fields.append(kind)
+        self._classes[node.binding].set_body(*fields)
+        for member in node.children:
+            if member.type == ASTType.CLASS_METHOD:
+                self._declare_function(member, f"{node.value}.")
+
+    def _declare_function(self, node: ASTNode, prefix: str = "") -> None:
+        declaration = node.value.fn if node.type == ASTType.CLASS_METHOD else node.value
+        is_main = node.type == ASTType.MAIN_DECLARATION
+        name = "main" if is_main else f"{prefix}{declaration.name}"
+        # The entry point returns the process exit status; parameters without annotations are 64-bit integers
+        if is_main:
+            return_type = _INT32
+        elif node.type == ASTType.CLASS_METHOD and declaration.name == CONSTRUCTOR and not node.value.is_static:
+            return_type = _VOID  # A constructor initializes the object it runs on, whatever its annotation
+        elif declaration.return_type == TokenAnnotationTypes.OBJECT:
+            return_type = self._annotation_type(node.binding.type, _VOID, node)  # The class it is annotated with
+        else:
+            return_type = self._annotation_type(declaration.return_type, _VOID, node)
+        # Parameters have the type inferred from their annotation or the arguments of their calls
+        parameters = node.binding.parameters()
+        params = [self._annotation_type(param.type, _INT64, node) for param in parameters]
+        function = ir.Function(self.module, ir.FunctionType(return_type, params), name=name)
+        for argument, param in zip(function.args, parameters):
+            argument.name = param.name
+        self._functions[node.binding] = function
+
+    # Functions, blocks and statements
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        self._is_main = node.type == ASTType.MAIN_DECLARATION
+        function = self._functions[node.binding]
+        self._function = function
+        entry = function.append_basic_block("entry")
+        self.builder = ir.IRBuilder(entry)
+        self._allocas = ir.IRBuilder(entry)
+        for argument, symbol in zip(function.args, node.binding.parameters()):
+            pointer = self._alloca(argument.type, argument.name)
+            self.builder.store(argument, pointer)
+            self._variables[symbol] = pointer
+
+        self._block(node.children)
+        if not self.builder.block.is_terminated:
+            return_type = function.function_type.return_type
+            if self._is_main:
+                self.builder.ret(ir.Constant(_INT32, 0))
+            elif return_type == _VOID:
+                self.builder.ret_void()
+            else:
+                self.builder.unreachable()  # Reached only when the function misses a return
+        self._function = None
+        return SKIP
+
+    visit_main_declaration = visit_function_declaration
+
+    def visit_class_declaration(self, node: ASTNode) -> Any:
+        if self._function is not None:
+            raise _error(f"Class {node.value} must be declared at the top level", node)
+        for member in node.children:
+            if member.type == ASTType.CLASS_METHOD:
+                self.visit_function_declaration(member)
+        return SKIP
+
+    def _block(self, nodes: list[ASTNode]) -> None:
+        """Emits the statements of a block."""
+        depth = len(self._values)
+        for node in nodes:
+            if self.builder.block.is_terminated:
+                break  # Statements after a return are never run
+            self.visit(node)
+            del self._values[depth:]  # The value of an expression statement is unused
+
+    def _alloca(self, kind: ir.Type, name: str) -> ir.AllocaInstr:
+        """Allocates a local variable at the start of the entry block, where mem2reg promotes it to a register."""
+        self._allocas.position_at_start(self._allocas.block)
+        pointer = self._allocas.alloca(kind, name=name)
+        # Builders insert at an index, which the alloca moved; the function's builder always appends
+        self.builder.position_at_end(self.builder.block)
+        return pointer
+
+    def _lookup(self, node: ASTNode) -> ir.Value:
+        """Returns the pointer to the variable an identifier resolved to."""
+        pointer = self._variables.get(node.binding)
+        if pointer is None:
+            raise _error(f"{node.value} is not a variable", node)
+        return pointer
+
+    def _emit(self, node: ASTNode) -> Any:
+        """Emits an expression and returns its value, or None for none."""
+        self.visit(node)
+        return self._values.pop()
+
+    def _pop(self, count: int) -> list[Any]:
+        if not count:
+            return []
+        values = self._values[-count:]
+        del self._values[-count:]
+        return values
+
+    def visit_variable_declaration(self, node: ASTNode) -> Any:
+        declaration = node.value
+        name = str(declaration.name)
+        if self._function is None:
+            self._global_variable(node)
+            return SKIP
+        value = self._emit(node.children[0])
+        if value is None:
+            raise _error(f"Cannot store none in {name}", node)
+        # The inferred type, which is wide enough for every value later assigned to the variable
+        kind = self._annotation_type(node.binding.type, value.type, node)
+        pointer = self._alloca(kind, name)
+        self.builder.store(self._convert(value, kind, node), pointer)
+        self._variables[node.binding] = pointer
+        return SKIP
+
+    def _global_variable(self, node: ASTNode) -> None:
+        """Emits a top-level variable, whose initializer must be a literal."""
+        declaration = node.value
+        value = _literal_value(node.children[0], self._constants)
+        if value is None:
+            raise _error(f"Top-level variable {declaration.name} needs a literal initializer", node)
+        kind = self._annotation_type(node.binding.type, _VALUE_TYPES[type(value)], node)
+        global_value = ir.GlobalVariable(self.module, kind, name=str(declaration.name))
+        global_value.linkage = "internal"
+        global_value.initializer = self._typed_constant(value, kind, node)
+        self._variables[node.binding] = global_value
+
+    def visit_return_statement(self, node: ASTNode) -> Any:
+        value = self._emit(node.children[0]) if node.children else None
+        return_type = self.builder.function.function_type.return_type
+        if value is None:
+            if self._is_main:
+                self.builder.ret(ir.Constant(_INT32, 0))
+            elif return_type == _VOID:
+                self.builder.ret_void()
+            else:
+                raise _error(f"{self.builder.function.name} must return a value", node)
+        elif return_type == _VOID:
+            raise _error(f"{self.builder.function.name} returns none", node)
+        else:
+            self.builder.ret(self._convert(value, return_type, node))
+        return SKIP
+
+    def visit_if_statement(self, node: ASTNode) -> Any:
+        end = self.builder.append_basic_block("if.end")
+        branch: ASTNode | None = node
+        while branch is not None:
+            body = [child for child in branch.children if child.type not in _BRANCHES]
+            following = next((child for child in branch.children if child.type in _BRANCHES), None)
+            if branch.type == ASTType.ELSE_STATEMENT:
+                self._block(body)
+            else:
+                condition = self._truth(self._emit(branch.value), branch)
+                then = self.builder.append_basic_block("if.then")
+                otherwise = self.builder.append_basic_block("if.else") if following is not None else end
+                self.builder.cbranch(condition, then, otherwise)
+                self.builder.position_at_end(then)
+                self._block(body)
+                if not self.builder.block.is_terminated:
+                    self.builder.branch(end)
+                if following is None:
+                    break
+                self.builder.position_at_end(otherwise)
+            branch = following
+        if not self.builder.block.is_terminated:
+            self.builder.branch(end)
+        # Keeps blocks in source order
+        end.parent.blocks.remove(end)
+        end.parent.blocks.append(end)
+        self.builder.position_at_end(end)
+        return SKIP
+
+    def visit_loop_statement(self, node: ASTNode) -> Any:
+        body = self.builder.append_basic_block("loop.body")
+        self.builder.branch(body)
+        self.builder.position_at_end(body)
+        self._block(node.children)
+        if not self.builder.block.is_terminated:
+            self.builder.branch(body)
+        # Loops are left by returning; the code after one is unreachable until break is parsed
+        self.builder.position_at_end(self.builder.append_basic_block("loop.end"))
+        self.builder.unreachable()
+        return SKIP
+
+    def visit_match_statement(self, node: ASTNode) -> Any:
+        """
+        Lowers a match to a decision tree: one switch over integer subjects,
+        a switch over the hash of string subjects followed by a comparison
+        with the strings of the same hash, and comparisons in order otherwise.
+        """
+        subject = self._emit(node.value)
+        if subject is None:
+            raise _error("Cannot match none", node)
+        cases = [child for child in node.children if child.type == ASTType.MATCH_CASE]
+        tree = DecisionTree.from_arms([self._pattern_values(case.value) for case in cases])
+        arms = {index: self.builder.append_basic_block(f"match.arm.{index}") for index in tree.reachable}
+        end = self.builder.append_basic_block("match.end")
+        default = arms[tree.default] if tree.default is not None else end
+
+        kind = subject.type
+        if isinstance(kind, ir.IntType):
+            self._switch_cases(subject, tree, arms, default, node)
+        elif kind == _STRING:
+            self._hash_cases(subject, tree, arms, default, node)
+        else:
+            self._compared_cases(subject, tree, arms, default, node)
+
+        for index, block in arms.items():
+            self.builder.position_at_end(block)
+            self._block(cases[index].children)
+            if not self.builder.block.is_terminated:
+                self.builder.branch(end)
+        self.builder.position_at_end(end)
+        return SKIP
+
+    def _pattern_values(self, pattern: ASTNode) -> list[ConstantValue] | None:
+        """Returns the values of a pattern's alternatives, or None for a wildcard."""
+        if not pattern.children:
+            return None
+        values = [_literal_value(child, self._constants) for child in pattern.children]
+        if any(value is None for value in values):
+            raise _error("Match patterns must be literals", pattern)
+        return values  # type: ignore[return-value]
+
+    def _switch_cases(
+        self, subject: ir.Value, tree: DecisionTree, arms: dict[int, ir.Block], default: ir.Block, node: ASTNode
+    ) -> None:
+        kind = subject.type
+        # Cases out of the subject's range can never match; booleans are 0 and 1
+        low, high = (0, 1) if kind.width == 1 else (-(1 << (kind.width - 1)), (1 << (kind.width - 1)) - 1)
+        switch = self.builder.switch(subject, default)
+        for value, arm in tree.cases.items():
+            if not isinstance(value, int):
+                raise _error(f"Cannot match {kind} against {value!r}", node)
+            if low <= value <= high:
+                switch.add_case(ir.Constant(kind, int(value)), arms[arm])
+
+    def _hash_cases(
+        self, subject: ir.Value, tree: DecisionTree, arms: dict[int, ir.Block], default: ir.Block, node: ASTNode
+    ) -> None:
+        if not all(isinstance(value, str) for value in tree.cases):
+            raise _error(f"Cannot match a string against {list(tree.cases)!r}", node)
+        switch = self.builder.switch(self.builder.call(self._hash_function(), [subject]), default)
+        strcmp = self._extern("strcmp")
+        for digest, candidates in tree.buckets().items():
+            block = self.builder.append_basic_block("match.hash")
+            switch.add_case(ir.Constant(_INT64, digest), block)
+            self.builder.position_at_end(block)
+            for position, (text, arm) in enumerate(candidates, 1):
+                pointer = self._typed_constant(text, _STRING, node)
+                equal = self.builder.icmp_signed(
+                    "==", self.builder.call(strcmp, [subject, pointer]), ir.Constant(_INT32, 0)
+                )
+                following = default if position == len(candidates) else self.builder.append_basic_block("match.string")
+                self.builder.cbranch(equal, arms[arm], following)
+                self.builder.position_at_end(following)
+
+    def _compared_cases(
+        self, subject: ir.Value, tree: DecisionTree, arms: dict[int, ir.Block], default: ir.Block, node: ASTNode
+    ) -> None:
+        for value, arm in tree.cases.items():
+            if isinstance(value, str):
+                raise _error(f"Cannot match {subject.type} against {value!r}", node)
+            case = self._convert(_constant_initializer(value), subject.type, node)
+            following = self.builder.append_basic_block("match.compare")
+            self.builder.cbranch(self._compare("==", subject, case, node), arms[arm], following)
+            self.builder.position_at_end(following)
+        self.builder.branch(default)
+
+    # Expressions
+
+    def generic_visit(self, node: ASTNode) -> Any:
+        if node.type in _UNSUPPORTED:
+            raise _error(f"{node.type} is not supported by the code generator yet", node)
+        return None
+
+    def leave_number_literal(self, node: ASTNode) -> None:
+        # Repeated literals share the single global of their pooled value
+        self._values.append(self._constant(node.const).initializer)
+
+    leave_boolean_literal = leave_complex_literal = leave_number_literal
+
+    def leave_string_literal(self, node: ASTNode) -> None:
+        self._values.append(self._constant(node.const).gep([ir.Constant(_INT32, 0), ir.Constant(_INT32, 0)]))
+
+    def leave_none_literal(self, node: ASTNode) -> None:
+        self._values.append(None)
+
+    def leave_identifier(self, node: ASTNode) -> None:
+        self._values.append(self.builder.load(self._lookup(node), name=node.value))
+
+    def leave_binary_expression(self, node: ASTNode) -> None:
+        left, right = self._pop(2)
+        self._values.append(self._arithmetic(node.value, left, right, node))
+
+    def visit_logical_expression(self, node: ASTNode) -> Any:
+        if node.value not in (TokenKeyword.AND, TokenKeyword.OR):
+            return None
+        # and and or only evaluate their right operand when the left one does not decide the result
+        left = self._truth(self._emit(node.children[0]), node)
+        left_block = self.builder.block
+        is_and = node.value == TokenKeyword.AND
+        right_block = self.builder.append_basic_block("and.right" if is_and else "or.right")
+        end = self.builder.append_basic_block("and.end" if is_and else "or.end")
+        if is_and:
+            self.builder.cbranch(left, right_block, end)
+        else:
+            self.builder.cbranch(left, end, right_block)
+        self.builder.position_at_end(right_block)
+        right = self._truth(self._emit(node.children[1]), node)
+        right_block = self.builder.block
+        self.builder.branch(end)
+        self.builder.position_at_end(end)
+        result = self.builder.phi(_BOOL)
+        result.add_incoming(left, left_block)
+        result.add_incoming(right, right_block)
+        self._values.append(result)
+        return SKIP
+
+    def leave_logical_expression(self, node: ASTNode) -> None:
+        if node.value in (TokenKeyword.AND, TokenKeyword.OR):
+            return  # Pushed by the visit hook
+        left, right = self._pop(2)
+        self._values.append(self._compare(str(node.value), left, right, node))
+
+    def leave_unary_expression(self, node: ASTNode) -> None:
+        operand = self._values.pop()
+        if node.value == TokenKeyword.NOT:
+            self._values.append(self.builder.not_(self._truth(operand, node)))
+        elif operand is not None and operand.type == _COMPLEX:
+            self._values.append(
+                self._complex_arithmetic("-", self._convert(ir.Constant(_INT64, 0), _COMPLEX, node), operand, node)
+            )
+        elif operand is not None and _is_float(operand.type):
+            self._values.append(self.builder.fneg(operand))
+        elif operand is not None and isinstance(operand.type, ir.IntType):
+            self._values.append(
+                self.builder.neg(self._convert(operand, _INT64, node) if operand.type == _BOOL else operand)
+            )
+        else:
+            raise _error(f"Cannot negate {operand}", node)
+
+    def visit_ternary_expression(self, node: ASTNode) -> Any:
+        condition, if_true, if_false = node.children
+        then = self.builder.append_basic_block("ternary.true")
+        otherwise = self.builder.append_basic_block("ternary.false")
+        end = self.builder.append_basic_block("ternary.end")
+        self.builder.cbranch(self._truth(self._emit(condition), node), then, otherwise)
+        self.builder.position_at_end(then)
+        true_value = self._emit(if_true)
+        true_block = self.builder.block
+        self.builder.position_at_end(otherwise)
+        false_value = self._emit(if_false)
+        false_block = self.builder.block
+        if true_value is None or false_value is None:
+            raise _error("Ternary branches cannot be none", node)
+
+        # Both branches are converted to their common type before joining
+        kind = true_value.type
+        if kind != false_value.type:
+            kind = self._common_type(true_value.type, false_value.type, node)
+        self.builder.position_at_end(true_block)
+        true_value = self._convert(true_value, kind, node)
+        self.builder.branch(end)
+        self.builder.position_at_end(false_block)
+        false_value = self._convert(false_value, kind, node)
+        self.builder.branch(end)
+        self.builder.position_at_end(end)
+        result = self.builder.phi(kind)
+        result.add_incoming(true_value, true_block)
+        result.add_incoming(false_value, false_block)
+        self._values.append(result)
+        return SKIP
+
+    def visit_assignment_expression(self, node: ASTNode) -> Any:
+        target, expression = node.children
+        if target.type == ASTType.CLASS_MEMBER_ACCESS:
+            pointer = self._field(target, self._member(target))
+        elif target.type == ASTType.IDENTIFIER:
+            pointer = self._lookup(target)
+        else:
+            raise _error(f"Cannot assign to {target.type}", node)
+        value = self._emit(expression)
+        if value is None:
+            raise _error(f"Cannot store none in {target.value}", node)
+        value = self._convert(value, pointer.type.pointee, node)
+        self.builder.store(value, pointer)
+        self._values.append(value)
+        return SKIP
+
+    def leave_call_expression(self, node: ASTNode) -> None:
+        arguments = self._pop(len(node.children))
+        symbol = node.binding
+        if symbol.kind == SymbolKind.BUILTIN:
+            text, values = self._format(arguments, node, separator=" ")
+            self.builder.call(self._extern("printf"), [self._string(text + "\n"), *values])
+            self._values.append(None)
+            return
+        if symbol.kind == SymbolKind.CLASS:
+            self._values.append(self._construct(symbol, arguments, node))
+            return
+        function = self._functions.get(symbol)
+        if function is None:
+            raise _error(f"{node.value} is not a function", node)
+        self._values.append(self._call(function, arguments, node, str(node.value)))
+
+    def _call(self, function: ir.Function, arguments: list[Any], node: ASTNode, name: str) -> Any:
+        """Calls a function with arguments converted to its parameter types, and returns its result or None."""
+        params = function.function_type.args
+        if len(params) != len(arguments):
+            raise _error(f"{name} takes {len(params)} arguments but {len(arguments)} were given", node)
+        if any(argument is None for argument in arguments):
+            raise _error(f"Cannot pass none to {name}", node)
+        arguments = [self._convert(argument, param, node) for argument, param in zip(arguments, params)]
+        result = self.builder.call(function, arguments)
+        return None if function.function_type.return_type == _VOID else result
+
+    def _construct(self, cls: Symbol, arguments: list[Any], node: ASTNode) -> ir.Value:
+        """Creates an object of a class, with its attribute initializers, and runs its constructor on it."""
+        struct = self._classes.get(cls)
+        if struct is None:
+            raise _error(f"{cls.name} objects are not supported by the code generator yet", node)
+        if node.escapes:
+            # The size of the struct, as the offset of the element after it
+            size = self.builder.ptrtoint(self.builder.gep(ir.Constant(struct.as_pointer(), None), [_INT32(1)]), _INT64)
+            raw = self.builder.call(self._extern("malloc"), [size])
+            instance = self.builder.bitcast(raw, struct.as_pointer(), name=cls.name.lower())
+        else:
+            instance = self._alloca(struct, cls.name.lower())
+        self.builder.store(ir.Constant(struct, None), instance)
+        for attribute in cls.members or ():
+            field = self._fields.get(attribute)
+            if field is None:
+                continue
+            initializer = attribute.node.children[0]
+            if initializer.type == ASTType.NONE_LITERAL:
+                continue
+            value = _literal_value(initializer, self._constants)
+            if value is None:
+                raise _error(f"Attribute {attribute.name} needs a literal initializer", initializer)
+            pointer = self.builder.gep(instance, [_INT32(0), _INT32(field)])
+            self.builder.store(self._typed_constant(value, struct.elements[field], initializer), pointer)
+        constructor = cls.member(CONSTRUCTOR)
+        if constructor is not None and constructor.kind == SymbolKind.METHOD:
+            self._call(self._functions[constructor], [instance, *arguments], node, f"{cls.name}.{CONSTRUCTOR}")
+        elif arguments:
+            raise _error(f"{cls.name} takes 0 arguments but {len(arguments)} were given", node)
+        return instance
+
+    def visit_class_member_access(self, node: ASTNode) -> Any:
+        member = node.children[0]
+        target = self._member(node)
+        if target.kind == SymbolKind.ATTRIBUTE:
+            self._values.append(self.builder.load(self._field(node, target), name=target.name))
+            return SKIP
+        if member.type != ASTType.CALL_EXPRESSION:
+            raise _error(f"Method {target.name} must be called", node)
+        receiver = [] if target.node.value.is_static else [self.builder.load(self._lookup(node))]
+        arguments = [self._emit(argument) for argument in member.children]
+        self._values.append(self._call(self._functions[target], [*receiver, *arguments], member, target.name))
+        return SKIP
+
+    def _member(self, node: ASTNode) -> Symbol:
+        """Returns the attribute or method a member access reaches, resolved by type inference."""
+        members, _ = member_chain(node)
+        if len(members) != 1:
+            raise _error("Chained member accesses are not supported by the code generator yet", node)
+        member = members[0]
+        if member.binding is None:
+            raise _error(f"{node.value} has no member {member.value}", node)
+        return member.binding
+
+    def _field(self, node: ASTNode, attribute: Symbol) -> ir.Value:
+        """Returns the pointer to an attribute of the object a member access is made on."""
+        field = self._fields.get(attribute)
+        if field is None:
+            raise _error(f"{attribute.name} is not an attribute", node)
+        instance = self.builder.load(self._lookup(node), name=str(node.value))
+        return self.builder.gep(instance, [_INT32(0), _INT32(field)])
+
+    def leave_string_template(self, node: ASTNode) -> None:
+        # Literal segments go into the format, so only the interpolated values are formatted at run time
+        values = self._pop(len(node.children))
+        parts = [
+            self._constants[child.const] if child.type == ASTType.STRING_LITERAL else value
+            for child, value in zip(node.children, values)
+        ]
+        text, arguments = self._format(parts, node)
+        snprintf = self._extern("snprintf")
+        size = self.builder.call(
+            snprintf, [ir.Constant(_STRING, None), ir.Constant(_INT64, 0), self._string(text), *arguments]
+        )
+        size = self.builder.add(self.builder.sext(size, _INT64), ir.Constant(_INT64, 1))
+        buffer = self.builder.call(self._extern("malloc"), [size])
+        self.builder.call(snprintf, [buffer, size, self._string(text), *arguments])
+        self._values.append(buffer)
+
+    # Lowering helpers
+
+    def _format(self, parts: list[Any], node: ASTNode, separator: str = "") -> tuple[str, list[ir.Value]]:
+        """Returns the printf format of values, and its arguments; Python strings are copied into the format."""
+        formats: list[str] = []
+        arguments: list[ir.Value] = []
+        for part in parts:
+            if isinstance(part, str):
+                formats.append(part.replace("%", "%%"))
+            elif part is None:
+                formats.append("none")
+            elif part.type == _BOOL:
+                formats.append("%s")
+                arguments.append(self.builder.select(part, self._string("true"), self._string("false")))
+            elif isinstance(part.type, ir.IntType):
+                formats.append("%lld")
+                arguments.append(self._convert(part, _INT64, node))
+            elif _is_float(part.type):
+                formats.append("%g")
+                arguments.append(self._convert(part, _DOUBLE, node))
+            elif part.type == _COMPLEX:
+                formats.append("(%g%+gj)")
+                arguments.extend(self.builder.extract_value(part, index) for index in (0, 1))
+            elif part.type == _STRING:
+                formats.append("%s")
+                arguments.append(part)
+            else:
+                raise _error(f"Cannot format {part.type}", node)
+        return separator.join(formats), arguments
+
+    def _truth(self, value: Any, node: ASTNode) -> ir.Value:
+        """Converts a value to a boolean: numbers are true when not zero, strings when not empty."""
+        if value is None:
+            return ir.Constant(_BOOL, 0)
+        kind = value.type
+        if kind == _BOOL:
+            return value
+        if isinstance(kind, ir.IntType):
+            return self.builder.icmp_signed("!=", value, ir.Constant(kind, 0))
+        if _is_float(kind):
+            return self.builder.fcmp_unordered("!=", value, ir.Constant(kind, 0.0))
+        if kind == _COMPLEX:
+            return self._compare("!=", value, ir.Constant(_COMPLEX, [0.0, 0.0]), node)
+        if kind == _STRING:
+            return self.builder.icmp_signed("!=", self.builder.load(value), ir.Constant(_BYTE, 0))
+        raise _error(f"Cannot test the truth of {kind}", node)
+
+    def _common_type(self, left: ir.Type, right: ir.Type, node: ASTNode) -> ir.Type:
+        """Returns the type both operands of an arithmetic operator or a comparison are converted to."""
+        numeric = (ir.IntType, ir.FloatType, ir.DoubleType)
+        if not all(isinstance(kind, numeric) or kind == _COMPLEX for kind in (left, right)):
+            raise _error(f"Unsupported operand types {left} and {right}", node)
+        if _COMPLEX in (left, right):
+            return _COMPLEX
+        if _is_float(left) or _is_float(right):
+            return _DOUBLE if _DOUBLE in (left, right) else _FLOAT
+        # Booleans take part in arithmetic as the integers 0 and 1
+        widths = [kind.width for kind in (left, right) if kind.width > 1]
+        return ir.IntType(max(widths)) if widths else _INT64
+
+    def _convert(self, value: ir.Value, kind: ir.Type, node: ASTNode) -> ir.Value:
+        """Converts a value to another numeric type, following the conversions of arithmetic."""
+        source = value.type
+        if source == kind:
+            return value
+        if isinstance(kind, ir.IntType) and isinstance(source, ir.IntType):
+            if kind.width < source.width:
+                return self.builder.trunc(value, kind)
+            return self.builder.zext(value, kind) if source.width == 1 else self.builder.sext(value, kind)
+        if _is_float(kind) and isinstance(source, ir.IntType):
+            return self.builder.uitofp(value, kind) if source.width == 1 else self.builder.sitofp(value, kind)
+        if _is_float(kind) and _is_float(source):
+            return self.builder.fpext(value, kind) if kind == _DOUBLE else self.builder.fptrunc(value, kind)
+        if kind == _COMPLEX and (isinstance(source, ir.IntType) or _is_float(source)):
+            real = self._convert(value, _DOUBLE, node)
+            return self.builder.insert_value(ir.Constant(_COMPLEX, [0.0, 0.0]), real, 0)
+        raise _error(f"Cannot convert {source} to {kind}", node)
+
+    def _arithmetic(self, operator: str, left: Any, right: Any, node: ASTNode) -> ir.Value:
+        if left is None or right is None:
+            raise _error(f"Unsupported operand none for {operator}", node)
+        if operator == "+" and left.type == right.type == _STRING:
+            return self._concatenate(left, right)
+        # The inferred type of the operation, or the common type of its operands when it is unknown
+        kind = ANNOTATION_TYPES.get(node.static_type)
+        if kind is None:
+            kind = self._common_type(left.type, right.type, node)
+            if operator == "/" and isinstance(kind, ir.IntType):
+                kind = _DOUBLE  # True division of integers is a float
+        left = self._convert(left, kind, node)
+        right = self._convert(right, kind, node)
+        if kind == _COMPLEX:
+            return self._complex_arithmetic(operator, left, right, node)
+        builder = self.builder
+        if _is_float(kind):
+            if operator == "+":
+                return builder.fadd(left, right)
+            if operator == "-":
+                return builder.fsub(left, right)
+            if operator == "*":
+                return builder.fmul(left, right)
+            if operator == "/":
+                return builder.fdiv(left, right)
+            if operator == "//":
+                return builder.call(self.module.declare_intrinsic("llvm.floor", [kind]), [builder.fdiv(left, right)])
+            if operator == "%":
+                return self._floored(builder.frem(left, right), right)
+            if operator == "**":
+                return builder.call(self.module.declare_intrinsic("llvm.pow", [kind]), [left, right])
+        else:
+            if operator == "+":
+                return builder.add(left, right)
+            if operator == "-":
+                return builder.sub(left, right)
+            if operator == "*":
+                return builder.mul(left, right)
+            if operator == "//":
+                # Rounds towards negative infinity: the truncated quotient is one too big when the signs differ
+                quotient = builder.sdiv(left, right)
+                remainder = builder.srem(left, right)
+                adjust = self._signs_differ(remainder, right)
+                return builder.sub(quotient, builder.zext(adjust, kind))
+            if operator == "%":
+                return self._floored(builder.srem(left, right), right)
+            if operator == "**":
+                power = builder.call(
+                    self._power_function(), [self._convert(left, _INT64, node), self._convert(right, _INT64, node)]
+                )
+                return self._convert(power, kind, node)
+        raise _error(f"Unsupported operator {operator} for {kind}", node)
+
+    def _signs_differ(self, remainder: ir.Value, divisor: ir.Value) -> ir.Value:
+        """Tests whether a non-zero remainder has the opposite sign of its divisor."""
+        builder = self.builder
+        kind = remainder.type
+        if _is_float(kind):
+            zero = ir.Constant(kind, 0.0)
+            nonzero = builder.fcmp_ordered("!=", remainder, zero)
+            signs = builder.xor(builder.fcmp_ordered("<", remainder, zero), builder.fcmp_ordered("<", divisor, zero))
+        else:
+            zero = ir.Constant(kind, 0)
+            nonzero = builder.icmp_signed("!=", remainder, zero)
+            signs = builder.icmp_signed("<", builder.xor(remainder, divisor), zero)
+        return builder.and_(nonzero, signs)
+
+    def _floored(self, remainder: ir.Value, divisor: ir.Value) -> ir.Value:
+        """Turns a truncated remainder into a floored one, which has the sign of the divisor."""
+        builder = self.builder
+        adjusted = builder.fadd(remainder, divisor) if _is_float(remainder.type) else builder.add(remainder, divisor)
+        return builder.select(self._signs_differ(remainder, divisor), adjusted, remainder)
+
+    def _complex_arithmetic(self, operator: str, left: ir.Value, right: ir.Value, node: ASTNode) -> ir.Value:
+        builder = self.builder
+        a, b = (builder.extract_value(left, index) for index in (0, 1))
+        c, d = (builder.extract_value(right, index) for index in (0, 1))
+        if operator == "+":
+            real, imag = builder.fadd(a, c), builder.fadd(b, d)
+        elif operator == "-":
+            real, imag = builder.fsub(a, c), builder.fsub(b, d)
+        elif operator == "*":
+            real = builder.fsub(builder.fmul(a, c), builder.fmul(b, d))
+            imag = builder.fadd(builder.fmul(a, d), builder.fmul(b, c))
+        elif operator == "/":
+            scale = builder.fadd(builder.fmul(c, c), builder.fmul(d, d))
+            real = builder.fdiv(builder.fadd(builder.fmul(a, c), builder.fmul(b, d)), scale)
+            imag = builder.fdiv(builder.fsub(builder.fmul(b, c), builder.fmul(a, d)), scale)
+        else:
+            raise _error(f"Unsupported operator {operator} for complex numbers", node)
+        result = builder.insert_value(ir.Constant(_COMPLEX, [0.0, 0.0]), real, 0)
+        return builder.insert_value(result, imag, 1)
+
+    def _compare(self, operator: str, left: Any, right: Any, node: ASTNode) -> ir.Value:
+        if operator not in _COMPARISONS or left is None or right is None:
+            raise _error(f"Unsupported comparison {operator}", node)
+        builder = self.builder
+        if left.type == right.type == _STRING:
+            order = builder.call(self._extern("strcmp"), [left, right])
+            return builder.icmp_signed(operator, order, ir.Constant(_INT32, 0))
+        kind = self._common_type(left.type, right.type, node)
+        left = self._convert(left, kind, node)
+        right = self._convert(right, kind, node)
+        if kind == _COMPLEX:
+            if operator not in ("==", "!="):
+                raise _error("Complex numbers are not ordered", node)
+            parts = [
+                self._compare(operator, builder.extract_value(left, i), builder.extract_value(right, i), node)
+                for i in (0, 1)
+            ]
+            return builder.and_(*parts) if operator == "==" else builder.or_(*parts)
+        if _is_float(kind):
+            # NaN is unequal to everything, itself included
+            if operator == "!=":
+                return builder.fcmp_unordered(operator, left, right)
+            return builder.fcmp_ordered(operator, left, right)
+        return builder.icmp_signed(operator, left, right)
+
+    def _concatenate(self, left: ir.Value, right: ir.Value) -> ir.Value:
+        """Copies two strings into a new buffer."""
+        builder = self.builder
+        strlen, memcpy = self._extern("strlen"), self._extern("memcpy")
+        left_size = builder.call(strlen, [left])
+        right_size = builder.call(strlen, [right])
+        size = builder.add(builder.add(left_size, right_size), ir.Constant(_INT64, 1))
+        buffer = builder.call(self._extern("malloc"), [size])
+        builder.call(memcpy, [buffer, left, left_size])
+        # The right string's NUL terminator ends the result
+        builder.call(memcpy, [builder.gep(buffer, [left_size]), right, builder.add(right_size, ir.Constant(_INT64, 1))])
+        return buffer
+
+    def _power_function(self) -> ir.Function:
+        """Returns sigil.ipow, integer exponentiation by squaring, emitting it on first use."""
+        function = self.module.globals.get("sigil.ipow")
+        if function is not None:
+            return function
+        function = ir.Function(self.module, ir.FunctionType(_INT64, [_INT64, _INT64]), name="sigil.ipow")
+        function.linkage = "internal"
+        base, exponent = function.args
+        entry, negative, loop, body, done = (
+            function.append_basic_block(name) for name in ("entry", "negative", "loop", "body", "done")
+        )
+        builder = ir.IRBuilder(entry)
+        zero, one = ir.Constant(_INT64, 0), ir.Constant(_INT64, 1)
+        builder.cbranch(builder.icmp_signed("<", exponent, zero), negative, loop)
+
+        # Like the truncated 1 / base ** -exponent: 0 unless base is 1 or -1
+        builder.position_at_end(negative)
+        odd = builder.trunc(exponent, _BOOL)
+        minus_one = builder.select(odd, ir.Constant(_INT64, -1), one)
+        result = builder.select(builder.icmp_signed("==", base, ir.Constant(_INT64, -1)), minus_one, zero)
+        builder.ret(builder.select(builder.icmp_signed("==", base, one), one, result))
+
+        builder.position_at_end(loop)
+        product = builder.phi(_INT64)
+        factor = builder.phi(_INT64)
+        remaining = builder.phi(_INT64)
+        builder.cbranch(builder.icmp_signed("==", remaining, zero), done, body)
+
+        builder.position_at_end(body)
+        multiplied = builder.select(builder.trunc(remaining, _BOOL), builder.mul(product, factor), product)
+        squared = builder.mul(factor, factor)
+        halved = builder.lshr(remaining, one)
+        builder.branch(loop)
+        for phi, start, following in (
+            (product, one, multiplied),
+            (factor, base, squared),
+            (remaining, exponent, halved),
+        ):
+            phi.add_incoming(start, entry)
+            phi.add_incoming(following, body)
+
+        builder.position_at_end(done)
+        builder.ret(product)
+        return function
+
+    def _hash_function(self) -> ir.Function:
+        """Returns sigil.hash, the FNV-1a hash of a string (see decision.string_hash), emitting it on first use."""
+        function = self.module.globals.get("sigil.hash")
+        if function is not None:
+            return function
+        function = ir.Function(self.module, ir.FunctionType(_INT64, [_STRING]), name="sigil.hash")
+        function.linkage = "internal"
+        (text,) = function.args
+        entry, loop, body, done = (function.append_basic_block(name) for name in ("entry", "loop", "body", "done"))
+        builder = ir.IRBuilder(entry)
+        builder.branch(loop)
+
+        builder.position_at_end(loop)
+        digest = builder.phi(_INT64)
+        pointer = builder.phi(_STRING)
+        byte = builder.load(pointer)
+        builder.cbranch(builder.icmp_signed("==", byte, ir.Constant(_BYTE, 0)), done, body)
+
+        builder.position_at_end(body)
+        mixed = builder.mul(builder.xor(digest, builder.zext(byte, _INT64)), ir.Constant(_INT64, FNV_PRIME))
+        following = builder.gep(pointer, [ir.Constant(_INT64, 1)])
+        builder.branch(loop)
+        digest.add_incoming(ir.Constant(_INT64, signed64(FNV_OFFSET)), entry)
+        digest.add_incoming(mixed, body)
+        pointer.add_incoming(text, entry)
+        pointer.add_incoming(following, body)
+
+        builder.position_at_end(done)
+        builder.ret(digest)
+        return function
@@ -0,0 +1,67 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from src.lexer.constants import ConstantValue
+
+# FNV-1a over UTF-8 bytes; the generated code hashes match subjects with the same function
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+_MASK64 = (1 << 64) - 1
+
+
+def signed64(value: int) -> int:
+    """Reads the low 64 bits of an integer as a two's complement number, like an LLVM i64."""
+    value &= _MASK64
+    return value - (1 << 64) if value >> 63 else value
+
+
+def string_hash(value: str) -> int:
+    """Returns the 64-bit FNV-1a hash of a string's UTF-8 bytes, as a signed integer."""
+    digest = FNV_OFFSET
+    for byte in value.encode("utf-8"):
+        digest = ((digest ^ byte) * FNV_PRIME) & _MASK64
+    return signed64(digest)
+
+
+@dataclass
+class DecisionTree:
+    """
+    The arm a match statement takes for each value of its subject.
+
+    Arms are tested in source order, so a value listed by several arms goes to
+    the first one, and the arms after a wildcard are never taken. Each value
+    is tested once, whatever the number of arms: integer subjects branch on a
+    single switch over cases, string subjects on a switch over the hashes of
+    their cases, and the others compare the cases one by one.
+    """
+
+    # Arm index of each case value, in the order the cases were written
+    cases: dict[ConstantValue, int] = field(default_factory=dict)
+    # Arm index of the first wildcard, or None when unmatched values fall through the match
+    default: int | None = None
+    # Indices of the arms some value reaches, in order
+    reachable: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_arms(cls, arms: Sequence[Sequence[ConstantValue] | None]) -> "DecisionTree":
+        """Builds the tree of the arms' alternative values, None standing for a wildcard arm."""
+        tree = cls()
+        for index, values in enumerate(arms):
+            if values is None:
+                tree.default = index
+                tree.reachable.append(index)
+                break
+            # 1 and true are the same case, like in the switch they become; strings never equal numbers
+            new = [value for value in values if value not in tree.cases]
+            for value in new:
+                tree.cases[value] = index
+            if new:
+                tree.reachable.append(index)
+        return tree
+
+    def buckets(self) -> dict[int, list[tuple[str, int]]]:
+        """Groups string cases by hash, each with its arm index; colliding strings share a bucket."""
+        buckets: dict[int, list[tuple[str, int]]] = {}
+        for value, arm in self.cases.items():
+            buckets.setdefault(string_hash(str(value)), []).append((str(value), arm))
+        return buckets
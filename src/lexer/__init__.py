@@ -1,7 +1,15 @@
-from src.lexer.lexer import (
-    Lexer,
+from src.lexer.constants import POOLED_CODES, ConstantPool, decode_literal  # noqa
+from src.lexer.incremental import IncrementalLexer, LexerEdit  # noqa
+from src.lexer.lexer import Lexer  # noqa
+from src.lexer.scanner import TableLexer  # noqa
+from src.lexer.spans import SpanLexer  # noqa
+from src.lexer.symbols import KEYWORD_TABLE, WORD_CODES, SymbolInterner  # noqa
+from src.lexer.token import (  # noqa
+    TOKEN_KINDS,
+    SpanTokenBuffer,
     Token,
     TokenAnnotationTypes,
+    TokenBuffer,
     TokenDelimiter,
     TokenIdentifier,
     TokenIndentation,
@@ -10,4 +18,7 @@ from src.lexer.lexer import (
     TokenLiteral,
     TokenOperator,
     TokenType,
-)  # noqa
+    TokenView,
+    kind_mask,
+    mask_kinds,
+)
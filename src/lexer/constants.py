@@ -0,0 +1,108 @@
+import unicodedata
+from collections.abc import Iterator
+
+from src.lexer.token import TokenLiteral, TokenType
+
+# Literal kinds whose values are decoded into the constant pool
+POOLED_LITERALS: tuple[TokenLiteral, ...] = (
+    TokenLiteral.INTEGER,
+    TokenLiteral.FLOAT,
+    TokenLiteral.COMPLEX,
+    TokenLiteral.BOOLEAN,
+    TokenLiteral.STRING,
+)
+# Kind codes are compared instead of kinds, since kinds of different enums with equal values compare equal
+POOLED_CODES = frozenset(kind.code for kind in POOLED_LITERALS)
+
+ConstantValue = int | float | complex | bool | str
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", "'": "'", "`": "`", "{": "{", "}": "}"}
+
+
+def _decode_real(lexeme: str) -> int | float:
+    """Decodes an integer or float lexeme, including the forms the lexer accepts and Python does not."""
+    number = lexeme.replace("_", "")
+    if not number.isascii():
+        # The lexer takes any Unicode digit, int() and float() only decimal ones (not e.g. '²')
+        number = "".join(str(unicodedata.digit(ch)) if ch.isdigit() else ch for ch in number)
+    if number.isdigit():
+        return int(number)
+    if number[-1] in "eE+-":
+        number += "0"  # An empty exponent, as in '1e' or '1e+'
+    return float(number)
+
+
+def _decode_string(lexeme: str) -> str:
+    """Resolves backslash escapes; unknown escapes are kept as written."""
+    if "\\" not in lexeme:
+        return lexeme
+    chars: list[str] = []
+    i, L = 0, len(lexeme)
+    while i < L:
+        ch = lexeme[i]
+        if ch == "\\" and i + 1 < L:
+            escaped = lexeme[i + 1]
+            chars.append(_ESCAPES.get(escaped, ch + escaped))
+            i += 2
+        else:
+            chars.append(ch)
+            i += 1
+    return "".join(chars)
+
+
+def decode_literal(token_type: TokenType, lexeme: str) -> ConstantValue:
+    """Decodes the lexeme of a pooled literal kind into its Python value."""
+    code = token_type.code
+    if code == TokenLiteral.STRING.code:
+        return _decode_string(lexeme)
+    if code == TokenLiteral.BOOLEAN.code:
+        return lexeme == "true"
+    if code == TokenLiteral.COMPLEX.code:
+        return complex(0, _decode_real(lexeme[:-1]))
+    if code in POOLED_CODES:
+        return _decode_real(lexeme)
+    raise ValueError(f"{token_type!r} literals are not pooled")
+
+
+class ConstantPool:
+    """
+    Deduplicated storage of decoded literal values.
+
+    Each distinct value is decoded once and addressed by its index, which
+    tokens and AST nodes carry instead of re-parsing their text. Values are
+    keyed together with their type, so 1, 1.0 and true stay distinct entries.
+    """
+
+    def __init__(self) -> None:
+        self._values: list[ConstantValue] = []
+        self._index: dict[tuple[type, ConstantValue], int] = {}
+        self._lexemes: dict[tuple[int, str], int] = {}  # Shortcut for lexemes already decoded
+
+    def add(self, token_type: TokenType, lexeme: str) -> int:
+        """Decodes a literal lexeme and returns the index of its value."""
+        key = (token_type.code, lexeme)
+        index = self._lexemes.get(key)
+        if index is None:
+            index = self._lexemes[key] = self.intern(decode_literal(token_type, lexeme))
+        return index
+
+    def intern(self, value: ConstantValue) -> int:
+        """Returns the index of a value, adding it to the pool if needed."""
+        key = (type(value), value)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self._values)
+            self._values.append(value)
+        return index
+
+    def __getitem__(self, index: int) -> ConstantValue:
+        return self._values[index]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[ConstantValue]:
+        return iter(self._values)
+
+    def __repr__(self) -> str:
+        return f"ConstantPool({self._values!r})"
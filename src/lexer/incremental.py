@@ -0,0 +1,159 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.lexer.constants import ConstantPool
+from src.lexer.lexer import Lexer
+from src.lexer.symbols import SymbolInterner
+from src.lexer.token import Token
+
+
+@dataclass
+class LexerEdit:
+    """The outcome of an IncrementalLexer edit: tokens[start:new_end] replaced previous[start:old_end]."""
+
+    tokens: list[Token]
+    start: int
+    old_end: int
+    new_end: int
+    errors: list[Exception]
+
+
+class IncrementalLexer:
+    """
+    Keeps a file tokenized across edits, re-lexing only the lines that changed.
+
+    The indentation stack is the only state carried from one line to the next,
+    so it is snapshotted before every line. After an edit the new lines are
+    tokenized from the snapshot of the first edited line, and lexing continues
+    over the following lines only until the indentation stack matches the old
+    snapshot again. Tokens after that point are reused, shifted by the number
+    of inserted or removed lines.
+
+    Errors are returned instead of raised, since an editor is expected to keep
+    editing an invalid file.
+    """
+
+    def __init__(self, filename: str, lines: Iterable[str], lexer_cls: type[Lexer] = Lexer):
+        self._filename = filename
+        self._lexer_cls = lexer_cls
+        self._lines: list[str] = []
+        self._tokens: list[Token] = []
+        self._starts: list[int] = [0]  # First token of each line, then of the end-of-input tokens
+        self._stacks: list[tuple[int, ...]] = [(0,)]  # Indentation stack before each line, then at the end
+        self._line_errors: list[list[Exception]] = []
+        self._constants = ConstantPool()  # Shared by every re-lex, so constant indices stay valid
+        self._symbols = SymbolInterner()  # Likewise for symbol IDs
+        self._splice(0, 0, [line.rstrip("\r\n") for line in lines])
+
+    @property
+    def tokens(self) -> list[Token]:
+        return self._tokens
+
+    @property
+    def lines(self) -> list[str]:
+        return self._lines
+
+    @property
+    def constants(self) -> ConstantPool:
+        return self._constants
+
+    @property
+    def symbols(self) -> SymbolInterner:
+        return self._symbols
+
+    @property
+    def errors(self) -> list[Exception]:
+        """Errors of the current lines (messages keep the line numbers they were reported with)."""
+        return [error for errors in self._line_errors for error in errors]
+
+    def edit(self, start_line: int, end_line: int, new_text: str) -> LexerEdit:
+        """
+        Replaces lines start_line..end_line (1-based, inclusive) with the lines of new_text.
+
+        Use end_line = start_line - 1 to insert before start_line, and an empty
+        new_text to delete the range.
+        """
+        if not 1 <= start_line <= len(self._lines) + 1 or not start_line - 1 <= end_line <= len(self._lines):
+            raise ValueError(f"Invalid edit range {start_line}..{end_line} for {len(self._lines)} lines")
+        return self._splice(start_line - 1, end_line - start_line + 1, new_text.splitlines())
+
+    def _splice(self, first: int, old_count: int, new_lines: list[str]) -> LexerEdit:
+        """Replaces old_count lines from index first with new_lines and re-lexes what changed."""
+        old_stop = first + old_count
+        old_total = len(self._lines)
+        line_delta = len(new_lines) - old_count
+
+        lexer = self._lexer_cls(filename=self._filename, symbols=self._symbols)
+        lexer._indent_stack = list(self._stacks[first])
+        lexer._constants = self._constants
+        region_starts: list[int] = []
+        region_stacks: list[tuple[int, ...]] = []
+        region_errors: list[list[Exception]] = []
+
+        def relex(line_number: int, line: str) -> None:
+            region_starts.append(len(lexer._tokens))
+            region_stacks.append(tuple(lexer._indent_stack))
+            error_count = len(lexer._errors)
+            lexer._tokenize_source_line(line_number, line)
+            region_errors.append(lexer._errors[error_count:])
+
+        for offset, line in enumerate(new_lines):
+            relex(first + offset + 1, line)
+
+        # Continue until the indentation state converges with the old stream again
+        j = old_stop
+        while j < old_total and tuple(lexer._indent_stack) != self._stacks[j]:
+            relex(j + line_delta + 1, self._lines[j])
+            j += 1
+
+        reached_end = j == old_total
+        token_start = self._starts[first]
+        if reached_end:
+            region_starts.append(len(lexer._tokens))
+            region_stacks.append(tuple(lexer._indent_stack))
+            lexer._line_number = old_total + line_delta
+            lexer._tokenize_end_of_input()
+            old_end = len(self._tokens)
+        else:
+            old_end = self._starts[j]
+
+        region = lexer._tokens
+        token_delta = len(region) - (old_end - token_start)
+        relexed_lines = len(new_lines) + (j - old_stop)
+
+        if line_delta and not reached_end:
+            tail = [
+                Token(
+                    token.filename,
+                    token.line + line_delta,
+                    token.column,
+                    token.type,
+                    token.value,
+                    token.const,
+                    token.symbol,
+                )
+                for token in self._tokens[old_end:]
+            ]
+            self._tokens[token_start:] = region + tail
+        else:
+            self._tokens[token_start:old_end] = region
+
+        self._lines[first:old_stop] = new_lines
+        self._line_errors[first:j] = region_errors
+        if reached_end:
+            self._starts[first:] = [token_start + start for start in region_starts]
+            self._stacks[first:] = region_stacks
+        else:
+            self._starts[first:j] = [token_start + start for start in region_starts]
+            self._stacks[first:j] = region_stacks
+            if token_delta:
+                rest = first + relexed_lines
+                self._starts[rest:] = [start + token_delta for start in self._starts[rest:]]
+
+        return LexerEdit(
+            tokens=self._tokens,
+            start=token_start,
+            old_end=old_end,
+            new_end=token_start + len(region),
+            errors=[error for errors in region_errors for error in errors],
+        )
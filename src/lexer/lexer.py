@@ -1,11 +1,20 @@
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from os import PathLike
+from pathlib import Path
+from typing import Any, Self
+
+from src.lexer.constants import POOLED_CODES, ConstantPool
+from src.lexer.source import iter_mapped_lines
+from src.lexer.symbols import WORD_CODES, SymbolInterner
 from src.lexer.token import (
+    TOKEN_KINDS,
     Token,
-    TokenAnnotationTypes,
     TokenDelimiter,
-    TokenIdentifier,
     TokenIndentation,
-    TokenKeyword,
-    TokenKeywordSpecial,
     TokenLiteral,
     TokenOperator,
     TokenType,
@@ -69,25 +78,88 @@ OP_MAP: dict[str, TokenOperator | TokenDelimiter | TokenLiteral] = {
 }
 
 
-# Map special keywords (non-ASCII) to TokenKeywordSpecial
-KEYWORD_SPECIAL_MAP: dict[str, TokenKeywordSpecial] = {
-    "λ": TokenKeywordSpecial.LAMBDA_SPECIAL,
-    "Λ": TokenKeywordSpecial.LAMBDA_SPECIAL,
-}
+# Inputs with fewer lines are always tokenized in a single process
+PARALLEL_THRESHOLD = 20_000
+
+
+@dataclass(slots=True)
+class _LexedChunk:
+    """Tokens of a run of lines lexed by a worker, in a compact picklable form."""
+
+    leading_spaces: array = field(default_factory=lambda: array("i"))  # -1 for blank lines
+    token_counts: array = field(default_factory=lambda: array("I"))
+    columns: array = field(default_factory=lambda: array("i"))
+    kinds: array = field(default_factory=lambda: array("B"))
+    values: list[str] = field(default_factory=list)
+    errors: dict[int, list[Exception]] = field(default_factory=dict)
+
+
+def _tokenize_chunk(lexer_cls: type["Lexer"], filename: str, first_line_number: int, lines: list[str]) -> _LexedChunk:
+    """Tokenizes the content of each line independently, leaving indentation to the caller."""
+    lexer = lexer_cls(filename=filename)
+    chunk = _LexedChunk()
+    for offset, line in enumerate(lines):
+        lexer._line_number = first_line_number + offset
+        leading_spaces = lexer._leading_spaces(line)
+        lexer._tokenize_content(line, leading_spaces)
+        chunk.leading_spaces.append(leading_spaces)
+        chunk.token_counts.append(len(lexer._tokens))
+        for token in lexer._tokens:
+            chunk.columns.append(token.column)
+            chunk.kinds.append(token.type.code)
+            chunk.values.append(token.value)
+        lexer._tokens.clear()
+        if lexer._errors:
+            chunk.errors[offset] = lexer._errors
+            lexer._errors = []
+    return chunk
 
 
 class Lexer:
     """A simple lexer for the Sigil programming language."""
 
-    def __init__(self, filename: str, lines: list[str]):
+    def __init__(
+        self,
+        filename: str,
+        lines: Iterable[str] = (),
+        parallel: int = 1,
+        parallel_threshold: int = PARALLEL_THRESHOLD,
+        symbols: SymbolInterner | None = None,
+    ):
         self._lines = lines
         self._filename = filename
+        # Number of worker processes used by tokenize() on inputs of at least parallel_threshold lines
+        self._parallel = parallel
+        self._parallel_threshold = parallel_threshold
         self._line_number = 0
         self._tokens: list[Token] = []
         self._indent_stack = [0]  # Stack to manage indentation levels
         self._errors: list[Exception] = []
+        self._constants = ConstantPool()
+        # Shared with the later stages of a compilation session when given
+        self._symbols = symbols if symbols is not None else SymbolInterner()
         self._prepare_operator_tables()
-        self._prepare_keyword_tables()
+
+    @classmethod
+    def from_path(cls, path: str | PathLike[str], **options: Any) -> Self:
+        """
+        Creates a lexer that reads a UTF-8 file through a memory map.
+
+        Lines are decoded lazily as the lexer consumes them, so neither the
+        whole source text nor a list of its lines is ever built.
+        """
+        path = Path(path)
+        return cls(filename=path.name, lines=iter_mapped_lines(path), **options)
+
+    @property
+    def constants(self) -> ConstantPool:
+        """Decoded values of the literals tokenized so far, indexed by Token.const."""
+        return self._constants
+
+    @property
+    def symbols(self) -> SymbolInterner:
+        """Interner of the identifier and keyword spellings, indexed by Token.symbol."""
+        return self._symbols
 
     def _prepare_operator_tables(self):
         """Pre-sorts operators for maximal munch matching."""
@@ -95,25 +167,15 @@ class Lexer:
         self._operators.sort(key=len, reverse=True)
         self._op_first_chars = {op[0] for op in self._operators}
 
-    def _prepare_keyword_tables(self):
-        """Prepares keyword mapping for quick lookup."""
-        self._keywords_special = list(KEYWORD_SPECIAL_MAP.keys())
-        self._keywords_special.sort(key=len, reverse=True)
-        # Create a set for O(1) lookup
-        self._regular_keywords = {kw.name for kw in TokenKeyword}
-        self._annotation_types = {at.name for at in TokenAnnotationTypes}
-
     def _add_token(self, token_type: TokenType, value: str, column: int):
-        """Helper to create and append a token."""
-        self._tokens.append(
-            Token(
-                filename=self._filename,
-                line=self._line_number,
-                column=column,
-                type=token_type,
-                value=value,
-            )
-        )
+        """Helper to create and append a token that is neither a literal nor a word, like operators and layout."""
+        # Positional arguments, since this runs for most tokens
+        self._tokens.append(Token(self._filename, self._line_number, column, token_type, value))
+
+    def _add_literal(self, token_type: TokenType, value: str, column: int, symbol: int = -1):
+        """Appends a literal or word token, decoding its value into the constant pool when it is a pooled literal."""
+        const = self._constants.add(token_type, value) if token_type.code in POOLED_CODES else -1
+        self._tokens.append(Token(self._filename, self._line_number, column, token_type, value, const, symbol))
 
     def _is_ident_start(self, ch: str) -> bool:
         return ch.isalpha() or ch == "_" or ord(ch) > 127
@@ -124,19 +186,6 @@ class Lexer:
     def _is_operator_start(self, ch: str) -> bool:
         return ch in self._op_first_chars
 
-    def _match_regular_keyword(
-        self, lexeme: str
-    ) -> TokenKeyword | TokenKeywordSpecial | TokenIdentifier | TokenAnnotationTypes:
-        """Records regular keywords and identifiers."""
-        w = lexeme.upper()
-        if w in self._regular_keywords:
-            return TokenKeyword[w]
-        elif w in self._annotation_types:
-            return TokenAnnotationTypes[w]
-        elif lexeme in self._keywords_special:
-            return KEYWORD_SPECIAL_MAP[lexeme]
-        return TokenIdentifier.IDENTIFIER
-
     def _match_operator(self, line: str, i: int):
         """Finds the longest matching operator at the current position."""
         if not self._is_operator_start(line[i]):
@@ -146,14 +195,6 @@ class Lexer:
                 return op, i + len(op)
         return None
 
-    def _match_special_literal(self, lexeme: str) -> TokenLiteral | None:
-        """Records special literals like booleans, None."""
-        if lexeme in {"true", "false"}:
-            return TokenLiteral.BOOLEAN
-        elif lexeme == "none":
-            return TokenLiteral.NONE
-        return None
-
     def _match_integer_literal(self, lexeme: str) -> TokenLiteral | None:
         """Records integer literals, allowing underscores for readability."""
         number = lexeme.replace("_", "")
@@ -204,9 +245,7 @@ class Lexer:
 
         while i < L:
             ch = line[i]
-            if ch.isdigit():
-                i += 1
-            elif ch == "_":
+            if ch.isdigit() or ch == "_":
                 i += 1
             elif ch == "." and not has_dot and not has_e:
                 # Avoid matching '...' operator
@@ -263,8 +302,7 @@ class Lexer:
                     return line[start : i - 1], i
                 else:
                     i += 1
-            else:
-                self._errors.append(SyntaxError("Unterminated string literal"))
+            self._errors.append(SyntaxError("Unterminated string literal"))
         return None
 
     def _match_string_interpolation(self, i: int, line: str) -> tuple[str, int] | None:
@@ -282,8 +320,7 @@ class Lexer:
                     return line[start:i], i + 1  # Include closing `
                 else:
                     i += 1
-            else:
-                self._errors.append(SyntaxError("Unterminated string interpolation"))
+            self._errors.append(SyntaxError("Unterminated string interpolation"))
         return None
 
     def _match_string_interpolation_internals(self, lexeme: str) -> list[tuple[str, int, bool]]:
@@ -316,6 +353,33 @@ class Lexer:
             identifiers.append(("".join(string), column, True))
         return identifiers
 
+    def _add_string_interpolation(self, lexeme: str, i: int, new_i: int, leading_spaces: int) -> None:
+        """Records the tokens of a string interpolation spanning line[i:new_i]."""
+        self._add_token(TokenDelimiter.BACKSTICK, "`", leading_spaces + i)
+        self._add_token(TokenLiteral.STRING_TEMPLATE, lexeme, leading_spaces + new_i + 1)
+        if lexeme:
+            # Find identifiers inside {}
+            tokens = self._match_string_interpolation_internals(lexeme)
+            if tokens:
+                for token, space, is_raw_string in tokens:
+                    # We have something like {} in the string
+                    if not token:
+                        self._add_literal(TokenLiteral.STRING, "", leading_spaces + space + 1)
+                    else:
+                        if is_raw_string:
+                            # We have a raw string inside {}
+                            self._add_literal(TokenLiteral.STRING, token, leading_spaces + space + 1)
+                        else:
+                            # We have an identifier or expression inside {}
+                            self._tokenize_line(token, leading_spaces + space + 1)
+            # We have a plain string without {}
+            else:
+                self._add_literal(TokenLiteral.STRING, lexeme, leading_spaces + new_i + 1)
+        # We have an empty interpolation ``
+        else:
+            self._add_literal(TokenLiteral.STRING, "", leading_spaces + i + 1)
+        self._add_token(TokenDelimiter.BACKSTICK, "`", leading_spaces + new_i - 2)
+
     def _tokenize_line(self, line: str, leading_spaces: int) -> None:
         """Tokenizes a single line of code."""
         i, L = 0, len(line)
@@ -335,30 +399,7 @@ class Lexer:
             string_interp_result = self._match_string_interpolation(i, line)
             if string_interp_result is not None:
                 lexeme, new_i = string_interp_result
-                self._add_token(TokenDelimiter.BACKSTICK, "`", leading_spaces + i)
-                self._add_token(TokenLiteral.STRING_TEMPLATE, lexeme, leading_spaces + new_i + 1)
-                if lexeme:
-                    # Find identifiers inside {}
-                    tokens = self._match_string_interpolation_internals(lexeme)
-                    if tokens:
-                        for token, space, is_raw_string in tokens:
-                            # We have something like {} in the string
-                            if not token:
-                                self._add_token(TokenLiteral.STRING, "", leading_spaces + space + 1)
-                            else:
-                                if is_raw_string:
-                                    # We have a raw string inside {}
-                                    self._add_token(TokenLiteral.STRING, token, leading_spaces + space + 1)
-                                else:
-                                    # We have an identifier or expression inside {}
-                                    self._tokenize_line(token, leading_spaces + space + 1)
-                    # We have a plain string without {}
-                    else:
-                        self._add_token(TokenLiteral.STRING, lexeme, leading_spaces + new_i + 1)
-                # We have an empty interpolation ``
-                else:
-                    self._add_token(TokenLiteral.STRING, "", leading_spaces + i + 1)
-                self._add_token(TokenDelimiter.BACKSTICK, "`", leading_spaces + new_i - 2)
+                self._add_string_interpolation(lexeme, i, new_i, leading_spaces)
                 i = new_i
                 continue
 
@@ -366,7 +407,7 @@ class Lexer:
             string_literal_result = self._match_string_literal(i, line)
             if string_literal_result is not None:
                 lexeme, new_i = string_literal_result
-                self._add_token(TokenLiteral.STRING, lexeme, leading_spaces + i)
+                self._add_literal(TokenLiteral.STRING, lexeme, leading_spaces + i)
                 i = new_i
                 continue
 
@@ -375,7 +416,7 @@ class Lexer:
                 num_result = self._match_numeric_literal(i, line)
                 if num_result:
                     token_type, lexeme, new_i = num_result
-                    self._add_token(token_type, lexeme, leading_spaces + i)
+                    self._add_literal(token_type, lexeme, leading_spaces + i)
                     i = new_i
                     continue
 
@@ -388,19 +429,15 @@ class Lexer:
 
                 column = leading_spaces + i - len(lexeme)
 
-                token_type = self._match_special_literal(lexeme)
-                if token_type is not None:
-                    self._add_token(token_type, lexeme, column)
-                    continue
-
-                if lexeme and lexeme[0].isdigit():
+                # Each spelling is classified once, when it is first interned
+                symbol, word_type = self._symbols.lookup(lexeme)
+                if lexeme[0].isdigit():
                     self._errors.append(
                         SyntaxError(
                             f"Invalid identifier starting with a digit: '{lexeme}' at {self._filename}:{self._line_number}:{column + 1}"
                         )
                     )
-                token_type = self._match_regular_keyword(lexeme)
-                self._add_token(token_type, lexeme, column)
+                self._add_literal(word_type, lexeme, column, symbol)
                 continue
 
             # Operators and Delimiters
@@ -419,54 +456,132 @@ class Lexer:
             )
             i += 1
 
-    def tokenize(self):
-        """Tokenizes the input lines into a list of tokens."""
-        for line_number, raw_line in enumerate(self._lines, 1):
-            self._line_number = line_number
-            line = raw_line
-
-            # Tabs are not allowed anywhere on the line
-            if "\t" in line:
-                self._errors.append(IndentationError(f"Tabs are not allowed. (line {line_number})"))
-
-            # Find first non-space character
-            i = 0
-            while i < len(line) and line[i] == " ":
-                i += 1
-
-            # Skip blank lines and comment-only lines
-            if i >= len(line) or (i < len(line) and line[i] == "#"):
-                self._add_token(TokenIndentation.NEWLINE, "\n", len(line) + 1)
-                continue
+    @staticmethod
+    def _leading_spaces(line: str, start: int = 0, end: int | None = None) -> int:
+        """Counts the indentation of line[start:end], or returns -1 for blank and comment-only lines."""
+        end = len(line) if end is None else end
+        # Find first non-space character
+        i = start
+        while i < end and line[i] == " ":
+            i += 1
 
-            leading_spaces = i
+        # Skip blank lines and comment-only lines
+        if i >= end or line[i] == "#":
+            return -1
+        return i - start
 
-            # Handle INDENT/DEDENT (spaces only)
-            if leading_spaces > self._indent_stack[-1]:
-                self._indent_stack.append(leading_spaces)
-                self._add_token(TokenIndentation.INDENT, " " * leading_spaces, 1)
+    def _check_tabs(self, line_number: int, line: str, start: int = 0, end: int | None = None) -> None:
+        # Tabs are not allowed anywhere on the line
+        if line.find("\t", start, end) >= 0:
+            self._errors.append(IndentationError(f"Tabs are not allowed. (line {line_number})"))
 
-            while leading_spaces < self._indent_stack[-1]:
-                self._indent_stack.pop()
-                self._add_token(TokenIndentation.DEDENT, "", 1)
+    def _tokenize_indentation(self, line_number: int, leading_spaces: int) -> None:
+        """Records the INDENT/DEDENT tokens of a line starting at leading_spaces."""
+        # Handle INDENT/DEDENT (spaces only)
+        if leading_spaces > self._indent_stack[-1]:
+            self._indent_stack.append(leading_spaces)
+            self._add_token(TokenIndentation.INDENT, " " * leading_spaces, 1)
 
-            if leading_spaces != self._indent_stack[-1]:
-                self._errors.append(
-                    IndentationError(f"Unindent does not match any outer indentation level. (line {line_number})")
-                )
+        while leading_spaces < self._indent_stack[-1]:
+            self._indent_stack.pop()
+            self._add_token(TokenIndentation.DEDENT, "", 1)
 
-            # Tokenize the actual line content (without leading indentation)
-            content = line[leading_spaces:]
-            self._tokenize_line(content, leading_spaces=leading_spaces)
-            self._add_token(TokenIndentation.NEWLINE, "\n", len(line) - 1)
+        if leading_spaces != self._indent_stack[-1]:
+            self._errors.append(
+                IndentationError(f"Unindent does not match any outer indentation level. (line {line_number})")
+            )
 
-        # Close remaining indentations
+    def _tokenize_content(self, line: str, leading_spaces: int) -> None:
+        """Tokenizes a line after its indentation, up to and including its NEWLINE."""
+        if leading_spaces < 0:
+            self._add_token(TokenIndentation.NEWLINE, "\n", len(line) + 1)
+            return
+
+        # Tokenize the actual line content (without leading indentation)
+        content = line[leading_spaces:]
+        self._tokenize_line(content, leading_spaces=leading_spaces)
+        self._add_token(TokenIndentation.NEWLINE, "\n", len(line) - 1)
+
+    def _tokenize_source_line(self, line_number: int, line: str) -> None:
+        """Tokenizes one physical line, including its indentation tokens."""
+        self._line_number = line_number
+        self._check_tabs(line_number, line)
+        leading_spaces = self._leading_spaces(line)
+        if leading_spaces >= 0:
+            self._tokenize_indentation(line_number, leading_spaces)
+        self._tokenize_content(line, leading_spaces)
+
+    def _tokenize_end_of_input(self) -> None:
+        """Closes remaining indentations and records the EOF token."""
         while len(self._indent_stack) > 1:
             self._indent_stack.pop()
             self._add_token(TokenIndentation.DEDENT, "", 1)
 
         self._add_token(TokenIndentation.EOF, "", 1)
 
+    def iter_tokens(self, lines: Iterable[str] | None = None) -> Iterator[Token]:
+        """
+        Lazily tokenizes lines, yielding tokens as each line is processed.
+
+        Accepts any iterable of lines (e.g. an open file), defaulting to the lines
+        given to the constructor. Only the tokens of the current line are held in
+        memory. Lexing errors are raised once the EOF token has been yielded.
+        """
+        for line_number, raw_line in enumerate(self._lines if lines is None else lines, 1):
+            self._tokenize_source_line(line_number, raw_line.rstrip("\r\n"))
+            yield from self._tokens
+            self._tokens.clear()
+
+        self._tokenize_end_of_input()
+        yield from self._tokens
+        self._tokens.clear()
+
+        if self._errors:
+            raise ExceptionGroup("Lexing errors occurred", self._errors)
+
+    def _tokenize_parallel(self, lines: list[str]) -> None:
+        """
+        Tokenizes chunks of lines in worker processes and stitches them together.
+
+        Line contents are lexed independently by the workers; a single sequential
+        pass then rebuilds INDENT/DEDENT tokens from the per-line indentation and
+        restores the token and error order of the sequential lexer.
+        """
+        chunk_size = -(-len(lines) // (self._parallel * 4))
+        first_line_numbers = range(1, len(lines) + 1, chunk_size)
+        chunks = (lines[number - 1 : number - 1 + chunk_size] for number in first_line_numbers)
+        filename, constants, symbols = self._filename, self._constants, self._symbols
+        with ProcessPoolExecutor(max_workers=self._parallel) as executor:
+            results = executor.map(_tokenize_chunk, repeat(type(self)), repeat(filename), first_line_numbers, chunks)
+            for first_line_number, chunk in zip(first_line_numbers, results):
+                columns, kinds, values = chunk.columns, chunk.kinds, chunk.values
+                start = 0
+                for offset, leading_spaces in enumerate(chunk.leading_spaces):
+                    line_number = first_line_number + offset
+                    self._line_number = line_number
+                    self._check_tabs(line_number, lines[line_number - 1])
+                    if leading_spaces >= 0:
+                        self._tokenize_indentation(line_number, leading_spaces)
+                    end = start + chunk.token_counts[offset]
+                    for k in range(start, end):
+                        kind, value = TOKEN_KINDS[kinds[k]], values[k]
+                        const = constants.add(kind, value) if kinds[k] in POOLED_CODES else -1
+                        symbol = symbols.intern(value) if kinds[k] in WORD_CODES else -1
+                        self._tokens.append(Token(filename, line_number, columns[k], kind, value, const, symbol))
+                    start = end
+                    self._errors.extend(chunk.errors.get(offset, ()))
+
+    def tokenize(self):
+        """Tokenizes the input lines into a list of tokens."""
+        lines = self._lines
+        if self._parallel > 1 and isinstance(lines, Sequence) and len(lines) >= self._parallel_threshold:
+            self._tokenize_parallel([line.rstrip("\r\n") for line in lines])
+        else:
+            for line_number, raw_line in enumerate(lines, 1):
+                self._tokenize_source_line(line_number, raw_line.rstrip("\r\n"))
+
+        self._tokenize_end_of_input()
+
         if self._errors:
             raise ExceptionGroup("Lexing errors occurred", self._errors)
 
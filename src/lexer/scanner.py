@@ -0,0 +1,304 @@
+import re
+
+from src.lexer.lexer import OP_MAP, Lexer
+from src.lexer.token import (
+    TokenDelimiter,
+    TokenLiteral,
+    TokenType,
+)
+
+# Scanner states selected by the first character of a lexeme
+_S_SPACE = 0
+_S_IDENT = 1
+_S_OPERATOR = 2
+_S_DIGIT = 3
+_S_DOT = 4
+_S_QUOTE = 5
+_S_BACKTICK = 6
+_S_COMMENT = 7
+_S_UNKNOWN = 8
+_S_SINGLE = 9
+
+
+def _build_dispatch_table() -> dict[str, int]:
+    """Classifies every ASCII character into the scanner state it starts."""
+    op_first_chars = {op[0] for op in OP_MAP}
+    # Operators that are never the prefix of a longer one need no DFA walk
+    single_chars = {op for op in OP_MAP if len(op) == 1 and not any(o.startswith(op) and o != op for o in OP_MAP)}
+    table: dict[str, int] = {}
+    for ch in map(chr, range(128)):
+        if ch.isspace():
+            table[ch] = _S_SPACE
+        elif ch == "#":
+            table[ch] = _S_COMMENT
+        elif ch == "`":
+            table[ch] = _S_BACKTICK
+        elif ch == "'":
+            table[ch] = _S_QUOTE
+        elif ch.isdigit():
+            table[ch] = _S_DIGIT
+        elif ch == ".":
+            table[ch] = _S_DOT
+        elif ch.isalpha() or ch == "_":
+            table[ch] = _S_IDENT
+        elif ch in single_chars:
+            table[ch] = _S_SINGLE
+        elif ch in op_first_chars:
+            table[ch] = _S_OPERATOR
+        else:
+            table[ch] = _S_UNKNOWN
+    return table
+
+
+def _build_operator_dfa() -> tuple[list[dict[str, int]], list[TokenType | None]]:
+    """Builds a trie-shaped DFA over OP_MAP; state 0 is the start state."""
+    transitions: list[dict[str, int]] = [{}]
+    accepting: list[TokenType | None] = [None]
+    for lexeme, token_type in OP_MAP.items():
+        state = 0
+        for ch in lexeme:
+            next_state = transitions[state].get(ch)
+            if next_state is None:
+                next_state = len(transitions)
+                transitions[state][ch] = next_state
+                transitions.append({})
+                accepting.append(None)
+            state = next_state
+        accepting[state] = token_type
+    return transitions, accepting
+
+
+def _interpolation_segments(text: str, start: int, end: int) -> list[tuple[int, int, int, bool]]:
+    """
+    Splits the interpolation body text[start:end] like Lexer._match_string_interpolation_internals.
+
+    Returns (start, end, column, is_raw_string) for each raw string and each
+    whitespace-stripped expression inside braces, as offsets into text.
+    """
+    segments: list[tuple[int, int, int, bool]] = []
+    column, lbrace, open_bracket = 0, 0, False
+    raw_start = -1  # Start of the pending raw string, if any
+    for i in range(start, end):
+        ch = text[i]
+        escaped = i > start and text[i - 1] == "\\"
+        if ch == "{" and not escaped:
+            lbrace, open_bracket = i, True
+            if raw_start >= 0:
+                segments.append((raw_start, i, column, True))
+                raw_start = -1
+        elif not open_bracket:
+            if raw_start < 0:
+                raw_start = i
+        elif ch == "}" and not escaped:
+            expr_start, expr_end = lbrace + 1, i
+            while expr_start < expr_end and text[expr_start].isspace():
+                expr_start += 1
+            while expr_end > expr_start and text[expr_end - 1].isspace():
+                expr_end -= 1
+            segments.append((expr_start, expr_end, column, False))
+            column, open_bracket = i - start, False
+    if open_bracket:
+        # An unclosed { is kept as raw text, unless it opens the body
+        segment_start = lbrace if lbrace > start else end
+        segments.append((segment_start, end, column, True))
+    elif raw_start >= 0:
+        segments.append((raw_start, end, column, True))
+    return segments
+
+
+_DISPATCH = _build_dispatch_table()
+_OP_TRANSITIONS, _OP_ACCEPTING = _build_operator_dfa()
+_IDENT_RUN = re.compile(r"[0-9A-Za-z_\x80-\U0010ffff]*")
+_STRING_BODY = re.compile(r"[^'\\]*(?:\\.[^'\\]*)*'", re.DOTALL)
+_BACKSTICK = TokenDelimiter.BACKSTICK
+
+
+class TableLexer(Lexer):
+    """
+    A table-driven variant of the Sigil lexer.
+
+    The dispatch and operator tables are generated once at import time from
+    OP_MAP, and words are classified by the session's SymbolInterner. Each lexeme is
+    routed on its first character to a specialised state machine instead of
+    trying every matcher in turn. The token stream is identical to Lexer's.
+    """
+
+    def _tokenize_line(self, line: str, leading_spaces: int) -> None:
+        self._scan(line, 0, len(line), leading_spaces)
+
+    def _scan(self, text: str, i: int, end: int, column_offset: int) -> None:
+        """Tokenizes text[i:end], reporting columns as column_offset + index."""
+        # Interpolation segments report columns relative to where the scan started
+        origin_column = column_offset + i
+        dispatch = _DISPATCH
+        add_lexeme = self._add_lexeme
+        while i < end:
+            ch = text[i]
+            state = dispatch.get(ch)
+            if state is None:
+                # Non-ASCII: whitespace, digits, then identifier parts
+                if ch.isspace():
+                    i += 1
+                    continue
+                state = _S_DIGIT if ch.isdigit() else _S_IDENT
+
+            if state == _S_SPACE:
+                i += 1
+            elif state == _S_IDENT:
+                i = self._scan_word(text, i, end, column_offset)
+            elif state == _S_SINGLE:
+                add_lexeme(OP_MAP[ch], text, i, i + 1, column_offset + i)
+                i += 1
+            elif state == _S_OPERATOR:
+                i = self._scan_operator(text, i, end, column_offset)
+            elif state == _S_DIGIT:
+                new_i = self._scan_number(text, i, end, column_offset)
+                i = new_i if new_i is not None else self._scan_word(text, i, end, column_offset)
+            elif state == _S_DOT:
+                new_i = None
+                if i + 1 < end and text[i + 1].isdigit():
+                    new_i = self._scan_number(text, i, end, column_offset)
+                i = new_i if new_i is not None else self._scan_operator(text, i, end, column_offset)
+            elif state == _S_QUOTE:
+                match = _STRING_BODY.match(text, i + 1, end)
+                if match is not None:
+                    new_i = match.end()
+                    add_lexeme(TokenLiteral.STRING, text, i + 1, new_i - 1, column_offset + i)
+                    i = new_i
+                else:
+                    self._errors.append(SyntaxError("Unterminated string literal"))
+                    self._unknown_character(ch, column_offset + i)
+                    i += 1
+            elif state == _S_BACKTICK:
+                i = self._scan_interpolation(text, i, end, column_offset, origin_column)
+            elif state == _S_COMMENT:
+                break
+            else:
+                self._unknown_character(ch, column_offset + i)
+                i += 1
+
+    def _add_lexeme(
+        self, token_type: TokenType, text: str, start: int, end: int, column: int, symbol: int = -1
+    ) -> None:
+        """Records a token whose value is text[start:end]."""
+        self._add_literal(token_type, text[start:end], column, symbol)
+
+    def _unknown_character(self, ch: str, column: int) -> None:
+        self._errors.append(
+            SyntaxError(f"Unknown character: '{ch}' at {self._filename}:{self._line_number}:{column + 1}")
+        )
+
+    def _scan_word(self, text: str, i: int, end: int, column_offset: int) -> int:
+        """Scans identifiers, keywords, annotation types and word literals."""
+        new_i = _IDENT_RUN.match(text, i, end).end()  # type: ignore[union-attr]
+        lexeme = text[i:new_i]
+        symbol, token_type = self._symbols.lookup(lexeme)
+        if lexeme[0].isdigit():
+            self._errors.append(
+                SyntaxError(
+                    f"Invalid identifier starting with a digit: '{lexeme}' at {self._filename}:{self._line_number}:{column_offset + i + 1}"
+                )
+            )
+        self._add_lexeme(token_type, text, i, new_i, column_offset + i, symbol)
+        return new_i
+
+    def _scan_operator(self, text: str, i: int, end: int, column_offset: int) -> int:
+        """Runs the operator DFA from text[i], keeping the longest accepted lexeme."""
+        transitions, accepting = _OP_TRANSITIONS, _OP_ACCEPTING
+        state, j, last, last_j = 0, i, None, i
+        while j < end:
+            next_state = transitions[state].get(text[j])
+            if next_state is None:
+                break
+            state = next_state
+            j += 1
+            if accepting[state] is not None:
+                last, last_j = accepting[state], j
+        if last is None:
+            self._unknown_character(text[i], column_offset + i)
+            return i + 1
+        self._add_lexeme(last, text, i, last_j, column_offset + i)
+        return last_j
+
+    def _scan_number(self, text: str, i: int, end: int, column_offset: int) -> int | None:
+        """Scans a numeric literal, returning the new position or None if it is not one."""
+        start = i
+        has_dot, has_e = False, False
+        while i < end:
+            ch = text[i]
+            if ch.isdigit() or ch == "_":
+                i += 1
+            elif ch == "." and not has_dot and not has_e:
+                # Avoid matching '...' operator
+                if text.startswith("...", i, end):
+                    break
+                has_dot = True
+                i += 1
+            elif ch in "eE" and not has_e:
+                has_e = True
+                i += 1
+                if i < end and text[i] in "+-":
+                    i += 1
+            elif ch == "i" and i > start:
+                i += 1
+                break
+            else:
+                break
+
+        lexeme = text[start:i]
+        if not lexeme or lexeme == ".":
+            return None
+        if "__" in lexeme or lexeme[0] == "_" or lexeme[-1] == "_":
+            return None
+
+        token_type = (
+            self._match_complex_literal(lexeme)
+            or self._match_float_literal(lexeme)
+            or self._match_integer_literal(lexeme)
+        )
+        if token_type is None:
+            return None
+        self._add_lexeme(token_type, text, start, i, column_offset + start)
+        return i
+
+    def _scan_interpolation(self, text: str, i: int, end: int, column_offset: int, origin_column: int) -> int:
+        """Scans a string interpolation, falling back to a plain backstick."""
+        if i + 1 < end:
+            if text[i + 1] == "`":
+                self._add_interpolation(text, i, i + 2, column_offset, origin_column)
+                return i + 2
+            j = i + 2
+            while j < end:
+                ch = text[j]
+                if ch == "\\" and j + 1 < end:
+                    j += 2
+                elif ch == "`":
+                    self._add_interpolation(text, i, j + 1, column_offset, origin_column)
+                    return j + 1
+                else:
+                    j += 1
+            self._errors.append(SyntaxError("Unterminated string interpolation"))
+        self._add_lexeme(_BACKSTICK, text, i, i + 1, column_offset + i)
+        return i + 1
+
+    def _add_interpolation(self, text: str, i: int, new_i: int, column_offset: int, origin_column: int) -> None:
+        """
+        Records the tokens of the string interpolation text[i:new_i], in place.
+
+        Mirrors Lexer._add_string_interpolation, including its columns, but
+        scans the segments and the expressions inside braces as ranges of text
+        instead of copying them out.
+        """
+        add_lexeme = self._add_lexeme
+        start, end = i + 1, new_i - 1
+        add_lexeme(_BACKSTICK, text, i, i + 1, column_offset + i)
+        add_lexeme(TokenLiteral.STRING_TEMPLATE, text, start, end, column_offset + new_i + 1)
+        if start == end:
+            add_lexeme(TokenLiteral.STRING, text, start, start, column_offset + i + 1)
+        for segment_start, segment_end, space, is_raw_string in _interpolation_segments(text, start, end):
+            column = origin_column + space + 1
+            if is_raw_string or segment_start == segment_end:
+                add_lexeme(TokenLiteral.STRING, text, segment_start, segment_end, column)
+            else:
+                self._scan(text, segment_start, segment_end, column - segment_start)
+        add_lexeme(_BACKSTICK, text, new_i - 1, new_i, column_offset + new_i - 2)
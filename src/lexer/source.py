@@ -0,0 +1,34 @@
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+
+
+def iter_mapped_lines(path: Path) -> Iterator[str]:
+    """
+    Yields the lines of a UTF-8 file, decoding them one at a time from a memory map.
+
+    Lines keep a trailing carriage return, if any; the lexer strips it. Only
+    the current line is ever held as a str, the rest of the file stays in the
+    page cache.
+    """
+    with path.open("rb") as file:
+        size = path.stat().st_size
+        if not size:
+            return  # Empty files cannot be mapped
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", start)
+                if end < 0:
+                    end = size
+                yield str(mapped[start:end], "utf-8")
+                start = end + 1
+
+
+def read_mapped_source(path: Path) -> str:
+    """Decodes a whole UTF-8 file from a memory map, without an intermediate bytes copy."""
+    with path.open("rb") as file:
+        if not path.stat().st_size:
+            return ""
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, "utf-8")
@@ -0,0 +1,108 @@
+from collections.abc import Iterable, Iterator
+from os import PathLike
+from pathlib import Path
+from typing import Any, Self
+
+from src.lexer.constants import POOLED_CODES
+from src.lexer.scanner import TableLexer
+from src.lexer.source import read_mapped_source
+from src.lexer.symbols import SymbolInterner
+from src.lexer.token import SpanTokenBuffer, TokenIndentation, TokenType, TokenView
+
+
+class SpanLexer(TableLexer):
+    """
+    A TableLexer that records tokens as spans of one shared source buffer.
+
+    The lines are scanned in place within the source string and each token
+    keeps only its (start, end) offsets, so lexemes are never copied into
+    Token objects. tokenize() returns a SpanTokenBuffer, whose Token-like views
+    produce their text on demand and can be handed straight to the parser.
+    Lexing is always single-process.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        lines: Iterable[str] = (),
+        source: str | None = None,
+        symbols: SymbolInterner | None = None,
+    ):
+        super().__init__(filename=filename, lines=lines, symbols=symbols)
+        self._source = source
+        self._line_start = 0
+        self._spans = SpanTokenBuffer(filename, "")
+
+    @classmethod
+    def from_path(cls, path: str | PathLike[str], **options: Any) -> Self:
+        """Creates a span lexer whose source buffer is decoded from the memory-mapped file in one go."""
+        path = Path(path)
+        return cls(filename=path.name, source=read_mapped_source(path), **options)
+
+    def _add_lexeme(
+        self, token_type: TokenType, text: str, start: int, end: int, column: int, symbol: int = -1
+    ) -> None:
+        # Only pooled literals are ever copied out of the source, to be decoded
+        const = self._constants.add(token_type, text[start:end]) if token_type.code in POOLED_CODES else -1
+        self._spans.append_span(self._line_number, column, token_type, start, end, const, symbol)
+
+    def _add_token(self, token_type: TokenType, value: str, column: int) -> None:
+        # Only indentation tokens get here: INDENT spans the line's indentation, the others are empty
+        start = self._line_start
+        end = start + len(value) if token_type is TokenIndentation.INDENT else start
+        self._spans.append_span(self._line_number, column, token_type, start, end)
+
+    def _tokenize_span_line(self, line_number: int, start: int, end: int) -> None:
+        """Tokenizes source[start:end] like Lexer._tokenize_source_line, without slicing it."""
+        source = self._spans.source
+        while end > start and source[end - 1] == "\r":
+            end -= 1
+        self._line_number = line_number
+        self._line_start = start
+        self._check_tabs(line_number, source, start, end)
+        leading_spaces = self._leading_spaces(source, start, end)
+        if leading_spaces < 0:
+            self._add_token(TokenIndentation.NEWLINE, "\n", end - start + 1)
+            return
+        self._tokenize_indentation(line_number, leading_spaces)
+        self._scan(source, start + leading_spaces, end, -start)
+        self._add_token(TokenIndentation.NEWLINE, "\n", end - start - 1)
+
+    def tokenize(self) -> SpanTokenBuffer:  # type: ignore[override]
+        """Tokenizes the source buffer (or the input lines, joined into one) into a SpanTokenBuffer."""
+        if self._source is not None:
+            source = self._source
+        else:
+            source = "".join(line.rstrip("\r\n") + "\n" for line in self._lines)
+        self._spans = SpanTokenBuffer(self._filename, source)
+
+        line_number, start, size = 0, 0, len(source)
+        while start < size:
+            end = source.find("\n", start)
+            if end < 0:
+                end = size
+            line_number += 1
+            self._tokenize_span_line(line_number, start, end)
+            start = end + 1
+
+        self._tokenize_end_of_input()
+
+        if self._errors:
+            raise ExceptionGroup("Lexing errors occurred", self._errors)
+
+        return self._spans
+
+    def iter_tokens(self, lines: Iterable[str] | None = None) -> Iterator[TokenView]:  # type: ignore[override]
+        """
+        Yields the views of tokenize(); spans need the whole source buffer, so nothing is streamed.
+
+        Like Lexer.iter_tokens, lexing errors are raised after the last token.
+        """
+        if lines is not None:
+            self._lines = lines
+        try:
+            self.tokenize()
+        except ExceptionGroup:
+            yield from self._spans
+            raise
+        yield from self._spans
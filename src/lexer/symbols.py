@@ -0,0 +1,99 @@
+from src.lexer.token import (
+    TokenAnnotationTypes,
+    TokenIdentifier,
+    TokenKeyword,
+    TokenKeywordSpecial,
+    TokenLiteral,
+    TokenType,
+)
+
+# Map special keywords (non-ASCII) to TokenKeywordSpecial
+KEYWORD_SPECIAL_MAP: dict[str, TokenKeywordSpecial] = {
+    "λ": TokenKeywordSpecial.LAMBDA_SPECIAL,
+    "Λ": TokenKeywordSpecial.LAMBDA_SPECIAL,
+}
+
+# Reserved words are case-insensitive; keywords shadow annotation types of the same name
+_RESERVED_WORDS: dict[str, TokenType] = {
+    **{at.name: at for at in TokenAnnotationTypes},
+    **{kw.name: kw for kw in TokenKeyword},
+}
+
+# Lower-case spelling of every reserved word, plus the case-sensitive word literals and special keywords
+KEYWORD_TABLE: dict[str, TokenType] = {
+    **{name.lower(): kind for name, kind in _RESERVED_WORDS.items()},
+    **KEYWORD_SPECIAL_MAP,
+    "true": TokenLiteral.BOOLEAN,
+    "false": TokenLiteral.BOOLEAN,
+    "none": TokenLiteral.NONE,
+}
+
+# Kinds of the tokens scanned as words, which carry a symbol ID
+WORD_KINDS: tuple[TokenType, ...] = (
+    *TokenIdentifier,
+    *TokenAnnotationTypes,
+    *TokenKeyword,
+    *TokenKeywordSpecial,
+    TokenLiteral.BOOLEAN,
+    TokenLiteral.NONE,
+)
+WORD_CODES = frozenset(kind.code for kind in WORD_KINDS)
+
+
+def classify_word(spelling: str) -> TokenType:
+    """
+    Classifies a word as a word literal, a keyword, an annotation type or an identifier.
+
+    true, false and none are only literals in lower case; reserved words match
+    in any case, so spellings that are not plain lower-case ASCII go through
+    upper() before the lookup.
+    """
+    if spelling.isascii() and spelling.islower():
+        return KEYWORD_TABLE.get(spelling, TokenIdentifier.IDENTIFIER)
+    token_type = _RESERVED_WORDS.get(spelling.upper())
+    if token_type is not None:
+        return token_type
+    return KEYWORD_SPECIAL_MAP.get(spelling, TokenIdentifier.IDENTIFIER)
+
+
+class SymbolInterner:
+    """
+    Maps identifier and keyword spellings to stable integer symbol IDs.
+
+    One interner is shared by every stage of a compilation session, so a name
+    is hashed as a string once, when the lexer first sees it; later stages
+    compare and look up symbol IDs. The token kind of each spelling is
+    classified when it is interned. The usual spellings of every reserved word
+    are interned up front, so their IDs are the same in every session.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, TokenType]] = {}
+        self._spellings: list[str] = []
+        for name in _RESERVED_WORDS:
+            for spelling in (name.lower(), name, name.capitalize()):
+                self.lookup(spelling)
+        for spelling in KEYWORD_TABLE:
+            self.lookup(spelling)
+
+    def lookup(self, spelling: str) -> tuple[int, TokenType]:
+        """Returns the symbol ID and the token kind of a word, interning it if needed."""
+        entry = self._entries.get(spelling)
+        if entry is None:
+            entry = self._entries[spelling] = (len(self._spellings), classify_word(spelling))
+            self._spellings.append(spelling)
+        return entry
+
+    def intern(self, spelling: str) -> int:
+        """Returns the symbol ID of a spelling, interning it if needed."""
+        entry = self._entries.get(spelling)
+        return entry[0] if entry is not None else self.lookup(spelling)[0]
+
+    def spelling(self, symbol: int) -> str:
+        return self._spellings[symbol]
+
+    def __contains__(self, spelling: object) -> bool:
+        return spelling in self._entries
+
+    def __len__(self) -> int:
+        return len(self._spellings)
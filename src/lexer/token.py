@@ -1,8 +1,17 @@
-from dataclasses import dataclass
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from enum import StrEnum
+from sys import intern
+from typing import overload
 
 
-class TokenType(StrEnum): ...
+class TokenType(StrEnum):
+    # Dense small-integer code of the kind, assigned below from TOKEN_KINDS
+    code: int
+    # Bitset of the codes of this kind and of every kind of another enum with the same value
+    mask: int
 
 
 class TokenIdentifier(TokenType):
@@ -173,3 +182,267 @@ class Token:
     column: int
     type: TokenType
     value: str
+    # Index of the decoded value in the lexer's ConstantPool, or -1 for tokens that are not pooled literals
+    const: int = field(default=-1, compare=False, repr=False)
+    # Symbol ID of a word's spelling in the session's SymbolInterner, or -1 for tokens that are not words
+    symbol: int = field(default=-1, compare=False, repr=False)
+
+
+# Every token kind in a fixed order; a kind's position is its code
+TOKEN_KINDS: tuple[TokenType, ...] = (
+    *TokenIdentifier,
+    *TokenAnnotationTypes,
+    *TokenKeyword,
+    *TokenKeywordSpecial,
+    *TokenDelimiter,
+    *TokenOperator,
+    *TokenLiteral,
+    *TokenComment,
+    *TokenIndentation,
+)
+for _code, _kind in enumerate(TOKEN_KINDS):
+    _kind.code = _code
+# Kinds with equal values compare equal (e.g. TokenAnnotationTypes.NONE == TokenLiteral.NONE), so they share a mask
+for _kind in TOKEN_KINDS:
+    _kind.mask = sum(1 << other.code for other in TOKEN_KINDS if other == _kind)
+
+
+def kind_mask(kinds: Iterable[TokenType]) -> int:
+    """Builds the bitset of a class of kinds: `kind.mask & mask` is true exactly when `kind in kinds` is."""
+    mask = 0
+    for kind in kinds:
+        mask |= kind.mask
+    return mask
+
+
+def mask_kinds(mask: int) -> list[TokenType]:
+    """Lists the kinds of a bitset, e.g. for error messages."""
+    return [kind for kind in TOKEN_KINDS if mask >> kind.code & 1]
+
+
+class TokenView:
+    """A Token-like, read-only view of one entry of a TokenBuffer or SpanTokenBuffer."""
+
+    __slots__ = ("_buffer", "_index")
+
+    def __init__(self, buffer: "_TokenArrays", index: int):
+        self._buffer = buffer
+        self._index = index
+
+    @property
+    def filename(self) -> str:
+        return self._buffer.filename
+
+    @property
+    def line(self) -> int:
+        return self._buffer._lines[self._index]
+
+    @property
+    def column(self) -> int:
+        return self._buffer._columns[self._index]
+
+    @property
+    def type(self) -> TokenType:
+        return TOKEN_KINDS[self._buffer._kinds[self._index]]
+
+    @property
+    def value(self) -> str:
+        return self._buffer.value_at(self._index)
+
+    @property
+    def const(self) -> int:
+        return self._buffer._consts.get(self._index, -1)
+
+    @property
+    def symbol(self) -> int:
+        return self._buffer.symbol_at(self._index)
+
+    def to_token(self) -> Token:
+        return Token(
+            filename=self.filename,
+            line=self.line,
+            column=self.column,
+            type=self.type,
+            value=self.value,
+            const=self.const,
+            symbol=self.symbol,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Token, TokenView)):
+            return NotImplemented
+        return (self.filename, self.line, self.column, self.type, self.value) == (
+            other.filename,
+            other.line,
+            other.column,
+            other.type,
+            other.value,
+        )
+
+    def __repr__(self) -> str:
+        return repr(self.to_token()).replace("Token(", "TokenView(", 1)
+
+
+class _TokenArrays(Sequence[TokenView], ABC):
+    """Line, column, kind and constant pool index columns shared by the struct-of-arrays token buffers."""
+
+    __slots__ = ("_columns", "_consts", "_kinds", "_lines", "filename")
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._lines = array("I")
+        self._columns = array("I")
+        self._kinds = array("B")
+        self._consts: dict[int, int] = {}  # Sparse: only pooled literals have a constant index
+
+    @abstractmethod
+    def value_at(self, index: int) -> str: ...
+
+    @abstractmethod
+    def symbol_at(self, index: int) -> int: ...
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def kind_codes(self) -> bytes:
+        """Returns the kind code of every token, a byte each, for searches over token kinds."""
+        return self._kinds.tobytes()
+
+    @overload
+    def __getitem__(self, index: int) -> TokenView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TokenView]: ...
+
+    def __getitem__(self, index: int | slice) -> TokenView | list[TokenView]:
+        if isinstance(index, slice):
+            return [TokenView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._kinds)
+        if not 0 <= index < len(self._kinds):
+            raise IndexError(index)
+        return TokenView(self, index)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        return (TokenView(self, i) for i in range(len(self._kinds)))
+
+
+class TokenBuffer(_TokenArrays):
+    """
+    Struct-of-arrays storage for the tokens of one file.
+
+    The filename is stored once, line and column numbers live in array('I')
+    columns, kinds are stored as their one-byte code and values as indices into
+    a table of interned strings. Indexing yields TokenView objects, so the
+    buffer can be handed to the parser in place of a list of tokens.
+    """
+
+    __slots__ = ("_value_index", "_value_symbols", "_value_table", "_values")
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self._values = array("I")
+        self._value_table: list[str] = []
+        self._value_index: dict[str, int] = {}
+        self._value_symbols: dict[int, int] = {}  # A spelling has one symbol ID per session
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token], filename: str | None = None) -> "TokenBuffer":
+        """Builds a buffer from a token iterable, e.g. Lexer.iter_tokens()."""
+        iterator = iter(tokens)
+        first = next(iterator, None)
+        buffer = cls(filename if filename is not None else first.filename if first else "")
+        if first is not None:
+            buffer.append(first)
+            buffer.extend(iterator)
+        return buffer
+
+    def append(self, token: Token) -> None:
+        value_id = self._value_index.get(token.value)
+        if value_id is None:
+            value_id = self._value_index[token.value] = len(self._value_table)
+            self._value_table.append(intern(token.value))
+        if token.symbol >= 0:
+            self._value_symbols[value_id] = token.symbol
+        if token.const >= 0:
+            self._consts[len(self._kinds)] = token.const
+        self._lines.append(token.line)
+        self._columns.append(token.column)
+        self._kinds.append(token.type.code)
+        self._values.append(value_id)
+
+    def extend(self, tokens: Iterable[Token]) -> None:
+        for token in tokens:
+            self.append(token)
+
+    def value_at(self, index: int) -> str:
+        return self._value_table[self._values[index]]
+
+    def symbol_at(self, index: int) -> int:
+        return self._value_symbols.get(self._values[index], -1)
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the columns and the value table, in bytes."""
+        columns = (self._lines, self._columns, self._kinds, self._values)
+        return sum(column.itemsize * len(column) for column in columns) + sum(
+            len(value.encode()) for value in self._value_table
+        )
+
+
+class SpanTokenBuffer(_TokenArrays):
+    """
+    Token storage that keeps only (start, end) offsets into one source buffer.
+
+    Values are not copied out of the source while lexing: value_at() slices
+    the shared source string on demand, so tokens whose text is never read
+    cost nothing beyond their offsets. NEWLINE tokens are zero-width and report
+    their fixed "\\n" value.
+    """
+
+    __slots__ = ("_ends", "_starts", "_symbols", "source")
+
+    def __init__(self, filename: str, source: str):
+        super().__init__(filename)
+        self.source = source
+        self._starts = array("I")
+        self._ends = array("I")
+        self._symbols = array("i")
+
+    def append_span(
+        self,
+        line: int,
+        column: int,
+        token_type: TokenType,
+        start: int,
+        end: int,
+        const: int = -1,
+        symbol: int = -1,
+    ) -> None:
+        if const >= 0:
+            self._consts[len(self._kinds)] = const
+        self._lines.append(line)
+        self._columns.append(column)
+        self._kinds.append(token_type.code)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._symbols.append(symbol)
+
+    def span(self, index: int) -> tuple[int, int]:
+        """Returns the source offsets of a token's value."""
+        return self._starts[index], self._ends[index]
+
+    def value_at(self, index: int) -> str:
+        if self._kinds[index] == _NEWLINE_CODE:
+            return "\n"
+        return self.source[self._starts[index] : self._ends[index]]
+
+    def symbol_at(self, index: int) -> int:
+        return self._symbols[index]
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the columns, in bytes; the source is shared."""
+        columns = (self._lines, self._columns, self._kinds, self._starts, self._ends, self._symbols)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+_NEWLINE_CODE = TokenIndentation.NEWLINE.code
@@ -1,15 +1,20 @@
 import subprocess
 import sys
 from argparse import ArgumentParser
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from pprint import pprint
+from typing import TextIO
 
 from src.analyzer import SemanticAnalyzer
+from src.cache import DEFAULT_CACHE_DIR, CacheEntry, CompilationCache
 from src.codegen import CodeGenerator
-from src.lexer import Lexer
+from src.lexer import Lexer, SpanLexer, TableLexer, Token, TokenBuffer
+from src.optimizer import ConstantFolder, DeadCodeEliminator, EscapeAnalysis
 from src.parser import Parser
 
 BUILD_DIR = Path("build")
+LEXERS: dict[str, type[Lexer]] = {"classic": Lexer, "table": TableLexer, "span": SpanLexer}
 
 
 def run_command(command: list[str], capture_output: bool = False):
@@ -34,6 +39,16 @@ def run_command(command: list[str], capture_output: bool = False):
         sys.exit(1)
 
 
+def echo_tokens(tokens: Iterable[Token], output: TextIO, buffer: TokenBuffer | None = None) -> Iterator[Token]:
+    """Prints and records each token as it flows from the lexer to the parser, keeping it in buffer for the cache."""
+    for token in tokens:
+        print(token)
+        output.write(f"{token}\n")
+        if buffer is not None:
+            buffer.append(token)
+        yield token
+
+
 def main():
     """Main function to handle the compilation process."""
 
@@ -41,6 +56,12 @@ def main():
     args.add_argument("file", type=Path, help="File to be processed")
     args.add_argument("--run", action="store_true", help="Run the generated executable")
     args.add_argument("--optm", action="store_true", help="Optimize the generated LLVM IR")
+    args.add_argument("--lexer", choices=LEXERS, default="classic", help="Lexer engine to use")
+    args.add_argument("--cst", action="store_true", help="Keep layout nodes in the AST (concrete syntax tree)")
+    args.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Directory of cached tokens and ASTs")
+    args.add_argument(
+        "--no-cache", action="store_true", help="Always lex and parse, without reading or writing the cache"
+    )
     args = args.parse_args()
 
     input_file: Path = args.file
@@ -55,44 +76,70 @@ def main():
     name = input_file.stem
     print(f"Processing file: {input_file.name}\n")
 
-    # Read the file content
-    try:
-        source_code = input_file.read_text()
-    except IOError as e:
-        print(f"Error reading file '{input_file}': {e}")
-        return 1
-
     BUILD_DIR.mkdir(exist_ok=True)
     # Clear previous build files
     for file in BUILD_DIR.glob("*.*"):
         file.unlink()
 
-    # Lexical Analysis
-    lex = Lexer(filename=input_file.name, lines=source_code.splitlines())
-    tokens = lex.tokenize()
-    print("Tokens:")
-    print("-" * 20)
-    pprint(tokens)
-    (BUILD_DIR / f"{name}_tokens.txt").write_text("\n".join(map(str, tokens)))
-
-    # Parsing and AST Generation
-    parser = Parser(tokens)
-    parser.parse()
-    ast = parser.ast
+    # Unchanged sources skip lexing and parsing: their tokens and AST are loaded from the cache
+    cache = CompilationCache(args.cache_dir)
+    entry = None
+    if not args.no_cache:
+        try:
+            key = cache.key(input_file, lean=not args.cst)
+        except OSError as e:
+            print(f"Error reading file '{input_file}': {e}")
+            return 1
+        entry = cache.load(key, str(input_file))
+    if entry is not None:
+        print(f"Tokens and AST loaded from cache ({len(entry.tokens)} tokens)")
+        ast, constants, symbols = entry.ast, entry.constants, entry.symbols
+    else:
+        # Lexical Analysis, Parsing and AST Generation
+        print("Tokens:")
+        print("-" * 20)
+        # The file is memory-mapped; its lines are decoded and streamed through the lexer into the parser
+        with (BUILD_DIR / f"{name}_tokens.txt").open("w") as tokens_file:
+            lex = LEXERS[args.lexer].from_path(input_file)
+            # The tokens are only kept when they are written to the cache
+            buffer = None if args.no_cache else TokenBuffer(str(input_file))
+            tokens = echo_tokens(lex.iter_tokens(), tokens_file, buffer)
+            parser = Parser(tokens, lex.constants, lex.symbols, lean=not args.cst)
+            try:
+                parser.parse()
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error reading file '{input_file}': {e}")
+                return 1
+        ast, constants, symbols = parser.ast, parser.constants, parser.symbols
+        if buffer is not None:
+            cache.store(key, CacheEntry(tokens=buffer, constants=constants, symbols=symbols, ast=ast))
     print("\nAST:")
     print("-" * 20)
     pprint(ast)
     (BUILD_DIR / f"{name}_ast.txt").write_text(repr(ast))
 
+    # Constant Folding: constant expressions and const reads become literals
+    folded = ConstantFolder(ast, constants).fold()
+    print(f"\nFolded {folded} constant expressions")
+
     # Semantic Analysis
-    analyzer = SemanticAnalyzer(ast)
+    analyzer = SemanticAnalyzer(ast, constants, symbols)
     symbol_table = analyzer.analyze()
     print("\nSymbol Table:")
     print("-" * 20)
     pprint(symbol_table)
 
+    # Dead Code Elimination: what main never reaches is not generated
+    removed = DeadCodeEliminator(ast).eliminate()
+    print(f"\nRemoved {removed} unreachable statements and declarations")
+
+    # Escape Analysis: objects that never outlive their function are allocated in its frame
+    escape = EscapeAnalysis(ast)
+    escape.analyze()
+    print(f"\nAllocated {escape.stack_allocated} of {escape.sites} objects on the stack")
+
     # Code Generation using llvmlite to generate LLVM IR
-    codegen = CodeGenerator(ast)
+    codegen = CodeGenerator(ast, constants)
     llvm_ir = codegen.generate()
     print("\nLLVM IR:")
     print("-" * 20)
@@ -117,7 +164,8 @@ def main():
 
     # Compile LLVM IR to object code using llc (part of LLVM)
     obj_path = BUILD_DIR / f"{name}.o"
-    run_command(["llc", "-filetype=obj", str(output_ll), "-o", str(obj_path)])
+    # Position-independent, as gcc links position-independent executables by default
+    run_command(["llc", "-filetype=obj", "-relocation-model=pic", str(output_ll), "-o", str(obj_path)])
     print(f"LLVM object code saved to {name}.o")
 
     # Compile object code to executable (Linux)
@@ -128,7 +176,7 @@ def main():
     if args.run:
         print(f"\nRunning {name}:")
         print("-" * 20)
-        run_command([f"./{exec_path.relative_to(Path.cwd().parent)}"])
+        run_command([str(exec_path.resolve())])
 
     return 0
 
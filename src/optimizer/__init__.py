@@ -0,0 +1,3 @@
+from src.optimizer.dead_code import CallGraph, DeadCodeEliminator  # noqa
+from src.optimizer.escape import EscapeAnalysis  # noqa
+from src.optimizer.folding import ConstantFolder, arithmetic, negate  # noqa
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from src.analyzer import CONSTRUCTOR, Symbol, SymbolKind
+from src.ast_visit import REMOVE, SKIP, Transformer, Visitor
+from src.parser import ASTNode, ASTType, member_chain
+
+# Kinds of the symbols reachability is tracked for
+_CALLABLE_KINDS = frozenset({SymbolKind.FUNCTION, SymbolKind.CLASS, SymbolKind.METHOD})
+# Nodes after a return that are not run in its place: layout, else branches, and declarations, which are hoisted
+_KEPT_AFTER_RETURN = frozenset(
+    {
+        ASTType.NEWLINE,
+        ASTType.INDENT,
+        ASTType.DEDENT,
+        ASTType.EOF,
+        ASTType.ELSE_IF_STATEMENT,
+        ASTType.ELSE_STATEMENT,
+        ASTType.FUNCTION_DECLARATION,
+        ASTType.CLASS_DECLARATION,
+    }
+)
+
+
+class CallGraph(Visitor):
+    """
+    Finds the functions, classes and methods reachable from an entry point of an analyzed program.
+
+    A function is reached when a reached body calls or names it, and a class
+    when a reached body calls it (which also reaches its constructor) or
+    names it, and when a reached function, method, variable or attribute is
+    annotated with it. Since the type of an object is not known, a method of
+    a reached class is reached when a reached body uses a member of its name
+    on any object. Lambdas count as part of the body they are written in.
+    """
+
+    def __init__(self) -> None:
+        self.reached: set[Symbol] = set()
+        self._pending: list[Symbol] = []
+        # Member names used by the reached bodies
+        self._members: set[str] = set()
+        # Methods of the reached classes that are not reached yet, by name
+        self._methods: dict[str, list[Symbol]] = {}
+
+    def reach(self, roots: Iterable[Symbol | None], statements: Iterable[ASTNode] = ()) -> set[Symbol]:
+        """Returns the symbols reachable from roots and from statements that always run, like top-level ones."""
+        for symbol in roots:
+            self._reach(symbol)
+        self.visit_all(statements)
+        while self._pending:
+            symbol = self._pending.pop()
+            node = symbol.node
+            if symbol.kind == SymbolKind.CLASS:
+                self._enter_class(symbol)
+                continue
+            # The classes of its result and parameters, then its body
+            self._reach(symbol.declared_class)
+            for parameter in symbol.parameters():
+                self._reach(parameter.declared_class)
+            self.visit_all(node.children)
+        return self.reached
+
+    def _reach(self, symbol: Symbol | None) -> None:
+        if symbol is not None and symbol.kind in _CALLABLE_KINDS and symbol not in self.reached:
+            self.reached.add(symbol)
+            self._pending.append(symbol)
+
+    def _enter_class(self, symbol: Symbol) -> None:
+        for member in symbol.members or ():
+            if member.kind == SymbolKind.ATTRIBUTE:
+                self._reach(member.declared_class)
+                self.visit_all(member.node.children)  # Its initializer, if any
+            elif member.name in self._members:
+                self._reach(member)
+            else:
+                self._methods.setdefault(member.name, []).append(member)
+
+    def _use_member(self, name: str) -> None:
+        if name not in self._members:
+            self._members.add(name)
+            for method in self._methods.pop(name, ()):
+                self._reach(method)
+
+    # Declarations are walked when they are reached
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        return SKIP
+
+    visit_main_declaration = visit_class_declaration = visit_class_method = visit_function_declaration
+
+    def visit_variable_declaration(self, node: ASTNode) -> Any:
+        if node.binding is not None:
+            self._reach(node.binding.declared_class)
+
+    # Uses
+
+    def visit_identifier(self, node: ASTNode) -> Any:
+        self._reach(node.binding)
+
+    def visit_call_expression(self, node: ASTNode) -> Any:
+        symbol = node.binding
+        self._reach(symbol)
+        if symbol is not None and symbol.kind == SymbolKind.CLASS:
+            self._reach(symbol.member(CONSTRUCTOR))
+
+    def visit_class_member_access(self, node: ASTNode) -> Any:
+        self._reach(node.binding)  # A class, for static members
+        members, arguments = member_chain(node)
+        for member in members:
+            self._use_member(str(member.value))
+        return arguments
+
+
+class DeadCodeEliminator(Transformer):
+    """
+    Removes the code an analyzed program never runs, before code generation.
+
+    The statements of a block after a return statement are removed. Then,
+    when the program has a main function, the functions, classes and methods
+    its CallGraph does not reach from main (and from the top-level variable
+    initializers) are removed, nested ones included, so neither their IR
+    nor their machine code is emitted. Programs without main, like
+    libraries whose functions are called from outside, keep all of them.
+    """
+
+    def __init__(self, ast: dict[str, Any]):
+        self._ast = ast
+        # The symbols to keep, once the call graph is known
+        self._reachable: set[Symbol] | None = None
+        # Number of statements and declarations removed
+        self.removed = 0
+
+    def eliminate(self) -> int:
+        """Removes the dead code of the whole program in place, and returns the number of nodes removed."""
+        body = self._ast["body"]
+        self.removed = 0
+        self._reachable = None
+        self.transform_all(body)
+        main = next((node for node in body if node.type == ASTType.MAIN_DECLARATION), None)
+        if main is not None:
+            top_level = [node for node in body if node.type == ASTType.VARIABLE_DECLARATION]
+            self._reachable = CallGraph().reach([main.binding], top_level)
+            self.transform_all(body)
+        return self.removed
+
+    def _trim(self, node: ASTNode) -> Any:
+        """Removes the statements after the first return of a block, or the whole declaration when it is unreached."""
+        if self._reachable is not None and node.binding is not None and node.binding not in self._reachable:
+            self.removed += 1
+            return REMOVE
+        children = node.children
+        index = next((index for index, child in enumerate(children) if child.type == ASTType.RETURN_STATEMENT), -1)
+        if index < 0:
+            return None
+        kept = [child for child in children[index + 1 :] if child.type in _KEPT_AFTER_RETURN]
+        if len(kept) < len(children) - index - 1:
+            self.removed += len(children) - index - 1 - len(kept)
+            children[index + 1 :] = kept
+        return None
+
+    visit_function_declaration = visit_main_declaration = visit_class_method = _trim
+    visit_if_statement = visit_else_if_statement = visit_else_statement = _trim
+    visit_loop_statement = visit_for_statement = visit_match_case = _trim
+
+    def visit_class_declaration(self, node: ASTNode) -> Any:
+        if self._reachable is not None and node.binding is not None and node.binding not in self._reachable:
+            self.removed += 1
+            return REMOVE
+        return None
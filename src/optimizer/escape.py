@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.analyzer import CONSTRUCTOR, Symbol, SymbolKind
+from src.ast_visit import SKIP, Visitor
+from src.parser import ASTNode, ASTType, member_chain
+
+# A value that can hold an object: a variable or parameter, or the id() of the class call creating it
+Source = Symbol | int
+
+_LAYOUT = frozenset({ASTType.NEWLINE, ASTType.INDENT, ASTType.DEDENT, ASTType.EOF})
+
+
+@dataclass(eq=False)
+class _Frame:
+    """What the body of a function or method does with the objects in it."""
+
+    # The function or method, or None for code outside of any
+    function: Symbol | None
+    # Its parameters and variables
+    names: set[Symbol] = field(default_factory=set)
+    # Its class calls
+    sites: list[ASTNode] = field(default_factory=list)
+    # The class calls stored in each variable or parameter, by id()
+    stored: dict[Symbol, list[int]] = field(default_factory=dict)
+    # Values that escape whatever the functions they are passed to do
+    escaping: set[Source] = field(default_factory=set)
+    # Values passed to functions, with the function and the index of the parameter they are passed as
+    passed: list[tuple[Symbol, int, Source]] = field(default_factory=list)
+
+
+class EscapeAnalysis(Visitor):
+    """
+    Finds the objects of an analyzed program that never outlive the function creating them.
+
+    Each class call creates an object, which escapes when it may be used
+    after its function returns: when it is returned, stored into an
+    attribute, in a name of another function, or in a second variable,
+    captured by a lambda, or passed to a call that lets it escape. Calls to
+    functions and methods of the program let an argument escape when their
+    own body lets the parameter escape (self included), which is found for
+    every function at once by repeating until no parameter changes; other
+    calls are assumed to let their arguments escape, except print, which
+    keeps nothing. The types the analyzer inferred tell which method a
+    member call reaches.
+
+    The class calls whose object does not escape get ASTNode.escapes cleared,
+    and the code generator allocates them in the frame of their function
+    rather than on the heap, where LLVM can promote their attributes to
+    registers.
+    """
+
+    def __init__(self, ast: dict[str, Any]):
+        self._ast = ast
+        self._frames: list[_Frame] = []
+        # The frames of the functions the walk is in, innermost last
+        self._stack: list[_Frame] = []
+        self._lambdas = 0
+        # Number of class calls, and of those whose object does not escape
+        self.sites = 0
+        self.stack_allocated = 0
+
+    def analyze(self) -> int:
+        """Marks the class calls whose object does not escape, and returns their number."""
+        self._frames = []
+        self._stack = [_Frame(None)]
+        self.visit_all(self._ast["body"])
+        self._frames.append(self._stack.pop())
+        leaks = self._leaks()
+        self.sites = self.stack_allocated = 0
+        for frame in self._frames:
+            escaping = self._escaping(frame, leaks)
+            holders: dict[int, list[Symbol]] = {}
+            for name, sites in frame.stored.items():
+                for site in sites:
+                    holders.setdefault(site, []).append(name)
+            for node in frame.sites:
+                site = id(node)
+                node.escapes = site in escaping or any(name in escaping for name in holders.get(site, ()))
+                self.sites += 1
+                self.stack_allocated += not node.escapes
+        return self.stack_allocated
+
+    def _leaks(self) -> dict[Symbol, set[int]]:
+        """Returns the indices of the parameters each function or method lets escape."""
+        leaks: dict[Symbol, set[int]] = {frame.function: set() for frame in self._frames if frame.function is not None}
+        changed = True
+        while changed:
+            changed = False
+            for frame in self._frames:
+                if frame.function is None:
+                    continue
+                escaping = self._escaping(frame, leaks)
+                indices = {index for index, name in enumerate(frame.function.parameters()) if name in escaping}
+                if indices != leaks[frame.function]:
+                    leaks[frame.function] = indices
+                    changed = True
+        return leaks
+
+    @staticmethod
+    def _escaping(frame: _Frame, leaks: dict[Symbol, set[int]]) -> set[Source]:
+        """Returns the values of a frame that escape, given what the functions they are passed to let escape."""
+        escaping = set(frame.escaping)
+        for function, index, source in frame.passed:
+            indices = leaks.get(function)
+            if indices is None or index in indices:  # Unknown functions let anything escape
+                escaping.add(source)
+        return escaping
+
+    # Values
+
+    def _sources(self, node: ASTNode) -> list[Source]:
+        """Returns the values an expression's object may come from."""
+        sources: list[Source] = []
+        # Worked through with a list rather than recursion, for deeply nested ternaries
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if (
+                node.type == ASTType.CALL_EXPRESSION
+                and node.binding is not None
+                and node.binding.kind == SymbolKind.CLASS
+            ):
+                sources.append(id(node))
+            elif node.type == ASTType.IDENTIFIER and node.binding is not None:
+                sources.append(node.binding)
+            elif node.type == ASTType.TERNARY_EXPRESSION:
+                _, if_true, if_false = (child for child in node.children if child.type not in _LAYOUT)
+                pending += (if_false, if_true)
+            elif node.type == ASTType.ASSIGNMENT_EXPRESSION:
+                pending.append(node.children[1])
+        return sources
+
+    def _escape(self, node: ASTNode) -> None:
+        self._stack[-1].escaping.update(self._sources(node))
+
+    def _use(self, symbol: Symbol | None) -> None:
+        """Records a name read, which lets its object escape when it belongs to another function or is in a lambda."""
+        if symbol is None or (symbol in self._stack[-1].names and not self._lambdas):
+            return
+        for frame in reversed(self._stack):
+            if symbol in frame.names:
+                frame.escaping.add(symbol)
+                return
+
+    def _store(self, name: Symbol, value: ASTNode) -> None:
+        """Records an object stored in a variable or parameter."""
+        frame = self._stack[-1]
+        for source in self._sources(value):
+            if name not in frame.names or isinstance(source, Symbol):
+                # A name of another function, or a second name for the object, may outlive it
+                frame.escaping.update((source, name))
+            else:
+                frame.stored.setdefault(name, []).append(source)
+
+    def _pass(self, function: Symbol | None, arguments: list[ASTNode], first: int = 0) -> None:
+        """Records the arguments of a call, passed from the parameter at index first of a function."""
+        frame = self._stack[-1]
+        for index, argument in enumerate(arguments, first):
+            for source in self._sources(argument):
+                if function is None:
+                    frame.escaping.add(source)
+                elif function.kind != SymbolKind.BUILTIN:
+                    frame.passed.append((function, index, source))
+
+    # Functions
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        if node.binding is not None:
+            self._stack.append(_Frame(node.binding, set(node.binding.parameters())))
+
+    visit_main_declaration = visit_class_method = visit_function_declaration
+
+    def leave_function_declaration(self, node: ASTNode) -> None:
+        if node.binding is not None:
+            self._frames.append(self._stack.pop())
+
+    leave_main_declaration = leave_class_method = leave_function_declaration
+
+    def visit_lambda_expression(self, node: ASTNode) -> Any:
+        self._lambdas += 1
+
+    def leave_lambda_expression(self, node: ASTNode) -> None:
+        self._lambdas -= 1
+
+    # Statements
+
+    def leave_variable_declaration(self, node: ASTNode) -> None:
+        if node.binding is not None:
+            self._stack[-1].names.add(node.binding)
+            self._store(node.binding, node.children[0])
+
+    def visit_for_statement(self, node: ASTNode) -> Any:
+        iterator = node.children[0]
+        if iterator.binding is not None:
+            self._stack[-1].names.add(iterator.binding)
+
+    def leave_return_statement(self, node: ASTNode) -> None:
+        if node.children:
+            self._escape(node.children[0])
+
+    def leave_assignment_expression(self, node: ASTNode) -> None:
+        target, value = node.children
+        if target.type == ASTType.IDENTIFIER and target.binding is not None:
+            self._store(target.binding, value)
+        else:
+            self._escape(value)  # Stored into an attribute
+
+    # Uses
+
+    def visit_identifier(self, node: ASTNode) -> Any:
+        self._use(node.binding)
+
+    def leave_pipe_expression(self, node: ASTNode) -> None:
+        for child in node.children:
+            self._escape(child)  # Passed to whatever the pipe calls
+
+    def leave_call_expression(self, node: ASTNode) -> None:
+        symbol = node.binding
+        if symbol is None:
+            return
+        if symbol.kind == SymbolKind.CLASS:
+            frame = self._stack[-1]
+            frame.sites.append(node)
+            if self._lambdas:
+                frame.escaping.add(id(node))
+            constructor = symbol.member(CONSTRUCTOR)
+            if constructor is not None:
+                frame.passed.append((constructor, 0, id(node)))  # The new object is the constructor's self
+                self._pass(constructor, node.children, 1)
+            return
+        self._pass(symbol if symbol.kind in (SymbolKind.FUNCTION, SymbolKind.BUILTIN) else None, node.children)
+
+    def visit_class_member_access(self, node: ASTNode) -> Any:
+        self._use(node.binding)
+        members, arguments = member_chain(node)
+        if not members or members[-1].type != ASTType.CALL_EXPRESSION:
+            return SKIP  # Reading an attribute keeps the object where it is
+        return arguments  # Walked before the call is recorded on leaving
+
+    def leave_class_member_access(self, node: ASTNode) -> None:
+        members, arguments = member_chain(node)
+        if not members or members[-1].type != ASTType.CALL_EXPRESSION:
+            return
+        method = members[0].binding if len(members) == 1 else None
+        if method is None or method.kind != SymbolKind.METHOD:
+            # A method of an unknown class, or of an object reached through attributes, which is not tracked
+            if node.binding is not None:
+                self._stack[-1].escaping.add(node.binding)
+            self._pass(None, arguments)
+        elif method.node.value.is_static:
+            self._pass(method, arguments)
+        else:
+            if node.binding is not None:
+                self._stack[-1].passed.append((method, 0, node.binding))
+            self._pass(method, arguments, 1)
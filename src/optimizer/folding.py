@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from typing import Any
+
+from src.ast_visit import SKIP, Transformer
+from src.codegen.decision import signed64
+from src.lexer import ConstantPool, TokenKeyword
+from src.lexer.constants import ConstantValue
+from src.parser import ASTNode, ASTType
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+# Node type of each folded value's type
+_LITERAL_TYPES: dict[type, ASTType] = {
+    bool: ASTType.BOOLEAN_LITERAL,
+    int: ASTType.NUMBER_LITERAL,
+    float: ASTType.NUMBER_LITERAL,
+    complex: ASTType.COMPLEX_LITERAL,
+    str: ASTType.STRING_LITERAL,
+}
+_LITERALS = frozenset(_LITERAL_TYPES.values())
+# Declarations visible in their whole scope, which shadow constants before them
+_HOISTED = frozenset({ASTType.FUNCTION_DECLARATION, ASTType.MAIN_DECLARATION, ASTType.CLASS_DECLARATION})
+
+
+def _has_negative_zero(value: ConstantValue) -> bool:
+    """Tests for a -0.0, which the constant pool would store as the equal 0.0."""
+    if isinstance(value, complex):
+        return _has_negative_zero(value.real) or _has_negative_zero(value.imag)
+    return isinstance(value, float) and value == 0.0 and math.copysign(1.0, value) < 0
+
+
+def _format(value: ConstantValue) -> str:
+    """Formats a value like the code generator's printf formats in a string template."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return f"{value:d}"
+    if isinstance(value, float):
+        return f"{value:g}"
+    assert isinstance(value, complex)
+    return f"({value.real:g}{value.imag:+g}j)"
+
+
+def _integer_arithmetic(operator: str, left: int, right: int) -> int | float | None:
+    if operator in ("+", "-", "*"):
+        # Wraps around like the 64-bit LLVM instructions
+        return signed64(left + right if operator == "+" else left - right if operator == "-" else left * right)
+    if operator == "/":
+        return _float_arithmetic(operator, float(left), float(right))
+    if operator == "**":
+        # sigil.ipow: a negative exponent truncates 1 / base ** -exponent to 0, unless base is 1 or -1
+        if right < 0:
+            return 1 if left == 1 else (-1 if right % 2 else 1) if left == -1 else 0
+        return signed64(pow(left, right, 1 << 64))
+    if right == 0:
+        return None  # Undefined at run time
+    # Python rounds // and % towards negative infinity, like the generated code
+    result = left // right if operator == "//" else left % right if operator == "%" else None
+    return result if result is not None and _INT64_MIN <= result <= _INT64_MAX else None
+
+
+def _float_arithmetic(operator: str, left: float, right: float) -> float | None:
+    try:
+        if operator == "+":
+            return left + right
+        if operator == "-":
+            return left - right
+        if operator == "*":
+            return left * right
+        if operator == "/":
+            return left / right
+        if operator == "//":
+            return float(math.floor(left / right))
+        if operator == "%":
+            # The truncated remainder of frem, given the sign of the divisor when they differ
+            remainder = math.fmod(left, right)
+            return remainder + right if remainder != 0.0 and (remainder < 0.0) != (right < 0.0) else remainder
+        if operator == "**":
+            return math.pow(left, right)
+    except (ArithmeticError, ValueError):
+        return None  # Division by zero, a domain error or an overflow, left to the generated code
+    return None
+
+
+def _complex_arithmetic(operator: str, left: complex, right: complex) -> complex | None:
+    # The formulas of the generated code, rather than Python's, whose division is scaled
+    a, b, c, d = left.real, left.imag, right.real, right.imag
+    if operator == "+":
+        return complex(a + c, b + d)
+    if operator == "-":
+        return complex(a - c, b - d)
+    if operator == "*":
+        return complex(a * c - b * d, a * d + b * c)
+    if operator == "/":
+        scale = c * c + d * d
+        if scale == 0.0:
+            return None
+        return complex((a * c + b * d) / scale, (b * c - a * d) / scale)
+    return None
+
+
+def arithmetic(operator: str, left: ConstantValue, right: ConstantValue) -> ConstantValue | None:
+    """
+    Returns the value of a binary operation on two literal values, or None when it cannot be folded.
+
+    Operands are converted to their common type like the code generator does:
+    booleans count as int64, and / on integers divides floats. Integers wrap
+    around at 64 bits, and // and % round towards negative infinity. Strings,
+    divisions by zero and overflowing floats are not folded.
+    """
+    if isinstance(left, str) or isinstance(right, str):
+        return None
+    if isinstance(left, complex) or isinstance(right, complex):
+        return _complex_arithmetic(operator, complex(left), complex(right))
+    if isinstance(left, float) or isinstance(right, float):
+        return _float_arithmetic(operator, float(left), float(right))
+    return _integer_arithmetic(operator, int(left), int(right))
+
+
+def negate(value: ConstantValue) -> ConstantValue | None:
+    """Returns the value of a unary minus on a literal value, or None when it cannot be folded."""
+    if isinstance(value, str):
+        return None
+    if isinstance(value, complex):
+        return complex(0.0 - value.real, 0.0 - value.imag)  # 0 - value, like the generated code
+    if isinstance(value, float):
+        return -value
+    return signed64(-int(value))
+
+
+class ConstantFolder(Transformer):
+    """
+    Folds the constant expressions of a parsed program into literals, before it is analyzed.
+
+    Arithmetic on number literals, unary minus on a literal, and, or and not
+    on boolean literals, and string templates whose segments are all literals
+    become a single literal, whose value is added to the constant pool.
+    Results follow Sigil's semantics (see arithmetic()); an operation whose
+    result only the generated code defines, like a division by zero, is kept.
+
+    A const declaration whose initializer folds to a literal is propagated:
+    the names reading it become copies of the literal. Names are looked up
+    through the scopes of the program like the SemanticAnalyzer does, so a
+    parameter or variable of the same name shadows the constant. Assigning
+    a constant is left for the analyzer to report.
+    """
+
+    def __init__(self, ast: dict[str, Any], constants: ConstantPool):
+        self._ast = ast
+        self._constants = constants
+        # Names declared by each enclosing scope: the literal of a propagated constant, or None
+        self._scopes: list[dict[str, ASTNode | None]] = []
+        # Number of literal nodes made
+        self.folded = 0
+
+    def fold(self) -> int:
+        """Folds the whole program in place, and returns the number of literals made."""
+        self.folded = 0
+        self._push(self._ast["body"])
+        self.transform_all(self._ast["body"])
+        self._scopes.pop()
+        return self.folded
+
+    # Literals
+
+    def _value(self, node: ASTNode) -> ConstantValue | None:
+        """Returns the value of a literal, or None for other nodes."""
+        if node.type not in _LITERALS or node.const < 0:
+            return None
+        return self._constants[node.const]
+
+    def _literal(self, value: ConstantValue | None, node: ASTNode) -> ASTNode | None:
+        """Returns the literal replacing node with a folded value, or None to keep node."""
+        if value is None or _has_negative_zero(value):
+            return None
+        self.folded += 1
+        text = _format(value) if isinstance(value, (str, bool)) else repr(value)
+        return ASTNode(_LITERAL_TYPES[type(value)], value=text, const=self._constants.intern(value), span=node.span)
+
+    # Scopes
+
+    def _push(self, statements: Iterable[ASTNode] = (), names: Iterable[Any] = ()) -> None:
+        scope: dict[str, ASTNode | None] = dict.fromkeys(map(str, names))
+        for node in statements:
+            if node.type in _HOISTED:
+                scope[str(node.value if node.type == ASTType.CLASS_DECLARATION else node.value.name)] = None
+        self._scopes.append(scope)
+
+    def _pop(self) -> None:
+        self._scopes.pop()
+
+    def _lookup(self, name: str) -> ASTNode | None:
+        for scope in reversed(self._scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def visit_function_declaration(self, node: ASTNode) -> Any:
+        self._push(node.children, (param.name for param in node.value.params))
+
+    visit_main_declaration = visit_function_declaration
+
+    def leave_function_declaration(self, node: ASTNode) -> None:
+        self._pop()
+
+    leave_main_declaration = leave_function_declaration
+
+    def visit_class_method(self, node: ASTNode) -> Any:
+        method = node.value
+        self._push(node.children, [param.name for param in method.fn.params] + ([] if method.is_static else ["self"]))
+
+    def leave_class_method(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_lambda_expression(self, node: ASTNode) -> Any:
+        self._push(names=(param.name for param in node.value.params))
+
+    def leave_lambda_expression(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_if_statement(self, node: ASTNode) -> Any:
+        self._push(node.children)
+
+    def leave_if_statement(self, node: ASTNode) -> None:
+        self._pop()
+
+    def visit_else_if_statement(self, node: ASTNode) -> Any:
+        # Else branches are the last children of the branch before them: their block replaces its block
+        self._pop()
+        self._push(node.children)
+
+    visit_else_statement = visit_else_if_statement
+
+    visit_loop_statement = visit_match_case = visit_if_statement
+    leave_loop_statement = leave_match_case = leave_if_statement
+
+    def visit_for_statement(self, node: ASTNode) -> Any:
+        iterator, *body = node.children
+        # The iterable before the iterator is declared, which it cannot refer to
+        node.children[1:2] = self.transform_all(body[:1])
+        self._push(body[1:], (iterator.value,))
+        node.children[2:] = self.transform_all(body[1:])
+        self._pop()
+        return SKIP
+
+    def leave_variable_declaration(self, node: ASTNode) -> None:
+        declaration = node.value
+        initializer = node.children[0]
+        constant = declaration.is_const and self._value(initializer) is not None
+        self._scopes[-1][str(declaration.name)] = initializer if constant else None
+
+    # Expressions
+
+    def visit_assignment_expression(self, node: ASTNode) -> Any:
+        # The target is a name to store to, not a value to fold
+        node.children[1:] = self.transform_all(node.children[1:])
+        return SKIP
+
+    def visit_identifier(self, node: ASTNode) -> Any:
+        literal = self._lookup(str(node.value))
+        if literal is None:
+            return None
+        self.folded += 1
+        return ASTNode(literal.type, value=literal.value, const=literal.const, span=node.span)
+
+    def leave_binary_expression(self, node: ASTNode) -> Any:
+        left, right = (self._value(child) for child in node.children)
+        if left is None or right is None:
+            return None
+        return self._literal(arithmetic(str(node.value), left, right), node)
+
+    def leave_unary_expression(self, node: ASTNode) -> Any:
+        value = self._value(node.children[0])
+        if value is None:
+            return None
+        if node.value == TokenKeyword.NOT:
+            return self._literal(not value, node) if isinstance(value, bool) else None
+        return self._literal(negate(value), node)
+
+    def leave_logical_expression(self, node: ASTNode) -> Any:
+        if node.value not in (TokenKeyword.AND, TokenKeyword.OR):
+            return None
+        left, right = (self._value(child) for child in node.children)
+        if not isinstance(left, bool) or not isinstance(right, bool):
+            return None
+        return self._literal(left and right if node.value == TokenKeyword.AND else left or right, node)
+
+    def leave_string_template(self, node: ASTNode) -> Any:
+        values = [self._value(child) for child in node.children]
+        if any(value is None for value in values):
+            return None
+        return self._literal("".join(_format(value) for value in values if value is not None), node)
@@ -1,12 +1,17 @@
+from src.parser.arena import ArenaNode, ASTArena  # noqa
+from src.parser.incremental import IncrementalParser, ParserEdit  # noqa
 from src.parser.parser import Parser  # noqa
-from src.parser.support import (
-    ParserError,
+from src.parser.support import (  # noqa
+    ASTClassAttribute,
+    ASTClassMethod,
+    ASTDeclaration,
+    ASTFunctionDeclaration,
     ASTNode,
     ASTType,
-    ASTFunctionDeclaration,
-    ASTDeclaration,
     ASTTypeValue,
-    ASTDeclaration,
-    ASTClassAttribute,
-    ASTClassMethod,
-)  # noqa
+    LazyBlock,
+    ParserError,
+    Span,
+    TokenStream,
+    member_chain,
+)
@@ -0,0 +1,323 @@
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from src.parser.support import ASTNode, ASTType, Span
+
+# Node types by their one-byte kind code
+NODE_KINDS: tuple[ASTType, ...] = tuple(ASTType)
+_KIND_CODES: dict[str, int] = {kind: code for code, kind in enumerate(NODE_KINDS)}
+
+# No first child, next sibling or value node
+NO_NODE = -1
+# Value column entries are an index into the value table, NO_VALUE for None,
+# or a node stored as another node's value (an if condition), encoded as _NODE_VALUE - index
+NO_VALUE = -1
+_NODE_VALUE = -2
+
+# Span of the nodes whose source is unknown
+NO_SPAN: Span = (0, 0, 0, 0)
+
+
+class ArenaNode:
+    """A lightweight, ASTNode-like handle on one node of an ASTArena."""
+
+    __slots__ = ("_arena", "index")
+
+    def __init__(self, arena: "ASTArena", index: int):
+        self._arena = arena
+        self.index = index
+
+    @property
+    def type(self) -> ASTType:
+        return NODE_KINDS[self._arena._kinds[self.index]]
+
+    @property
+    def value(self) -> Any:
+        return self._arena.value_at(self.index)
+
+    @property
+    def children(self) -> list["ArenaNode"]:
+        return list(self)
+
+    @property
+    def first_child(self) -> "ArenaNode | None":
+        return self._arena._handle(self._arena._first_children[self.index])
+
+    @property
+    def next_sibling(self) -> "ArenaNode | None":
+        return self._arena._handle(self._arena._next_siblings[self.index])
+
+    @property
+    def const(self) -> int:
+        return self._arena._consts.get(self.index, -1)
+
+    @property
+    def symbol(self) -> int:
+        return self._arena._symbols[self.index]
+
+    @property
+    def span(self) -> Span:
+        return self._arena.span_at(self.index)
+
+    def __iter__(self) -> Iterator["ArenaNode"]:
+        arena = self._arena
+        return (ArenaNode(arena, child) for child in arena.child_indices(self.index))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ArenaNode) and other._arena is self._arena and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self._arena), self.index))
+
+    def __repr__(self) -> str:
+        return f"ArenaNode({self.type!r}, {self.value!r}, index={self.index})"
+
+    def to_ast(self) -> ASTNode:
+        """Returns the subtree under this node as an ASTNode tree."""
+        return self._arena.to_ast(self.index)
+
+
+class ASTArena(Sequence[ArenaNode]):
+    """
+    Flat, struct-of-arrays storage for an AST.
+
+    Each node is an index into parallel columns: its one-byte kind code, an
+    index into a table of deduplicated values, the indices of its first child
+    and next sibling, and its source span. Indexing yields ArenaNode handles,
+    which read the columns on demand. Constant pool indices are sparse, and
+    symbol IDs live in a column of their own, like in the token buffers.
+    """
+
+    __slots__ = (
+        "_columns",
+        "_consts",
+        "_end_columns",
+        "_end_lines",
+        "_first_children",
+        "_kinds",
+        "_lines",
+        "_next_siblings",
+        "_roots",
+        "_symbols",
+        "_value_index",
+        "_value_table",
+        "_values",
+    )
+
+    def __init__(self) -> None:
+        self._kinds = array("B")
+        self._values = array("i")
+        self._first_children = array("i")
+        self._next_siblings = array("i")
+        self._lines = array("I")
+        self._columns = array("I")
+        self._end_lines = array("I")
+        self._end_columns = array("I")
+        self._symbols = array("i")
+        self._consts: dict[int, int] = {}  # Sparse: only literals have a constant index
+        self._value_table: list[Any] = []
+        self._value_index: dict[tuple[type, Any], int] = {}
+        self._roots = array("i")
+
+    @classmethod
+    def from_ast(cls, nodes: Iterable[ASTNode]) -> "ASTArena":
+        """
+        Flattens ASTNode trees, such as the body of a parsed program, into a new arena.
+
+        Nodes are stored in the order of preorder(), so every subtree occupies
+        a contiguous range of indices and a pass over the whole tree is a loop
+        over the columns. The trees are walked with an explicit stack, so their
+        depth is not limited by the recursion limit. Values are shared with the
+        trees, not copied.
+        """
+        arena = cls()
+        first_children, next_siblings, values = arena._first_children, arena._next_siblings, arena._values
+        last_children: dict[int, int] = {}
+        # (node, index of its parent, whether it is the parent's value rather than a child)
+        stack = [(node, NO_NODE, False) for node in reversed(list(nodes))]
+        while stack:
+            node, parent, is_value = stack.pop()
+            index = arena._add_node(node)
+            if is_value:
+                values[parent] = _NODE_VALUE - index
+            elif parent == NO_NODE:
+                arena._roots.append(index)
+            else:
+                previous = last_children.get(parent, NO_NODE)
+                if previous == NO_NODE:
+                    first_children[parent] = index
+                else:
+                    next_siblings[previous] = index
+                last_children[parent] = index
+            stack.extend((child, index, False) for child in reversed(node.children))
+            if isinstance(node.value, ASTNode):
+                stack.append((node.value, index, True))
+        return arena
+
+    def _add_node(self, node: ASTNode) -> int:
+        value = None if isinstance(node.value, ASTNode) else node.value
+        return self.add(node.type, value, const=node.const, symbol=node.symbol, span=node.span or NO_SPAN)
+
+    def add(self, node_type: str, value: Any = None, const: int = -1, symbol: int = -1, span: Span = NO_SPAN) -> int:
+        """Appends a node without children and returns its index; attach() links it into a tree."""
+        index = len(self._kinds)
+        self._kinds.append(_KIND_CODES[node_type])
+        self._values.append(NO_VALUE if value is None else self._intern_value(value))
+        self._first_children.append(NO_NODE)
+        self._next_siblings.append(NO_NODE)
+        line, column, end_line, end_column = span
+        self._lines.append(line)
+        self._columns.append(column)
+        self._end_lines.append(end_line)
+        self._end_columns.append(end_column)
+        self._symbols.append(symbol)
+        if const >= 0:
+            self._consts[index] = const
+        return index
+
+    def _intern_value(self, value: Any) -> int:
+        """Returns the value table index of a value; hashable values are keyed with their type and stored once."""
+        if type(value).__hash__ is None:
+            self._value_table.append(value)
+            return len(self._value_table) - 1
+        key = (type(value), value)
+        index = self._value_index.get(key)
+        if index is None:
+            index = self._value_index[key] = len(self._value_table)
+            self._value_table.append(value)
+        return index
+
+    def attach(self, parent: int, children: Sequence[int]) -> None:
+        """Makes children, in order, the children of parent, replacing any it had."""
+        first = NO_NODE
+        next_siblings = self._next_siblings
+        for child in reversed(children):
+            next_siblings[child] = first
+            first = child
+        self._first_children[parent] = first
+
+    def add_root(self, index: int) -> None:
+        self._roots.append(index)
+
+    @property
+    def roots(self) -> list[ArenaNode]:
+        return [ArenaNode(self, index) for index in self._roots]
+
+    def child_indices(self, index: int) -> Iterator[int]:
+        next_siblings = self._next_siblings
+        child = self._first_children[index]
+        while child != NO_NODE:
+            yield child
+            child = next_siblings[child]
+
+    def value_at(self, index: int) -> Any:
+        """Returns a node's value; a node stored as another node's value is returned as its handle."""
+        value = self._values[index]
+        if value >= 0:
+            return self._value_table[value]
+        if value == NO_VALUE:
+            return None
+        return ArenaNode(self, _NODE_VALUE - value)
+
+    def span_at(self, index: int) -> Span:
+        return self._lines[index], self._columns[index], self._end_lines[index], self._end_columns[index]
+
+    def _known_span(self, index: int) -> Span | None:
+        span = self.span_at(index)
+        return None if span == NO_SPAN else span
+
+    def _handle(self, index: int) -> ArenaNode | None:
+        return None if index == NO_NODE else ArenaNode(self, index)
+
+    def preorder(self, index: int | None = None) -> Iterator[int]:
+        """
+        Yields the indices of the nodes under the roots, or under index, in depth-first pre-order.
+
+        Nodes stored as another node's value come before that node's children.
+        """
+        first_children, next_siblings, values = self._first_children, self._next_siblings, self._values
+        stack = list(reversed(self._roots)) if index is None else [index]
+        while stack:
+            index = stack.pop()
+            yield index
+            child = first_children[index]
+            if child != NO_NODE:
+                children = []
+                while child != NO_NODE:
+                    children.append(child)
+                    child = next_siblings[child]
+                stack.extend(reversed(children))
+            if values[index] <= _NODE_VALUE:
+                stack.append(_NODE_VALUE - values[index])
+
+    def walk(self) -> Iterator[ArenaNode]:
+        """Yields a handle on every node, in the order of preorder()."""
+        return (ArenaNode(self, index) for index in self.preorder())
+
+    def kind_at(self, index: int) -> ASTType:
+        return NODE_KINDS[self._kinds[index]]
+
+    def indices_of(self, node_type: str) -> Iterator[int]:
+        """Yields the indices of the nodes of a type, in index order, by scanning the kind column."""
+        kinds, code = self._kinds, _KIND_CODES[node_type]
+        index = -1
+        while True:
+            try:
+                index = kinds.index(code, index + 1)
+            except ValueError:
+                return
+            yield index
+
+    def to_ast(self, index: int | None = None) -> Any:
+        """
+        Rebuilds the ASTNode trees of the roots, or the subtree under index.
+
+        The nodes are created in one pass and linked in a second one, so this
+        does not recurse either.
+        """
+        kinds, values, table = self._kinds, self._values, self._value_table
+        consts, symbols = self._consts, self._symbols
+        order = list(self.preorder(index))
+        nodes = {
+            i: ASTNode(type=NODE_KINDS[kinds[i]], const=consts.get(i, -1), symbol=symbols[i], span=self._known_span(i))
+            for i in order
+        }
+        for i in order:
+            node, value = nodes[i], values[i]
+            if value >= 0:
+                node.value = table[value]
+            elif value != NO_VALUE:
+                node.value = nodes[_NODE_VALUE - value]
+            node.children = [nodes[child] for child in self.child_indices(i)]
+        if index is not None:
+            return nodes[index]
+        return [nodes[root] for root in self._roots]
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the columns, in bytes; values are shared with the parser."""
+        columns = (
+            self._kinds,
+            self._values,
+            self._first_children,
+            self._next_siblings,
+            self._lines,
+            self._columns,
+            self._end_lines,
+            self._end_columns,
+            self._symbols,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def __getitem__(self, index: int) -> ArenaNode:  # type: ignore[override]
+        if index < 0:
+            index += len(self._kinds)
+        if not 0 <= index < len(self._kinds):
+            raise IndexError(index)
+        return ArenaNode(self, index)
+
+    def __iter__(self) -> Iterator[ArenaNode]:
+        return (ArenaNode(self, i) for i in range(len(self._kinds)))
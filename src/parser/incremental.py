@@ -0,0 +1,146 @@
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Any
+
+from src.lexer import ConstantPool, SymbolInterner, Token, TokenIndentation, TokenKeyword, kind_mask
+from src.parser.parser import Parser
+from src.parser.support import ASTNode, ASTType
+
+_DECLARATION_KEYWORDS = kind_mask({TokenKeyword.FN, TokenKeyword.FUNCTION, TokenKeyword.CLASS})
+_INDENT = TokenIndentation.INDENT.mask
+_DEDENT = TokenIndentation.DEDENT.mask
+_EOF = TokenIndentation.EOF.mask
+_BLOCK_ENDS = _DEDENT | _EOF
+
+
+@dataclass
+class ParserEdit:
+    """The outcome of an IncrementalParser parse: the new Program and what became of its declarations."""
+
+    ast: dict[str, Any]
+    # Indices in ast["body"] of the declarations taken unchanged from the previous parse
+    reused: list[int] = field(default_factory=list)
+    # Indices in ast["body"] of the declarations parsed again
+    reparsed: list[int] = field(default_factory=list)
+
+
+def _declaration_end(tokens: Sequence[Token], start: int) -> int:
+    """Returns the index after the DEDENT closing the block of the declaration at start, or of the EOF."""
+    depth = 0
+    for index in range(start, len(tokens)):
+        kind = tokens[index].type.mask
+        if kind & _INDENT:
+            depth += 1
+        elif kind & _DEDENT:
+            depth -= 1
+            if depth <= 0:
+                return index + 1
+        elif kind & _EOF:
+            return index
+    return len(tokens)
+
+
+def _slice_key(tokens: Sequence[Token], start: int, end: int) -> bytes:
+    """
+    Hashes the kinds, values and relative positions of tokens[start:end].
+
+    Lines are taken relative to the first token, so a declaration that only
+    moved up or down the file keeps its key. DEDENT and EOF tokens take the
+    position of the line after the block, which does not reach the AST, so
+    their positions are left out.
+    """
+    tokens = tokens[start:end]
+    first_line = tokens[0].line
+    placed = [token for token in tokens if not token.type.mask & _BLOCK_ENDS]
+    digest = blake2b(digest_size=16)
+    # One column at a time, which is several times faster than formatting every token
+    digest.update(bytes([token.type.code for token in tokens]))
+    digest.update(array("i", [token.line - first_line for token in placed]).tobytes())
+    digest.update(array("I", [token.column for token in placed]).tobytes())
+    digest.update("\0".join([token.value for token in tokens]).encode())
+    return digest.digest()
+
+
+def _shift_spans(node: ASTNode, lines: int) -> None:
+    """Moves the spans of a lean subtree by a number of lines."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.span is not None:
+            line, column, end_line, end_column = node.span
+            node.span = (line + lines, column, end_line + lines, end_column)
+        stack.extend(node.children)
+        if isinstance(node.value, ASTNode):
+            stack.append(node.value)
+
+
+class IncrementalParser:
+    """
+    Keeps a Program AST across edits, re-parsing only the top-level declarations that changed.
+
+    Every function and class declaration is keyed on a hash of its token
+    slice, found by matching the INDENT and DEDENT tokens of its block. On the
+    next parse, declarations whose key is unchanged are reused from the
+    previous tree instead of going through _function_statement or
+    _class_statement again; other top-level statements are always parsed.
+
+    The constant pool and the symbol interner must be the ones the tokens
+    were produced with (e.g. an IncrementalLexer's), so that the constant
+    indices and symbol IDs in reused nodes stay valid.
+    """
+
+    def __init__(
+        self,
+        constants: ConstantPool | None = None,
+        symbols: SymbolInterner | None = None,
+        lean: bool = False,
+    ):
+        self.constants = constants if constants is not None else ConstantPool()
+        self.symbols = symbols if symbols is not None else SymbolInterner()
+        self.lean = lean
+        # Declarations of the previous parse by slice key, with the line they started at
+        self._declarations: dict[bytes, list[tuple[ASTNode, int]]] = {}
+        self._ast: dict[str, Any] = {"type": ASTType.PROGRAM, "body": []}
+
+    @property
+    def ast(self) -> dict[str, Any]:
+        return self._ast
+
+    def parse(self, tokens: Sequence[Token]) -> ParserEdit:
+        """Parses the tokens of the whole file, reusing the declarations whose tokens did not change."""
+        parser = Parser(tokens, self.constants, self.symbols, lean=self.lean)
+        previous = self._declarations
+        declarations: dict[bytes, list[tuple[ASTNode, int]]] = {}
+        edit = ParserEdit(ast=parser.ast)
+        body = parser.ast["body"]
+
+        while token := parser._current_token():
+            if not token.type.mask & _DECLARATION_KEYWORDS:
+                if statement := parser._statement():
+                    body.append(statement)
+                continue
+
+            start = parser.pos
+            end = _declaration_end(tokens, start)
+            key = _slice_key(tokens, start, end)
+            if candidates := previous.get(key):
+                node, line = candidates.pop()
+                if self.lean and line != token.line:
+                    _shift_spans(node, token.line - line)
+                parser.pos = end
+                edit.reused.append(len(body))
+            else:
+                node = parser._statement()  # type: ignore[assignment]
+                edit.reparsed.append(len(body))
+                if parser.pos != end:
+                    # The parser read past the block (e.g. a ternary spanning its DEDENT): never reuse it
+                    body.append(node)
+                    continue
+            declarations.setdefault(key, []).append((node, token.line))
+            body.append(node)
+
+        self._declarations = declarations
+        self._ast = parser.ast
+        return edit
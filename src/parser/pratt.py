@@ -0,0 +1,123 @@
+from src.lexer import (
+    TOKEN_KINDS,
+    TokenDelimiter,
+    TokenIdentifier,
+    TokenKeyword,
+    TokenKeywordSpecial,
+    TokenLiteral,
+    TokenOperator,
+    TokenType,
+)
+from src.parser.support import ASTType
+
+# Binding powers of the infix operators, from the loosest to the tightest
+PIPE_POWER = 1
+ASSIGNMENT_POWER = 2
+TERNARY_POWER = 3
+OR_POWER = 4
+AND_POWER = 5
+COMPARISON_POWER = 6
+ADDITIVE_POWER = 7
+MULTIPLICATIVE_POWER = 8
+# Unary operators bind tighter than every infix operator, and take a single prefix expression
+UNARY_POWER = 9
+
+NO_POWER = -1
+
+# Prefix rules: how the parser starts an expression on a token
+PREFIX_UNARY = 0  # Unary operator applied to the following prefix expression
+PREFIX_LITERAL = 1  # Literal of the node type in PREFIX_TYPES
+PREFIX_NAME = 2  # Identifier, member access chain or call
+PREFIX_PARENTHESIS = 3
+PREFIX_LAMBDA = 4
+PREFIX_TEMPLATE = 5  # String template between backticks
+
+# Infix rules: how the parser builds the node of an infix operator
+INFIX_BINARY = 0  # Left-associative node of the type in INFIX_TYPES, valued with the operator's lexeme
+INFIX_LOGICAL = 1  # Likewise, valued with the operator's kind
+INFIX_TERNARY = 2  # condition ? true_expr : false_expr
+INFIX_ASSIGNMENT = 3  # Non-associative target = value
+INFIX_PIPE = 4  # Left-associative expr |> function or call
+
+NO_RULE = -1
+
+
+# Kinds are listed in the order they are tested, since kinds of different enums may be equal
+PREFIX_OPERATORS: dict[TokenType, tuple[int, ASTType | None]] = {
+    TokenKeyword.NOT: (PREFIX_UNARY, ASTType.UNARY_EXPRESSION),
+    TokenOperator.MINUS: (PREFIX_UNARY, ASTType.UNARY_EXPRESSION),
+    TokenLiteral.INTEGER: (PREFIX_LITERAL, ASTType.NUMBER_LITERAL),
+    TokenLiteral.FLOAT: (PREFIX_LITERAL, ASTType.NUMBER_LITERAL),
+    TokenLiteral.COMPLEX: (PREFIX_LITERAL, ASTType.COMPLEX_LITERAL),
+    TokenLiteral.STRING: (PREFIX_LITERAL, ASTType.STRING_LITERAL),
+    TokenLiteral.BOOLEAN: (PREFIX_LITERAL, ASTType.BOOLEAN_LITERAL),
+    TokenLiteral.NONE: (PREFIX_LITERAL, ASTType.NONE_LITERAL),
+    TokenLiteral.ELLIPSIS: (PREFIX_LITERAL, ASTType.ELLIPSIS_LITERAL),
+    TokenDelimiter.LPAREN: (PREFIX_PARENTHESIS, None),
+    TokenIdentifier.IDENTIFIER: (PREFIX_NAME, ASTType.IDENTIFIER),
+    TokenKeyword.SELF: (PREFIX_NAME, ASTType.IDENTIFIER),
+    TokenKeyword.LAMBDA: (PREFIX_LAMBDA, ASTType.LAMBDA_EXPRESSION),
+    TokenKeywordSpecial.LAMBDA_SPECIAL: (PREFIX_LAMBDA, ASTType.LAMBDA_EXPRESSION),
+    TokenDelimiter.BACKSTICK: (PREFIX_TEMPLATE, ASTType.STRING_TEMPLATE),
+}
+
+INFIX_OPERATORS: dict[TokenType, tuple[int, int, ASTType | None]] = {
+    TokenOperator.PIPE: (PIPE_POWER, INFIX_PIPE, ASTType.PIPE_EXPRESSION),
+    TokenOperator.EQUAL: (ASSIGNMENT_POWER, INFIX_ASSIGNMENT, ASTType.ASSIGNMENT_EXPRESSION),
+    TokenOperator.QUESTION: (TERNARY_POWER, INFIX_TERNARY, ASTType.TERNARY_EXPRESSION),
+    TokenKeyword.OR: (OR_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenKeyword.AND: (AND_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.EQUAL_EQUAL: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.NOT_EQUAL: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.LESS: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.LESS_EQUAL: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.GREATER: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.GREATER_EQUAL: (COMPARISON_POWER, INFIX_LOGICAL, ASTType.LOGICAL_EXPRESSION),
+    TokenOperator.PLUS: (ADDITIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.MINUS: (ADDITIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.MULTIPLY: (MULTIPLICATIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.DIVIDE: (MULTIPLICATIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.FLOOR_DIV: (MULTIPLICATIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.POWER: (MULTIPLICATIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+    TokenOperator.MOD: (MULTIPLICATIVE_POWER, INFIX_BINARY, ASTType.BINARY_EXPRESSION),
+}
+
+
+def _build_prefix_tables() -> tuple[list[int], list[ASTType | None]]:
+    """
+    Spreads PREFIX_OPERATORS into lists indexed by kind code.
+
+    Kinds are matched with ==, like the parser's other kind tests, so kinds
+    of other enums with an equal value get the entry listed first.
+    """
+    rules = [NO_RULE] * len(TOKEN_KINDS)
+    node_types: list[ASTType | None] = [None] * len(TOKEN_KINDS)
+    for kind in TOKEN_KINDS:
+        for operator, (rule, node_type) in PREFIX_OPERATORS.items():
+            if kind == operator:
+                rules[kind.code], node_types[kind.code] = rule, node_type
+                break
+    return rules, node_types
+
+
+def _build_infix_tables() -> tuple[list[int], list[int], list[ASTType | None]]:
+    """
+    Spreads INFIX_OPERATORS into lists indexed by kind code.
+
+    Kinds are matched with ==, so kinds of other enums with an equal value
+    get the same entry.
+    """
+    powers = [NO_POWER] * len(TOKEN_KINDS)
+    rules = [NO_RULE] * len(TOKEN_KINDS)
+    node_types: list[ASTType | None] = [None] * len(TOKEN_KINDS)
+    for kind in TOKEN_KINDS:
+        for operator, (power, rule, node_type) in INFIX_OPERATORS.items():
+            if kind == operator:
+                powers[kind.code], rules[kind.code], node_types[kind.code] = power, rule, node_type
+    return powers, rules, node_types
+
+
+# Prefix rule and node type of each token kind; NO_RULE for the kinds that cannot start an expression
+PREFIX_RULES, PREFIX_TYPES = _build_prefix_tables()
+# Binding power, infix rule and node type of each token kind; NO_POWER for the kinds that are not infix operators
+BINDING_POWERS, INFIX_RULES, INFIX_TYPES = _build_infix_tables()
@@ -1,7 +1,16 @@
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Any
 
+from src.lexer import Token
+
+# Symbol IDs of names in the session's SymbolInterner; not part of node equality, like constant indices
+_SYMBOL = -1
+
+# (line, column, end_line, end_column) of a node's source, ending where its last token's value ends
+Span = tuple[int, int, int, int]
+
 
 class ParserError(Exception):
     message: str
@@ -25,6 +34,10 @@ class ParserError(Exception):
         self.line = line
         self.column = column
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Keeps the token details when errors are sent back from parser worker processes
+        return type(self), (self.message, self.type, self.value, self.line, self.column)
+
     def __str__(self) -> str:
         location = f" at line {self.line}, column {self.column}" if self.line and self.column else ""
         type_info = f" [Type: {self.type}]" if self.type else ""
@@ -36,6 +49,9 @@ class ParserError(Exception):
 class ASTTypeValue:
     name: str
     value: Any
+    symbol: int = field(default=_SYMBOL, compare=False, repr=False)
+    # Name of the class a name annotated as an OBJECT is declared with
+    class_name: str | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -43,12 +59,17 @@ class ASTFunctionDeclaration:
     name: str
     params: list[ASTTypeValue]
     return_type: str | None
+    symbol: int = field(default=_SYMBOL, compare=False, repr=False)
+    class_name: str | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
 class ASTDeclaration:
     name: str
     var_type: str | None
+    is_const: bool = False
+    symbol: int = field(default=_SYMBOL, compare=False, repr=False)
+    class_name: str | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -58,6 +79,8 @@ class ASTClassAttribute:
     is_static: bool
     is_pub: bool
     is_const: bool
+    symbol: int = field(default=_SYMBOL, compare=False, repr=False)
+    class_name: str | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -88,6 +111,8 @@ class ASTType(StrEnum):
     PIPE_EXPRESSION = "PipeExpression"
     ASSIGNMENT_EXPRESSION = "AssignmentExpression"
     MATCH_STATEMENT = "MatchStatement"
+    MATCH_CASE = "MatchCase"
+    MATCH_PATTERN = "MatchPattern"
     LOOP_STATEMENT = "LoopStatement"
     FOR_STATEMENT = "ForStatement"
     MAIN_DECLARATION = "MainDeclaration"
@@ -105,8 +130,135 @@ class ASTType(StrEnum):
     DEDENT = "Dedent"
 
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
     type: str
     value: Any = None
     children: list[Any] = field(default_factory=list)
+    # Index of a literal's decoded value in the parser's ConstantPool, or -1
+    const: int = field(default=-1, compare=False, repr=False)
+    # Symbol ID of an identifier's name, or -1
+    symbol: int = field(default=_SYMBOL, compare=False, repr=False)
+    # Source span, recorded by the parser in lean mode
+    span: Span | None = field(default=None, compare=False, repr=False)
+    # Symbol an identifier, call or declaration resolves to, set by the semantic analyzer; not pickled
+    binding: Any = field(default=None, compare=False, repr=False)
+    # Type of an expression's value (a TokenAnnotationTypes, or the class Symbol of an object), inferred by the
+    # semantic analyzer; not pickled
+    static_type: Any = field(default=None, compare=False, repr=False)
+    # Whether the object a class call creates may outlive its function, cleared by EscapeAnalysis; not pickled
+    escapes: bool = field(default=True, compare=False, repr=False)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickles as the positional field values, which is about half the size and load time of the default."""
+        return ASTNode, (self.type, self.value, self.children, self.const, self.symbol, self.span)
+
+
+def member_chain(node: ASTNode) -> tuple[list[ASTNode], list[ASTNode]]:
+    """
+    Returns the members a class member access goes through, in order, and the arguments of the call ending it.
+
+    Attributes are members without children and calls have their arguments,
+    except a call followed by another member, whose only child is that
+    member (parsed with no symbol ID). Chains not ending in a call have no
+    arguments.
+    """
+    members = []
+    member = node.children[0] if node.children else None
+    while member is not None:
+        members.append(member)
+        children = member.children
+        if member.type == ASTType.CALL_EXPRESSION and not (
+            len(children) == 1 and children[0].type == ASTType.CLASS_MEMBER_ACCESS and children[0].symbol < 0
+        ):
+            return members, children
+        member = children[0] if children else None
+    return members, []
+
+
+class LazyBlock(list):
+    """
+    The statements of a block, parsed when they are first used.
+
+    A list that calls its loader the first time any of its items is read or
+    changed, so a function body the parser skipped stands in
+    ASTNode.children like a parsed one. It compares, copies and pickles as
+    the plain list of its statements. Loader errors, such as a ParserError
+    in the skipped tokens, are raised at that first use.
+    """
+
+    __slots__ = ("_loader",)
+
+    def __init__(self, loader: Callable[[], list[Any]]):
+        super().__init__()
+        self._loader: Callable[[], list[Any]] | None = loader
+
+    @property
+    def loaded(self) -> bool:
+        return self._loader is None
+
+    def _load(self) -> None:
+        if (loader := self._loader) is not None:
+            statements = loader()
+            self._loader = None
+            list.extend(self, statements)
+
+    def __radd__(self, other: list[Any]) -> list[Any]:
+        self._load()
+        return other + list(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return list, (list(self),)
+
+
+def _loading(method: Callable[..., Any]) -> Callable[..., Any]:
+    def load_first(self: LazyBlock, *args: Any, **kwargs: Any) -> Any:
+        self._load()
+        return method(self, *args, **kwargs)
+
+    load_first.__name__ = method.__name__
+    load_first.__doc__ = method.__doc__
+    return load_first
+
+
+# Every list method that reads or changes the items; len() and truth tests go through __len__
+for _name in (
+    "__contains__", "__eq__", "__ne__", "__lt__", "__le__", "__gt__", "__ge__", "__getitem__", "__setitem__",
+    "__delitem__", "__iter__", "__reversed__", "__len__", "__add__", "__iadd__", "__mul__", "__rmul__", "__imul__",
+    "__repr__", "append", "extend", "insert", "pop", "remove", "index", "count", "clear", "copy", "sort", "reverse",
+):  # fmt: skip
+    setattr(LazyBlock, _name, _loading(getattr(list, _name)))
+
+
+class TokenStream:
+    """
+    A sliding window over a lazily produced token iterable.
+
+    Supports the indexed access the parser needs while only keeping a small
+    window of tokens alive, so memory does not grow with the input size.
+    Tokens more than `keep` positions behind the last requested one are released.
+    """
+
+    def __init__(self, tokens: Iterable[Token], keep: int = 8, release_every: int = 1024):
+        self._tokens = iter(tokens)
+        self._buffer: list[Token] = []
+        self._offset = 0  # Absolute index of self._buffer[0]
+        self._keep = keep
+        self._release_every = release_every
+
+    def __getitem__(self, index: int) -> Token:
+        position = index - self._offset
+        if position < 0:
+            raise IndexError(f"Token {index} was already released from the stream")
+        buffer = self._buffer
+        while position >= len(buffer):
+            token = next(self._tokens, None)
+            if token is None:
+                raise IndexError(index)
+            buffer.append(token)
+        if position >= self._release_every:
+            released = position - self._keep
+            del buffer[:released]
+            self._offset += released
+            position -= released
+        return buffer[position]
@@ -0,0 +1,143 @@
+from itertools import pairwise
+from textwrap import dedent
+
+import pytest
+
+from src.analyzer import ScopeKind, SemanticAnalyzer, SemanticError, SymbolKind
+from src.lexer import TableLexer
+from src.parser import ASTNode, ASTType, Parser
+
+CODE = dedent(
+    """
+    let limit = 10
+
+    class Point:
+        pub x: float64 = 0.0
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + scale(dx)
+
+    fn scale(value: float64) -> float64:
+        let factor = λ v => v * limit
+        if value > 0.0:
+            let value = 2.0
+            return factor(value)
+        else:
+            let value = 3.0
+        for item in value:
+            print(item)
+        return value
+
+    fn main() -> none:
+        let point = 1
+        print(scale(point))
+    """
+)
+
+
+def analyze(code: str, lean: bool = True, ids: bool = True) -> tuple[dict, SemanticAnalyzer]:
+    lexer = TableLexer(filename="scopes.sl", lines=dedent(code).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=lean)
+    ast = parser.parse()
+    analyzer = SemanticAnalyzer(ast, parser.constants, parser.symbols if ids else None)
+    analyzer.analyze()
+    return ast, analyzer
+
+
+def nodes(root: ASTNode, node_type: str, value: str | None = None) -> list[ASTNode]:
+    """The nodes of a type under root, in source order, optionally with a value."""
+    found, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        if node.type == node_type and (value is None or node.value == value):
+            found.append(node)
+        stack.extend(reversed(node.children))
+        if isinstance(node.value, ASTNode):
+            stack.append(node.value)
+    return found
+
+
+@pytest.mark.parametrize("lean", [True, False])
+@pytest.mark.parametrize("ids", [True, False])
+def test_names_resolve_to_their_declarations(lean: bool, ids: bool):
+    ast, analyzer = analyze(CODE, lean, ids)
+    program = {symbol.name: symbol for symbol in analyzer.scope}
+    assert list(program) == ["Point", "scale", "MAIN", "limit"]
+    scale = next(node for node in ast["body"] if node.type == ASTType.FUNCTION_DECLARATION)
+    assert scale.binding is program["scale"] and scale.binding.kind == SymbolKind.FUNCTION
+    assert scale.binding.members.kind == ScopeKind.FUNCTION
+
+    # Each branch declares its own value, which shadows the parameter
+    if_statement = nodes(scale, ASTType.IF_STATEMENT)[0]
+    condition, returned, for_iterable, last = nodes(scale, ASTType.IDENTIFIER, "value")
+    parameter, factor = scale.binding.members
+    assert factor.name == "factor"
+    assert condition.binding is parameter and parameter.kind == SymbolKind.PARAMETER
+    assert returned.binding is nodes(if_statement, ASTType.VARIABLE_DECLARATION)[0].binding
+    assert for_iterable.binding is last.binding is parameter
+    assert {returned.binding.scope.kind} == {ScopeKind.BLOCK}
+
+    # A lambda sees its parameters and the names around it
+    v, limit = nodes(scale, ASTType.IDENTIFIER)[:2]
+    assert v.binding.kind == SymbolKind.PARAMETER and v.binding.scope.kind == ScopeKind.LAMBDA
+    assert limit.binding is program["limit"]
+
+    item = nodes(scale, ASTType.IDENTIFIER, "item")
+    assert item[0].binding is item[1].binding and item[0].binding.kind == SymbolKind.VARIABLE
+    (call,) = nodes(scale, ASTType.CALL_EXPRESSION, "print")
+    assert call.binding.kind == SymbolKind.BUILTIN
+
+
+def test_functions_are_visible_before_their_declaration():
+    ast, _ = analyze(CODE)
+    point = ast["body"][1]
+    access, calls = nodes(point, ASTType.CLASS_MEMBER_ACCESS, "self"), nodes(point, ASTType.CALL_EXPRESSION)
+    assert {node.binding.name for node in access} == {"self"}
+    assert calls[0].binding is ast["body"][2].binding
+    assert nodes(point, ASTType.IDENTIFIER, "dx")[0].binding.kind == SymbolKind.PARAMETER
+    assert [symbol.kind for symbol in point.binding.members] == [SymbolKind.ATTRIBUTE, SymbolKind.METHOD]
+
+
+def test_method_call_arguments_are_resolved():
+    code = """
+    class Counter:
+        fn add(step: int64) -> none:
+            self.add(step)
+            self.add(missing)
+    """
+    with pytest.raises(SemanticError, match="Unknown name missing at line 5"):
+        analyze(code)
+
+
+@pytest.mark.parametrize(
+    ("code", "message"),
+    [
+        ("fn f() -> int64:\n    return y", "Unknown name y at line 2, column 11"),
+        ("fn f() -> none:\n    g(1)", "Unknown name g"),
+        ("fn f() -> none:\n    if true:\n        let a = 1\n    print(a)", "Unknown name a"),
+        ("fn f() -> none:\n    let a = a", "Unknown name a"),
+        ("fn f() -> none:\n    let a = 1\n    let a = 2", "a is already declared in this scope"),
+        ("fn f(a: int64, a: int64) -> none:\n    print(a)", "a is already declared in this scope"),
+        ("fn f() -> none:\n    print(1)\nlet f = 1", "f is already declared in this scope"),
+        ("fn f() -> none:\n    if true:\n        let b = 1\n    else:\n        print(b)", "Unknown name b"),
+        ("class A:\n    pub x: int64\n\n    fn get() -> int64:\n        return x", "Unknown name x"),
+        ("class A:\n    static fn make() -> none:\n        print(self)", "Unknown name self"),
+        ("fn f() -> none:\n    const a = 1\n    a = 2", "Cannot assign to constant a"),
+        ("fn f(p: Point) -> none:\n    print(1)", "Unknown class Point at line 1, column 0"),
+        ("fn g() -> none:\n    print(1)\n\nfn f() -> g:\n    g()", "Unknown class g"),
+    ],
+)
+def test_errors(code: str, message: str):
+    with pytest.raises(SemanticError, match=message):
+        analyze(code)
+
+
+def test_many_functions():
+    count = 5_000
+    code = "".join(f"fn f{n}(a: int64) -> int64:\n    return f{n + 1}(a)\n\n" for n in range(count))
+    code += f"fn f{count}(a: int64) -> int64:\n    return a\n"
+    ast, analyzer = analyze(code)
+    assert len(analyzer.scope) == count + 1
+    functions = ast["body"]
+    for caller, callee in pairwise(functions):
+        assert caller.children[0].children[0].binding is callee.binding
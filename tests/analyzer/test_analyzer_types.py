@@ -0,0 +1,136 @@
+from textwrap import dedent
+
+import pytest
+
+from src.analyzer import DEFAULT_PARAMETER_TYPE, SemanticAnalyzer, common_type
+from src.lexer import TableLexer, TokenAnnotationTypes
+from src.parser import ASTNode, ASTType, Parser
+
+T = TokenAnnotationTypes
+
+
+def analyze(code: str) -> dict[str, ASTNode]:
+    """Analyzes a program and returns its top-level declarations by name."""
+    lexer = TableLexer(filename="types.sl", lines=dedent(code).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True)
+    ast = parser.parse()
+    SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
+    return {str(node.binding.name): node for node in ast["body"]}
+
+
+def locals_of(function: ASTNode) -> dict[str, object]:
+    return {symbol.name: symbol.type for symbol in function.binding.members}
+
+
+@pytest.mark.parametrize(
+    ("left", "right", "expected"),
+    [
+        (T.INT32, T.INT64, T.INT64),
+        (T.INT8, T.BOOL, T.INT8),
+        (T.BOOL, T.BOOL, T.INT64),
+        (T.INT64, T.FLOAT32, T.FLOAT32),
+        (T.FLOAT32, T.FLOAT64, T.FLOAT64),
+        (T.FLOAT64, T.COMPLEX, T.COMPLEX),
+        (T.STRING, T.INT64, None),
+        (None, T.INT64, None),
+    ],
+)
+def test_common_type(left, right, expected):
+    assert common_type(left, right) == expected
+
+
+def test_expressions_and_locals():
+    main = analyze(
+        """
+        fn main() -> none:
+            let count = 3
+            let half = count / 2
+            let small: int32 = 7
+            let mixed = small + 2.5
+            let flag = count > 1 and not half
+            let z = 1 + 2i
+            let text = `count {count}`
+            let negative = -true
+        """
+    )["MAIN"]
+    assert locals_of(main) == {
+        "count": T.INT64,
+        "half": T.FLOAT64,
+        "small": T.INT32,
+        "mixed": T.FLOAT64,
+        "flag": T.BOOL,
+        "z": T.COMPLEX,
+        "text": T.STRING,
+        "negative": T.INT64,
+    }
+    binary = main.children[1].children[0]
+    assert binary.type == ASTType.BINARY_EXPRESSION and binary.static_type == T.FLOAT64
+    assert [child.static_type for child in binary.children] == [T.INT64, T.INT64]
+
+
+def test_variables_widen_to_every_value_stored_in_them():
+    function = analyze(
+        """
+        fn accumulate(n: int64) -> float64:
+            let total = 0
+            let i = 0
+            let fixed: int32 = 0
+            loop:
+                if i >= n:
+                    return total
+                total = total + 0.5
+                fixed = fixed + 0.5
+                i = i + 1
+        """
+    )["accumulate"]
+    assert locals_of(function) == {"n": T.INT64, "total": T.FLOAT64, "i": T.INT64, "fixed": T.INT32}
+    increment = function.children[3].children[1].children[1]
+    assert increment.static_type == T.FLOAT64  # total + 0.5, with total already widened
+
+
+def test_parameters_take_the_types_of_their_arguments():
+    functions = analyze(
+        """
+        fn scale(value, factor) -> float64:
+            return value * factor
+
+        fn unused(x) -> none:
+            print(x)
+
+        fn main() -> none:
+            print(scale(2, 1.5))
+            print(scale(true, 3))
+        """
+    )
+    assert locals_of(functions["scale"]) == {"value": T.INT64, "factor": T.FLOAT64}
+    assert locals_of(functions["unused"]) == {"x": DEFAULT_PARAMETER_TYPE}
+    call = functions["MAIN"].children[0].children[0]
+    assert call.static_type == T.FLOAT64
+
+
+def test_names_annotated_with_a_class_have_its_type():
+    declarations = analyze(
+        """
+        class Point:
+            pub x: int64 = 0
+            pub next: Point
+
+            fn new(x: int64) -> Point:
+                self.x = x
+
+        fn getx(p: Point) -> int64:
+            let q: Point = p
+            return q.x
+
+        fn make() -> Point:
+            return Point(1)
+        """
+    )
+    point = declarations["Point"].binding
+    assert locals_of(declarations["getx"]) == {"p": point, "q": point}
+    assert declarations["make"].binding.type is point
+    assert point.member("next").type is point
+    access = declarations["getx"].children[1].children[0]
+    assert access.children[0].binding is point.member("x")
+    assert list(point.named_members) == ["x", "next", "new"]
+    assert point.member("y") is None and declarations["getx"].binding.member("p") is None
@@ -0,0 +1,174 @@
+from textwrap import dedent
+
+import pytest
+
+from src.analyzer import SemanticAnalyzer
+from src.ast_visit import REMOVE, SKIP, Transformer, Visitor
+from src.lexer import Lexer
+from src.parser import ASTNode, ASTType, Parser
+
+CODE = dedent(
+    """
+    class Point:
+        pub x: float64
+
+    let offset = 2
+
+    fn main() -> none:
+        let total = 1 + 2 * offset
+        if total > 5:
+            print(total)
+    """
+)
+
+
+def parse(code: str = CODE) -> list[ASTNode]:
+    return Parser(Lexer(filename="visit.sl", lines=code.splitlines()).tokenize(), lean=True).parse()["body"]
+
+
+def number(value: int) -> ASTNode:
+    return ASTNode(type=ASTType.NUMBER_LITERAL, value=str(value))
+
+
+class Recorder(Visitor):
+    def __init__(self):
+        self.events: list[tuple[str, str]] = []
+
+    def generic_visit(self, node):
+        self.events.append(("visit", node.type))
+
+    def generic_leave(self, node):
+        self.events.append(("leave", node.type))
+
+    def visit_binary_expression(self, node):
+        self.events.append(("visit", node.value))
+
+    def leave_binary_expression(self, node):
+        self.events.append(("leave", node.value))
+
+
+def test_hooks_run_in_pre_and_post_order():
+    recorder = Recorder()
+    recorder.visit(parse("let total = 1 + 2 * x")[0])
+    assert recorder.events == [
+        ("visit", ASTType.VARIABLE_DECLARATION),
+        ("visit", "+"),
+        ("visit", ASTType.NUMBER_LITERAL),
+        ("leave", ASTType.NUMBER_LITERAL),
+        ("visit", "*"),
+        ("visit", ASTType.NUMBER_LITERAL),
+        ("leave", ASTType.NUMBER_LITERAL),
+        ("visit", ASTType.IDENTIFIER),
+        ("leave", ASTType.IDENTIFIER),
+        ("leave", "*"),
+        ("leave", "+"),
+        ("leave", ASTType.VARIABLE_DECLARATION),
+    ]
+
+
+def test_values_are_walked_before_children_and_skip_prunes():
+    class Names(Visitor):
+        def __init__(self):
+            self.names: list[str] = []
+
+        def visit_identifier(self, node):
+            self.names.append(node.value)
+
+        def visit_class_declaration(self, node):
+            return SKIP
+
+    names = Names()
+    names.visit_all(parse())
+    assert names.names == ["offset", "total", "total"]
+
+
+def test_deep_trees_do_not_recurse():
+    node = ASTNode(type=ASTType.IDENTIFIER, value="x")
+    for _ in range(100_000):
+        node = ASTNode(type=ASTType.UNARY_EXPRESSION, value="-", children=[node])
+    recorder = Recorder()
+    recorder.visit(node)
+    assert len(recorder.events) == 2 * 100_001
+
+
+def test_hooks_must_name_a_node_type():
+    with pytest.raises(TypeError, match="visit_identifer"):
+
+        class Typo(Visitor):
+            def visit_identifer(self, node): ...
+
+
+def test_transformer_replaces_and_removes_in_place():
+    class Fold(Transformer):
+        def leave_binary_expression(self, node):
+            left, right = node.children
+            if left.type == right.type == ASTType.NUMBER_LITERAL:
+                return number(eval(f"{left.value} {node.value} {right.value}"))
+
+        def visit_class_declaration(self, node):
+            return REMOVE
+
+        def visit_identifier(self, node):
+            if node.value == "offset":
+                return number(2)
+
+    body = parse()
+    main = body[2]
+    assert Fold().transform_all(body) is body
+    assert [node.type for node in body] == [ASTType.VARIABLE_DECLARATION, ASTType.MAIN_DECLARATION]
+    assert body[1] is main
+    declaration, if_statement = main.children
+    assert declaration.children == [number(5)]
+    assert if_statement.value.children == [ASTNode(ASTType.IDENTIFIER, "total"), number(5)]
+
+
+def test_leave_hooks_see_children_after_removal():
+    class DropPrints(Transformer):
+        def __init__(self):
+            self.sizes: list[int] = []
+
+        def visit_call_expression(self, node):
+            return REMOVE
+
+        def leave_if_statement(self, node):
+            self.sizes.append(len(node.children))
+
+    transformer = DropPrints()
+    main = transformer.transform(parse()[2])
+    assert transformer.sizes == [0]
+    assert main is not None and main.children[1].children == []
+    assert DropPrints().transform(ASTNode(ASTType.CALL_EXPRESSION, "print")) is None
+
+
+def test_analyzer_records_top_level_declarations():
+    assert SemanticAnalyzer({"type": ASTType.PROGRAM, "body": parse()}).analyze() == {
+        "Point": ASTType.CLASS_DECLARATION,
+        "offset": ASTType.VARIABLE_DECLARATION,
+        "MAIN": ASTType.MAIN_DECLARATION,
+    }
+
+
+def test_hooks_can_choose_the_nodes_walked():
+    class Arguments(Recorder):
+        def visit_call_expression(self, node):
+            self.events.append(("visit", node.value))
+            return node.children[1:]
+
+    recorder = Arguments()
+    recorder.visit(parse("let x = f(a, 1)")[0].children[0])
+    assert recorder.events == [
+        ("visit", "f"),
+        ("visit", ASTType.NUMBER_LITERAL),
+        ("leave", ASTType.NUMBER_LITERAL),
+        ("leave", ASTType.CALL_EXPRESSION),
+    ]
+
+    class Drop(Transformer):
+        def visit_call_expression(self, node):
+            return node.children
+
+        def visit_identifier(self, node):
+            return REMOVE
+
+    call = Drop().transform(parse("let x = f(a, 1)")[0].children[0])
+    assert call is not None and call.children == [number(1)]
@@ -0,0 +1,97 @@
+from textwrap import dedent
+
+from src.cache import CacheEntry, CompilationCache, compiler_version
+from src.lexer import TableLexer, TokenBuffer
+from src.parser import Parser
+
+CODE = dedent(
+    """
+    class Point:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    fn main() -> none:
+        let total = 1 + 2 * 3.5
+        print(`total is {total}`)
+        let label = total > 6 ? 'yes' : 'no'
+    """
+)
+
+
+def compile_entry(code: str = CODE, lean: bool = True) -> CacheEntry:
+    lexer = TableLexer(filename="cached.sl", lines=code.splitlines())
+    tokens = TokenBuffer.from_tokens(lexer.tokenize())
+    parser = Parser(tokens, lexer.constants, lexer.symbols, lean=lean)
+    return CacheEntry(tokens=tokens, constants=parser.constants, symbols=parser.symbols, ast=parser.parse())
+
+
+def test_round_trip(tmp_path):
+    cache = CompilationCache(tmp_path)
+    entry = compile_entry()
+    key = cache.key(CODE.encode(), lean=True)
+    assert cache.load(key) is None
+    cache.store(key, entry)
+
+    loaded = cache.load(key)
+    assert loaded is not None
+    assert list(loaded.tokens) == list(entry.tokens)
+    assert [(token.const, token.symbol) for token in loaded.tokens] == [
+        (token.const, token.symbol) for token in entry.tokens
+    ]
+    assert loaded.ast == entry.ast
+    main = loaded.ast["body"][1]
+    assert main.span == entry.ast["body"][1].span
+    assert main.children[0].children[0].symbol == entry.ast["body"][1].children[0].children[0].symbol
+    assert list(loaded.constants) == list(entry.constants)
+    assert loaded.symbols.intern("total") == entry.symbols.intern("total")
+    assert list(tmp_path.iterdir()) == [cache.path(key)]
+
+
+def test_loaded_tokens_parse_to_the_same_ast(tmp_path):
+    cache = CompilationCache(tmp_path)
+    entry = compile_entry(lean=False)
+    key = cache.key(CODE.encode())
+    cache.store(key, entry)
+    loaded = cache.load(key, filename="moved.sl")
+    assert loaded is not None
+    assert loaded.tokens.filename == loaded.tokens[0].filename == "moved.sl"
+    assert Parser(loaded.tokens, loaded.constants, loaded.symbols).parse() == entry.ast
+
+
+def test_keys_cover_source_version_and_options(tmp_path):
+    cache = CompilationCache(tmp_path)
+    source = CODE.encode()
+    assert cache.key(source) == CompilationCache(tmp_path / "other").key(source)
+    assert cache.key(source) != cache.key(source + b"\n")
+    assert cache.key(source) != cache.key(source, lean=True)
+    assert cache.key(source) != CompilationCache(tmp_path, version="0.0.2").key(source)
+    assert cache.version == compiler_version()
+    path = tmp_path / "source.sl"
+    path.write_bytes(source)
+    assert cache.key(path) == cache.key(source)
+    assert cache.key(path, lean=True) == cache.key(source, lean=True)
+
+
+def test_damaged_entries_are_misses(tmp_path):
+    cache = CompilationCache(tmp_path)
+    key = cache.key(CODE.encode())
+    path = cache.store(key, compile_entry())
+    data = path.read_bytes()
+
+    path.write_bytes(data[: len(data) // 2])
+    assert cache.load(key) is None
+    path.write_bytes(b"not a cache entry")
+    assert cache.load(key) is None
+    path.write_bytes(data)
+    assert cache.load(key) is not None
+
+
+def test_too_deep_trees_are_not_stored(tmp_path):
+    cache = CompilationCache(tmp_path)
+    code = "let x = " + " + ".join(["a"] * 5_000)
+    key = cache.key(code.encode())
+    assert cache.store(key, compile_entry(code)) is None
+    assert list(tmp_path.iterdir()) == []
+    assert cache.load(key) is None
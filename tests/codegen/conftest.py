@@ -0,0 +1,46 @@
+import ctypes
+from collections.abc import Callable
+from textwrap import dedent
+from typing import Any
+
+import pytest
+from llvmlite import binding
+
+from src.analyzer import SemanticAnalyzer
+from src.codegen import CodeGenerator
+from src.lexer import Lexer
+from src.optimizer import ConstantFolder, EscapeAnalysis
+from src.parser import Parser
+
+
+def generate(code: str, fold: bool = False) -> str:
+    lexer = Lexer(filename="codegen.sl", lines=dedent(code).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True)
+    ast = parser.parse()
+    if fold:
+        ConstantFolder(ast, parser.constants).fold()
+    SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
+    EscapeAnalysis(ast).analyze()
+    return CodeGenerator(ast, parser.constants).generate()
+
+
+class Program:
+    """A generated module compiled in memory, whose functions are called through ctypes."""
+
+    def __init__(self, code: str, fold: bool = False):
+        self.ir = generate(code, fold)
+        module = binding.parse_assembly(self.ir)
+        module.verify()
+        machine = binding.Target.from_default_triple().create_target_machine()
+        self._engine = binding.create_mcjit_compiler(module, machine)
+        self._engine.finalize_object()
+
+    def function(self, name: str, restype: Any, *argtypes: Any) -> Callable[..., Any]:
+        address = self._engine.get_function_address(name)
+        assert address, f"{name} was not generated"
+        return ctypes.CFUNCTYPE(restype, *argtypes)(address)
+
+
+@pytest.fixture
+def compile_program() -> Callable[[str], Program]:
+    return Program
@@ -0,0 +1,86 @@
+import ctypes
+
+import pytest
+
+from src.codegen import CodegenError
+from tests.codegen.conftest import generate
+
+POINT = """
+class Point:
+    pub x: float64 = 0.0
+    pub y: float64 = 1.5
+
+    fn new(x: float64) -> Point:
+        self.x = x
+
+    fn moved(dx: float64) -> float64:
+        return self.x + dx + self.y
+
+    fn scale(factor: float64) -> none:
+        self.y = self.y * factor
+
+    static fn make(x: float64) -> Point:
+        return Point(x)
+"""
+
+
+def test_classes_lower_to_structs_and_methods(compile_program):
+    program = compile_program(
+        POINT
+        + """
+fn on_stack(x: float64) -> float64:
+    let p = Point(x)
+    p.scale(2.0)
+    return p.moved(1.0)
+
+fn made(x: float64) -> float64:
+    let p = Point.make(x)
+    p.x = p.x + 1.0
+    return p.moved(0.0)
+"""
+    )
+    assert '%"Point" = type {double, double}' in program.ir
+    assert '@"Point.moved"' in program.ir and '@"Point.make"' in program.ir
+    on_stack = program.function("on_stack", ctypes.c_double, ctypes.c_double)
+    made = program.function("made", ctypes.c_double, ctypes.c_double)
+    assert on_stack(2.0) == 6.0
+    assert made(2.0) == 4.5
+
+
+def test_objects_that_do_not_escape_are_allocated_on_the_stack():
+    ir = generate(
+        POINT
+        + """
+fn on_stack(x: float64) -> float64:
+    let p = Point(x)
+    return p.moved(1.0)
+"""
+    )
+    on_stack = ir[ir.index('define double @"on_stack"') :]
+    make = ir[ir.index('@"Point.make"') :]
+    assert 'alloca %"Point"' in on_stack and "malloc" not in on_stack.split("\n}\n")[0]
+    # Returned by make, so it outlives its frame
+    assert "malloc" in make.split("\n}\n")[0]
+
+
+def test_functions_never_called_take_their_annotated_objects(compile_program):
+    program = compile_program(
+        POINT
+        + """
+fn getx(p: Point) -> float64:
+    return p.x
+
+class Holder:
+    pub point: Point
+
+    fn put(p: Point) -> none:
+        self.point = p
+"""
+    )
+    assert 'define double @"getx"(%"Point"* %"p")' in program.ir
+    assert 'define void @"Holder.put"(%"Holder"* %"self", %"Point"* %"p")' in program.ir
+
+
+def test_unsupported_class_members_are_reported():
+    with pytest.raises(CodegenError, match="Static attribute count"):
+        generate("class Counter:\n    static count: int64 = 0\n")
@@ -0,0 +1,29 @@
+from textwrap import dedent
+
+from src.analyzer import SemanticAnalyzer
+from src.codegen import CodeGenerator
+from src.lexer import Lexer
+from src.parser import Parser
+
+
+def test_repeated_literals_share_one_global():
+    code = dedent(
+        """
+        fn main() -> none:
+            let a = 42 + 4_2 + 42
+            let s = 'hi' + 'hi'
+            if true:
+                let c = 2.5 + 3i
+        """
+    )
+    lexer = Lexer(filename="constants.sl", lines=code.splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants)
+    ast = parser.parse()
+    SemanticAnalyzer(ast).analyze()
+    ir = CodeGenerator(ast, parser.constants).generate()
+
+    assert ir.count("constant i64 42") == 1
+    assert ir.count('constant [3 x i8] c"hi\\00"') == 1
+    assert ir.count("constant i1 1") == 1
+    assert ir.count("constant double") == 1
+    assert ir.count("constant {double, double}") == 1
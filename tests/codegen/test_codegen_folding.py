@@ -0,0 +1,55 @@
+import ctypes
+
+import pytest
+
+RESULT_TYPES = {"int64": ctypes.c_int64, "float64": ctypes.c_double, "bool": ctypes.c_bool}
+EXPRESSIONS = [
+    ("int64", "7 // 2"),
+    ("int64", "-7 // 2"),
+    ("int64", "7 // -2"),
+    ("int64", "-7 % 2"),
+    ("int64", "7 % -2"),
+    ("int64", "3 ** 4"),
+    ("int64", "-2 ** 5"),
+    ("int64", "2 ** -1"),
+    ("int64", "-1 ** -3"),
+    ("int64", "2 ** 64 + 1"),
+    ("int64", "9223372036854775807 + 1"),
+    ("int64", "true + true * 3"),
+    ("int64", "-true"),
+    ("float64", "7 / 2"),
+    ("float64", "-7.5 % 2.0"),
+    ("float64", "7.5 % -2.0"),
+    ("float64", "-7.5 // 2"),
+    ("float64", "2.0 ** 0.5"),
+    ("float64", "1 + 2.5 * 2"),
+    ("bool", "true and not false"),
+    ("bool", "false or not true"),
+]
+
+
+@pytest.mark.parametrize(("result_type", "expression"), EXPRESSIONS)
+def test_folded_results_match_generated_code(compile_program, result_type: str, expression: str):
+    code = f"fn value() -> {result_type}:\n    return {expression}\n"
+    folded, generated = compile_program(code, fold=True), compile_program(code)
+    assert "sigil.ipow" not in folded.ir and "fdiv" not in folded.ir
+    restype = RESULT_TYPES[result_type]
+    assert folded.function("value", restype)() == generated.function("value", restype)()
+
+
+def test_constants_fold_into_top_level_initializers(compile_program, capfd):
+    program = compile_program(
+        """
+        const WIDTH = 80
+        const HEIGHT = WIDTH // 4 * 3
+        let area = WIDTH * HEIGHT
+
+        fn main() -> none:
+            print(`{WIDTH}x{HEIGHT}`, area, 2.5 + 3i * 2)
+        """,
+        fold=True,
+    )
+    assert "internal global i64 4800" in program.ir
+    assert program.function("main", ctypes.c_int32)() == 0
+    ctypes.CDLL(None).fflush(None)
+    assert capfd.readouterr().out == "80x60 4800 (2.5+6j)\n"
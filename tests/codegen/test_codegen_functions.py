@@ -0,0 +1,136 @@
+import ctypes
+
+import pytest
+
+from src.codegen import CodegenError
+from tests.codegen.conftest import generate
+
+ARITHMETIC = """
+fn floor_div(a: int64, b: int64) -> int64:
+    return a // b
+
+fn modulo(a: int64, b: int64) -> int64:
+    return a % b
+
+fn power(a: int64, b: int64) -> int64:
+    return a ** b
+
+fn float_modulo(a: float64, b: float64) -> float64:
+    return a % b
+
+fn divide(a: int64, b: int64) -> float64:
+    return a / b
+"""
+
+
+def test_integer_arithmetic_follows_floored_semantics(compile_program):
+    program = compile_program(ARITHMETIC)
+    int_function = (ctypes.c_int64, ctypes.c_int64, ctypes.c_int64)
+    floor_div = program.function("floor_div", *int_function)
+    modulo = program.function("modulo", *int_function)
+    power = program.function("power", *int_function)
+    pairs = [(7, 2), (-7, 2), (7, -2), (-7, -2), (6, 3)]
+    assert [floor_div(a, b) for a, b in pairs] == [a // b for a, b in pairs]
+    assert [modulo(a, b) for a, b in pairs] == [a % b for a, b in pairs]
+    assert [power(a, b) for a, b in [(3, 4), (-2, 5), (7, 0), (2, -1), (1, -3), (-1, -3)]] == [81, -32, 1, 0, 1, -1]
+
+    float_modulo = program.function("float_modulo", ctypes.c_double, ctypes.c_double, ctypes.c_double)
+    divide = program.function("divide", ctypes.c_double, ctypes.c_int64, ctypes.c_int64)
+    assert [float_modulo(a, b) for a, b in [(7.5, 2.0), (-7.5, 2.0)]] == [1.5, 0.5]
+    assert divide(7, 2) == 3.5
+
+
+def test_control_flow_and_short_circuits(compile_program):
+    program = compile_program(
+        """
+        let limit = 10
+
+        fn clamp(x: int64) -> int64:
+            if x < 0:
+                return 0
+            else if x > limit:
+                return limit
+            return x
+
+        fn between(x: float64) -> bool:
+            return x > 1 and x < 10 or x == -1
+
+        fn pick(x: int32) -> float64:
+            let picked = x > 0 ? x * 2 : 0.5
+            return picked
+
+        fn count(n: int64) -> int64:
+            let total = 0
+            let i = 0
+            loop:
+                if i == n:
+                    return total
+                total = total + i
+                i = i + 1
+        """
+    )
+    clamp = program.function("clamp", ctypes.c_int64, ctypes.c_int64)
+    between = program.function("between", ctypes.c_bool, ctypes.c_double)
+    pick = program.function("pick", ctypes.c_double, ctypes.c_int32)
+    count = program.function("count", ctypes.c_int64, ctypes.c_int64)
+    assert [clamp(x) for x in (-3, 4, 12)] == [0, 4, 10]
+    assert [between(x) for x in (0.5, 5.0, -1.0)] == [False, True, True]
+    assert [pick(3), pick(-1)] == [6.0, 0.5]
+    assert count(5) == 10
+
+
+def test_print_formats_each_type(compile_program, capfd):
+    program = compile_program(
+        """
+        fn main() -> none:
+            let s = 'hi' + ' there'
+            let n: int8 = 7
+            print(s, n, 2.5, true, 2.5 + 3i)
+            print(`{n} is {n > 5 ? 'big' : 'small'} (100%)`)
+        """
+    )
+    assert program.function("main", ctypes.c_int32)() == 0
+    ctypes.CDLL(None).fflush(None)
+    assert capfd.readouterr().out == "hi there 7 2.5 true (2.5+3j)\n7 is big (100%)\n"
+
+
+@pytest.mark.parametrize(
+    ("code", "message"),
+    [
+        ("fn f() -> int64:\n    return f", "f is not a variable"),
+        ("fn f() -> none:\n    let g = 1\n    g(1)", "g is not a function"),
+        ("fn f(a: int64) -> none:\n    f()", "f takes 1 arguments but 0 were given"),
+        ("let x = 1 + 2", "needs a literal initializer"),
+        ("print(1)", "must be inside a function"),
+        ("fn f() -> none:\n    let s = 'a' - 1", "Unsupported operand types"),
+    ],
+)
+def test_errors(code, message):
+    with pytest.raises(CodegenError, match=message):
+        generate(code)
+
+
+def test_inferred_types_are_native(compile_program):
+    program = compile_program(
+        """
+        fn accumulate(n: int64) -> float64:
+            let total = 0
+            let i = 0
+            loop:
+                if i >= n:
+                    return total
+                total = total + 0.5
+                i = i + 1
+
+        fn scale(value, factor) -> float64:
+            return value * factor
+
+        fn main() -> none:
+            print(scale(2, 1.5))
+        """
+    )
+    assert program.function("accumulate", ctypes.c_double, ctypes.c_int64)(5) == 2.5
+    assert program.function("scale", ctypes.c_double, ctypes.c_int64, ctypes.c_double)(3, 0.5) == 1.5
+    assert '%"total" = alloca double' in program.ir and '%"i" = alloca i64' in program.ir
+    assert 'define double @"scale"(i64 %"value", double %"factor")' in program.ir
+    assert "fadd double" in program.ir
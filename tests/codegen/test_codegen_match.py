@@ -0,0 +1,123 @@
+import ctypes
+
+from src.codegen import DecisionTree, string_hash
+
+CLASSIFY = """
+fn classify(x: int64) -> int64:
+    match x:
+        1, 2, 3:
+            return 10
+        4:
+            return 20
+        -5:
+            return 30
+        2:
+            return 99
+        _:
+            return -1
+    return 0
+"""
+
+FRUIT = """
+fn fruit(name: string) -> int32:
+    match name:
+        'apple':
+            return 1
+        'pear', 'plum':
+            return 2
+        'apple':
+            return 3
+    return 0
+"""
+
+
+def test_decision_tree_takes_the_first_matching_arm():
+    tree = DecisionTree.from_arms([[1, 2], [2, 3], [True], None, [4]])
+    assert tree.cases == {1: 0, 2: 0, 3: 1}
+    assert tree.default == 3
+    # Arm 2 only lists a value taken by arm 0, and arm 4 follows the wildcard
+    assert tree.reachable == [0, 1, 3]
+
+
+def test_string_cases_are_bucketed_by_hash():
+    tree = DecisionTree.from_arms([["apple"], ["pear", "plum"]])
+    assert tree.buckets() == {
+        string_hash("apple"): [("apple", 0)],
+        string_hash("pear"): [("pear", 1)],
+        string_hash("plum"): [("plum", 1)],
+    }
+    assert string_hash("") == -3750763034362895579  # The FNV-1a offset basis, as a signed i64
+
+
+def test_integer_match_is_one_switch(compile_program):
+    program = compile_program(CLASSIFY)
+    assert program.ir.count("switch i64") == 1
+    assert "icmp" not in program.ir
+    classify = program.function("classify", ctypes.c_int64, ctypes.c_int64)
+    assert [classify(x) for x in (1, 2, 3, 4, -5, 0, 7)] == [10, 10, 10, 20, 30, -1, -1]
+
+
+def test_narrow_and_boolean_subjects(compile_program):
+    program = compile_program(
+        """
+        fn small(x: int8) -> int64:
+            match x:
+                300:
+                    return 1
+                -128:
+                    return 2
+            return 0
+
+        fn flag(b: bool) -> int64:
+            match b:
+                true:
+                    return 1
+                _:
+                    return 0
+        """
+    )
+    small = program.function("small", ctypes.c_int64, ctypes.c_int8)
+    flag = program.function("flag", ctypes.c_int64, ctypes.c_bool)
+    assert [small(x) for x in (44, -128, 0)] == [0, 2, 0]  # 300 is out of the range of int8
+    assert [flag(True), flag(False)] == [1, 0]
+
+
+def test_string_match_dispatches_on_hash(compile_program):
+    program = compile_program(FRUIT)
+    assert program.ir.count("switch i64") == 1
+    assert '@"sigil.hash"' in program.ir
+    fruit = program.function("fruit", ctypes.c_int32, ctypes.c_char_p)
+    assert [fruit(name) for name in (b"apple", b"pear", b"plum", b"fig", b"")] == [1, 2, 2, 0, 0]
+
+
+def test_float_match_compares_in_order(compile_program):
+    program = compile_program(
+        """
+        fn half(x: float64) -> int64:
+            match x:
+                0.5:
+                    return 1
+                1:
+                    return 2
+            return 0
+        """
+    )
+    half = program.function("half", ctypes.c_int64, ctypes.c_double)
+    assert [half(0.5), half(1.0), half(2.0)] == [1, 2, 0]
+
+
+def test_arms_fall_through_to_the_following_statements(compile_program):
+    program = compile_program(
+        """
+        fn count(x: int64) -> int64:
+            let total = 0
+            match x:
+                1:
+                    total = 10
+                2:
+                    total = 20
+            return total + 1
+        """
+    )
+    count = program.function("count", ctypes.c_int64, ctypes.c_int64)
+    assert [count(1), count(2), count(3)] == [11, 21, 1]
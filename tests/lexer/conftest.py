@@ -0,0 +1,10 @@
+from src.lexer import Lexer, SpanLexer
+
+
+def tokenize(lexer: Lexer) -> tuple[list, list[str]]:
+    """Returns the tokens of a lexer with the messages of its errors, which tokenize() raises after the last token."""
+    try:
+        return list(lexer.tokenize()), []
+    except ExceptionGroup as e:
+        tokens = lexer._spans if isinstance(lexer, SpanLexer) else lexer._tokens
+        return list(tokens), [str(error) for error in e.exceptions]
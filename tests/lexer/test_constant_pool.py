@@ -0,0 +1,89 @@
+import pytest
+
+from src.lexer import (
+    POOLED_CODES,
+    ConstantPool,
+    Lexer,
+    SpanLexer,
+    TableLexer,
+    TokenBuffer,
+    TokenLiteral,
+    decode_literal,
+)
+from src.parser import ASTType, Parser
+
+CODE = [
+    "let a = 1_000 + 1000 + 1.5e3 + 1_500.0 + 2i + 1e",
+    "let b = true or false or true",
+    "let s = 'it\\'s' + 'it\\'s' + `{a} \\{b\\} it\\'s`",
+]
+
+
+@pytest.mark.parametrize(
+    "token_type, lexeme, value",
+    [
+        (TokenLiteral.INTEGER, "1_000", 1000),
+        (TokenLiteral.FLOAT, "6.022e23", 6.022e23),
+        (TokenLiteral.FLOAT, ".5", 0.5),
+        (TokenLiteral.FLOAT, "1e+", 1.0),
+        (TokenLiteral.COMPLEX, "3i", 3j),
+        (TokenLiteral.COMPLEX, "2.5i", 2.5j),
+        (TokenLiteral.BOOLEAN, "false", False),
+        (TokenLiteral.STRING, "a\\nb\\'c\\q", "a\nb'c\\q"),
+    ],
+)
+def test_decode_literal(token_type: TokenLiteral, lexeme: str, value: object):
+    decoded = decode_literal(token_type, lexeme)
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_constant_pool_deduplicates_by_value_and_type():
+    pool = ConstantPool()
+    assert pool.add(TokenLiteral.INTEGER, "1_000") == pool.add(TokenLiteral.INTEGER, "1000")
+    assert len({pool.intern(1), pool.intern(1.0), pool.intern(True)}) == 3
+    assert list(pool) == [1000, 1, 1.0, True]
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer, SpanLexer])
+def test_tokens_carry_constant_indices(lexer_cls: type[Lexer]):
+    lexer = lexer_cls(filename="pool.sl", lines=CODE)
+    tokens = list(lexer.tokenize())
+    pool = lexer.constants
+    assert list(pool) == [1000, 1500.0, 2j, 1.0, True, False, "it's", " {b} it's"]
+    for token in tokens:
+        if token.type.code in POOLED_CODES:
+            assert pool[token.const] == decode_literal(token.type, token.value)
+        else:
+            assert token.const == -1
+
+
+def test_constant_indices_survive_token_buffer_and_parallel_lexing():
+    lexer = Lexer(filename="pool.sl", lines=CODE)
+    tokens = lexer.tokenize()
+    assert [view.const for view in TokenBuffer.from_tokens(tokens)] == [token.const for token in tokens]
+
+    parallel = Lexer(filename="pool.sl", lines=CODE * 3, parallel=2, parallel_threshold=1)
+    parallel_tokens = parallel.tokenize()
+    assert list(parallel.constants) == list(lexer.constants)
+    assert [token.const for token in parallel_tokens[: len(tokens) - 1]] == [token.const for token in tokens[:-1]]
+
+
+def test_parser_links_literals_to_constants():
+    lexer = Lexer(filename="pool.sl", lines=CODE[:1])
+    tokens = lexer.tokenize()
+    parser = Parser(tokens, lexer.constants)
+    declaration = parser.parse()["body"][0]
+    node = declaration.children[0]
+    literals = []
+    while node.type == ASTType.BINARY_EXPRESSION:
+        node, right = node.children
+        literals.append(right)
+    literals.append(node)
+    assert [parser.constants[literal.const] for literal in reversed(literals)] == [1000, 1000, 1500.0, 1500.0, 2j, 1.0]
+    assert parser.constants is lexer.constants
+
+    # Without the lexer's pool, the parser decodes literals into its own
+    standalone = Parser(tokens)
+    standalone.parse()
+    assert list(standalone.constants) == list(lexer.constants)
@@ -0,0 +1,28 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.lexer import Lexer, SpanLexer, TableLexer
+
+SOURCE = "fn main() -> none:\r\n    let café = 'naïve'\r\n\r\n    # comment\n    print(`{café}`)\n\nlet λx = 1"
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer, SpanLexer])
+@pytest.mark.parametrize("source", [SOURCE, SOURCE + "\n", ""])
+def test_from_path_matches_lines(tmp_path: Path, lexer_cls: type[Lexer], source: str):
+    path = tmp_path / "mapped.sl"
+    path.write_bytes(source.encode())
+    expected = Lexer(filename="mapped.sl", lines=source.splitlines()).tokenize()
+    assert list(lexer_cls.from_path(path).tokenize()) == expected
+    assert list(lexer_cls.from_path(str(path)).iter_tokens()) == expected
+
+
+def test_from_path_decodes_lazily(tmp_path: Path):
+    path = tmp_path / "lazy.sl"
+    path.write_bytes(b"let a = 1\nlet b = 2\n")
+    lexer = Lexer.from_path(path)
+    assert isinstance(lexer._lines, Iterator)
+    tokens = lexer.iter_tokens()
+    assert next(tokens).value == "let"
+    assert next(lexer._lines) == "let b = 2"  # type: ignore[call-overload]
@@ -0,0 +1,74 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import IncrementalLexer, Lexer, TableLexer, TokenIndentation
+
+CODE = dedent(
+    """
+    fn add(a: int32, b: int32) -> int32:
+        return a + b
+
+    fn main() -> none:
+        let total: int32 = add(3, 3)
+        if total > 5:
+            print(`total is {total}`)
+        return total
+    """
+).splitlines()
+
+
+def _lex(lines: list[str]) -> list:
+    return Lexer(filename="incremental.sl", lines=lines).tokenize()
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer])
+def test_incremental_lexer_initial_tokens(lexer_cls: type[Lexer]):
+    assert IncrementalLexer("incremental.sl", CODE, lexer_cls=lexer_cls).tokens == _lex(CODE)
+
+
+def test_incremental_lexer_edit_within_line():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    previous = list(lexer.tokens)
+    edit = lexer.edit(3, 3, "    return a - b")
+
+    assert edit.tokens == _lex(lexer.lines)
+    # Only the tokens of the edited line are replaced
+    assert [token.line for token in previous[edit.start : edit.old_end]] == [3] * (edit.old_end - edit.start)
+    assert edit.new_end - edit.start == edit.old_end - edit.start
+    assert edit.tokens[edit.old_end :] == previous[edit.old_end :]
+
+
+def test_incremental_lexer_insert_and_delete_lines():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    lexer.edit(4, 3, "fn sub(a: int32, b: int32) -> int32:\n    return a - b\n")
+    assert lexer.tokens == _lex(lexer.lines)
+
+    lexer.edit(2, 5, "")
+    assert lexer.tokens == _lex(lexer.lines)
+    assert lexer.tokens[-1].type == TokenIndentation.EOF
+
+
+def test_incremental_lexer_indentation_change_propagates():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    # Dedenting the if turns the rest of main into top-level code
+    edit = lexer.edit(5, 5, "fn main() -> none:\n")
+    lexer.edit(6, 6, "let total: int32 = add(3, 3)")
+    assert lexer.tokens == _lex(lexer.lines)
+    assert edit.errors == []
+
+
+def test_incremental_lexer_reports_errors():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    edit = lexer.edit(3, 3, "    return a $ b")
+    assert any("Unknown character: '$'" in str(error) for error in edit.errors)
+    assert lexer.errors == edit.errors
+
+    assert lexer.edit(3, 3, "    return a + b").errors == []
+    assert lexer.errors == []
+
+
+def test_incremental_lexer_invalid_range():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    with pytest.raises(ValueError):
+        lexer.edit(len(CODE) + 2, len(CODE) + 2, "x")
@@ -0,0 +1,49 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import Lexer, TableLexer
+from tests.lexer.conftest import tokenize
+
+CODE = dedent(
+    """
+    # A comment before the first declaration
+    class Point:
+        pub x: float64
+        pub y: float64
+
+        fn display() -> none:
+            print(`Point({self.x}, {self.y})`)
+
+    fn main() -> none:
+        let p: Point = Point(3.0, 4.0)
+        if p.x >= 3 and not p.y:
+            p.display()
+                let nested = 'deeper'
+        return
+    """
+).splitlines()
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer])
+def test_parallel_lexer_matches_sequential(lexer_cls: type[Lexer]):
+    lines = CODE * 5
+    sequential = tokenize(lexer_cls(filename="parallel.sl", lines=lines))
+    parallel = tokenize(lexer_cls(filename="parallel.sl", lines=lines, parallel=2, parallel_threshold=1))
+    assert parallel == sequential
+    assert not parallel[1]
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer])
+def test_parallel_lexer_matches_sequential_errors(lexer_cls: type[Lexer]):
+    lines = [*CODE, "let bad = 1000_ + $", "\tlet tab = 1", "  let broken = 'open", *CODE]
+    sequential = tokenize(lexer_cls(filename="parallel.sl", lines=lines))
+    parallel = tokenize(lexer_cls(filename="parallel.sl", lines=lines, parallel=3, parallel_threshold=1))
+    assert parallel == sequential
+    assert parallel[1]
+
+
+def test_parallel_lexer_below_threshold_stays_sequential(monkeypatch):
+    lexer = Lexer(filename="parallel.sl", lines=CODE, parallel=4)
+    monkeypatch.setattr(lexer, "_tokenize_parallel", lambda lines: pytest.fail("should not run in parallel"))
+    assert lexer.tokenize() == Lexer(filename="parallel.sl", lines=CODE).tokenize()
@@ -0,0 +1,65 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import Lexer, SpanLexer, SpanTokenBuffer, TokenIndentation
+from src.parser import Parser
+from tests.lexer.conftest import tokenize
+
+CODE = dedent(
+    """
+    class Point:
+        pub x: float64
+
+        fn display() -> none:
+            print(`Point({self.x}, { self.y }) \\{raw\\} {`)
+
+    fn main() -> none:
+        let p: Point = Point(3.0, 4.0)
+        let label = 'a \\'quoted\\' label' # comment
+        if p.x >= 3 and not p.y:
+            p.display()
+    """
+)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        CODE,
+        "let bad = 1000_ + $\n\tlet tab = 1\n  let broken = 'open\n",
+        "let x = 1\r\nlet y = `{x}`\r\n",
+        "",
+    ],
+)
+def test_span_lexer_matches_lexer(code: str):
+    expected = tokenize(Lexer(filename="spans.sl", lines=code.splitlines()))
+    assert tokenize(SpanLexer(filename="spans.sl", lines=code.splitlines())) == expected
+    assert tokenize(SpanLexer(filename="spans.sl", source=code)) == expected
+
+
+def test_span_tokens_point_into_source():
+    buffer = SpanLexer(filename="spans.sl", source=CODE).tokenize()
+    assert isinstance(buffer, SpanTokenBuffer)
+    assert buffer.source is CODE
+    for index, view in enumerate(buffer):
+        start, end = buffer.span(index)
+        if view.type is TokenIndentation.NEWLINE:
+            assert start == end
+        else:
+            assert CODE[start:end] == view.value
+    # line, column, start and end take 4 bytes each, the kind 1 byte
+    assert buffer.nbytes() == len(buffer) * 21
+
+
+def test_parse_span_tokens():
+    tokens = Lexer(filename="spans.sl", lines=CODE.splitlines()).tokenize()
+    assert Parser(SpanLexer(filename="spans.sl", source=CODE).tokenize()).parse() == Parser(tokens).parse()
+
+
+def test_span_lexer_iter_tokens_raises_after_last_token():
+    lexer = SpanLexer(filename="spans.sl")
+    seen: list = []
+    with pytest.raises(ExceptionGroup):
+        seen.extend(lexer.iter_tokens(["let x = $"]))
+    assert seen[-1].type is TokenIndentation.EOF
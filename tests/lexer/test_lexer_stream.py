@@ -0,0 +1,51 @@
+import io
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import Lexer, TableLexer, TokenIndentation
+
+CODE = dedent(
+    """
+    fn add(a: int32, b: int32) -> int32:
+        return a + b
+
+    fn main() -> none:
+        let total: int32 = add(3, 3)
+        if total > 5:
+            print(`total is {total}`)
+    """
+)
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer])
+def test_iter_tokens_matches_tokenize(lexer_cls: type[Lexer]):
+    expected = lexer_cls(filename="stream.sl", lines=CODE.splitlines()).tokenize()
+    assert list(lexer_cls(filename="stream.sl", lines=CODE.splitlines()).iter_tokens()) == expected
+    assert list(lexer_cls(filename="stream.sl").iter_tokens(io.StringIO(CODE))) == expected
+
+
+def test_iter_tokens_is_lazy():
+    consumed: list[str] = []
+
+    def lines():
+        for line in CODE.splitlines():
+            consumed.append(line)
+            yield line
+
+    tokens = Lexer(filename="lazy.sl").iter_tokens(lines())
+    first = next(tokens)
+    assert first.type == TokenIndentation.NEWLINE
+    assert len(consumed) == 1
+
+    assert list(tokens)[-1].type == TokenIndentation.EOF
+    assert len(consumed) == len(CODE.splitlines())
+
+
+def test_iter_tokens_reports_errors_at_end():
+    tokens = Lexer(filename="errors.sl").iter_tokens(["let x = $", "let y = 2"])
+    received: list = []
+    with pytest.raises(ExceptionGroup) as excinfo:
+        received.extend(tokens)
+    assert received[-1].type == TokenIndentation.EOF
+    assert any("Unknown character: '$' at errors.sl:1:9" in str(e) for e in excinfo.value.exceptions)
@@ -0,0 +1,72 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import (
+    Lexer,
+    TableLexer,
+    TokenDelimiter,
+    TokenIdentifier,
+    TokenIndentation,
+    TokenLiteral,
+    TokenOperator,
+)
+from tests.lexer.conftest import tokenize
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "const x: int32 = 42",
+        "let x: None = none",
+        "let y = 1_000.000_1 + 6.022e23 - 3.5e+20 * 5 - 1_000i",
+        "let s = '\\'quoted\\' # not a comment' # a comment",
+        "let t = `Hello, {name}! {user.name} \\{escaped\\} {`",
+        "let e = `` + `plain` + ``",
+        "x //= 2 ** 3 // 4 ... a.b |> f => g -> h := 1 <<= >>= != == <= >=",
+        "const sum = λ x, y => x + y",
+        "FN Fn fn FUNCTION Let IF if",
+        "let bad = 1000_ + $ + 'unterminated",
+        "let unterminated = `open {x",
+        "é² x² ıf .5 ..5",
+    ],
+)
+def test_table_lexer_matches_lexer_single_line(code: str):
+    assert tokenize(TableLexer(filename="table.sl", lines=[code])) == tokenize(Lexer(filename="table.sl", lines=[code]))
+
+
+def test_table_lexer_matches_lexer_program():
+    code = dedent(
+        """
+        class Point:
+            pub x: float64
+            pub y: float64
+
+            fn display() -> none:
+                print(`Point({self.x}, {self.y})`)
+
+        fn main() -> none:
+            let p: Point = Point(3.0, 4.0)
+            if p.x >= 3 and not p.y:
+                p.display()
+          let broken = 1
+        """
+    )
+    lines = code.splitlines()
+    assert tokenize(TableLexer(filename="table.sl", lines=lines)) == tokenize(Lexer(filename="table.sl", lines=lines))
+
+
+def test_table_lexer_maximal_munch():
+    tokens = TableLexer(filename="munch.sl", lines=["a **= b ... c .. d"]).tokenize()
+    assert [token.type for token in tokens] == [
+        TokenIdentifier.IDENTIFIER,
+        TokenOperator.POWER_EQUAL,
+        TokenIdentifier.IDENTIFIER,
+        TokenLiteral.ELLIPSIS,
+        TokenIdentifier.IDENTIFIER,
+        TokenDelimiter.DOT,
+        TokenDelimiter.DOT,
+        TokenIdentifier.IDENTIFIER,
+        TokenIndentation.NEWLINE,
+        TokenIndentation.EOF,
+    ]
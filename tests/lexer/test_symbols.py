@@ -0,0 +1,105 @@
+import pytest
+
+from src.lexer import (
+    KEYWORD_TABLE,
+    Lexer,
+    SpanLexer,
+    SymbolInterner,
+    TableLexer,
+    TokenAnnotationTypes,
+    TokenIdentifier,
+    TokenKeyword,
+    TokenKeywordSpecial,
+    TokenLiteral,
+)
+from src.parser import Parser
+
+CODE = [
+    "fn add(a: int64, b: int64) -> int64:",
+    "    let total = a + b",
+    "    return total",
+    "",
+    "fn main():",
+    "    let Total = add(1, 2) or total",
+    "    let λ = none or FN or Int or ß",
+]
+
+
+@pytest.mark.parametrize(
+    "spelling, kind",
+    [
+        ("fn", TokenKeyword.FN),
+        ("Let", TokenKeyword.LET),
+        ("RETURN", TokenKeyword.RETURN),
+        ("int64", TokenAnnotationTypes.INT64),
+        ("String", TokenAnnotationTypes.STRING),
+        ("int", TokenIdentifier.IDENTIFIER),
+        ("true", TokenLiteral.BOOLEAN),
+        ("True", TokenIdentifier.IDENTIFIER),
+        ("none", TokenLiteral.NONE),
+        ("NONE", TokenAnnotationTypes.NONE),
+        ("λ", TokenKeywordSpecial.LAMBDA_SPECIAL),
+        ("total", TokenIdentifier.IDENTIFIER),
+        ("ﬁ", TokenIdentifier.IDENTIFIER),
+    ],
+)
+def test_lookup_classifies_words(spelling: str, kind: object):
+    symbol, token_type = SymbolInterner().lookup(spelling)
+    assert token_type == kind
+    assert token_type.code == kind.code  # type: ignore[attr-defined]
+    assert symbol >= 0
+
+
+def test_keyword_table_is_lower_case():
+    assert all(not spelling.isascii() or spelling.islower() for spelling in KEYWORD_TABLE)
+
+
+def test_reserved_words_have_stable_ids():
+    first, second = SymbolInterner(), SymbolInterner()
+    second.intern("total")
+    assert first.intern("fn") == second.intern("fn")
+    assert first.intern("Return") == second.intern("Return")
+    assert first.intern("RETURN") == second.intern("RETURN")
+
+
+def test_intern_is_stable_within_a_session():
+    symbols = SymbolInterner()
+    symbol = symbols.intern("total")
+    assert symbols.intern("total") == symbol
+    assert symbols.intern("Total") != symbol
+    assert symbols.spelling(symbol) == "total"
+    assert "total" in symbols
+
+
+@pytest.mark.parametrize("lexer_cls", [Lexer, TableLexer, SpanLexer])
+def test_words_carry_symbol_ids(lexer_cls: type[Lexer]):
+    symbols = SymbolInterner()
+    tokens = list(lexer_cls(filename="symbols.sl", lines=CODE, symbols=symbols).tokenize())
+    words = [token for token in tokens if token.symbol >= 0]
+    assert all(symbols.spelling(token.symbol) == token.value for token in words)
+    assert {token.value for token in words} == {
+        *("fn", "add", "a", "b", "int64", "let", "total", "return", "main", "Total", "or"),
+        *("λ", "none", "FN", "Int", "ß"),
+    }
+
+
+def test_parallel_lexing_shares_symbol_ids():
+    symbols = SymbolInterner()
+    sequential = Lexer(filename="symbols.sl", lines=CODE * 10).tokenize()
+    parallel = Lexer(filename="symbols.sl", lines=CODE * 10, parallel=2, parallel_threshold=1, symbols=symbols)
+    for expected, token in zip(sequential, parallel.tokenize(), strict=True):
+        assert (token.symbol >= 0) == (expected.symbol >= 0)
+        if token.symbol >= 0:
+            assert symbols.spelling(token.symbol) == token.value
+
+
+def test_parser_keys_declarations_on_symbol_ids():
+    lexer = TableLexer(filename="symbols.sl", lines=CODE[:3])
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols)
+    add = parser.parse()["body"][0]
+    symbols = lexer.symbols
+    assert add.value.symbol == symbols.intern("add")
+    assert [param.symbol for param in add.value.params] == [symbols.intern("a"), symbols.intern("b")]
+    declaration, ret = add.children[2], add.children[4]
+    assert declaration.value.symbol == symbols.intern("total")
+    assert ret.children[0].symbol == declaration.value.symbol
@@ -0,0 +1,67 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import (
+    TOKEN_KINDS,
+    Lexer,
+    TokenAnnotationTypes,
+    TokenBuffer,
+    TokenDelimiter,
+    TokenLiteral,
+    kind_mask,
+    mask_kinds,
+)
+from src.parser import Parser
+
+CODE = dedent(
+    """
+    fn main() -> none:
+        let x: none = none
+        let total: complex = 2 + 3i
+        print(`total is {total}`)
+    """
+)
+
+
+def test_token_kind_codes_are_dense_and_distinct():
+    assert [kind.code for kind in TOKEN_KINDS] == list(range(len(TOKEN_KINDS)))
+    # Kinds with equal values still get their own code
+    assert TokenAnnotationTypes.NONE.code != TokenLiteral.NONE.code
+
+
+def test_kind_masks_follow_value_equality():
+    annotations = kind_mask(TokenAnnotationTypes)
+    for kind in TOKEN_KINDS:
+        assert bool(kind.mask & annotations) == (kind in set(TokenAnnotationTypes))
+    assert TokenLiteral.NONE.mask & annotations
+    assert not TokenLiteral.INTEGER.mask & annotations
+    assert mask_kinds(kind_mask({TokenDelimiter.LPAREN, TokenLiteral.STRING})) == [
+        TokenAnnotationTypes.STRING,
+        TokenDelimiter.LPAREN,
+        TokenLiteral.STRING,
+    ]
+
+
+def test_token_buffer_round_trip():
+    tokens = Lexer(filename="buffer.sl", lines=CODE.splitlines()).tokenize()
+    buffer = TokenBuffer.from_tokens(tokens)
+
+    assert buffer.filename == "buffer.sl"
+    assert len(buffer) == len(tokens)
+    assert [view.to_token() for view in buffer] == tokens
+    assert buffer[-1] == tokens[-1]
+    assert [type(view.type) for view in buffer] == [type(token.type) for token in tokens]
+    with pytest.raises(IndexError):
+        buffer[len(tokens)]
+
+
+def test_token_buffer_interns_values():
+    buffer = TokenBuffer.from_tokens(Lexer(filename="buffer.sl").iter_tokens(["let a = a + a"] * 10))
+    assert buffer._value_table.count("a") == 1
+    assert buffer.nbytes() < len(buffer) * 16
+
+
+def test_parse_token_buffer():
+    tokens = Lexer(filename="buffer.sl", lines=CODE.splitlines()).tokenize()
+    assert Parser(TokenBuffer.from_tokens(tokens)).parse() == Parser(tokens).parse()
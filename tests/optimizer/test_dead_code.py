@@ -0,0 +1,154 @@
+from textwrap import dedent
+
+from src.analyzer import SemanticAnalyzer
+from src.codegen import CodeGenerator
+from src.lexer import TableLexer
+from src.optimizer import DeadCodeEliminator
+from src.parser import ASTNode, ASTType, Parser
+
+CODE = """
+let scale = 2
+
+class Point:
+    pub x: int64 = 0
+
+    fn new(x: int64) -> none:
+        self.x = x
+
+    fn moved(dx: int64) -> int64:
+        return self.x + dx
+
+    fn unused() -> none:
+        print(self.x)
+
+class Unused:
+    fn moved() -> none:
+        print(1)
+
+fn helper(a: int64) -> int64:
+    return twice(a)
+    print(a)
+    fn twice(b: int64) -> int64:
+        return b * scale
+    fn thrice(b: int64) -> int64:
+        return b * 3
+
+fn unreachable(a: int64) -> int64:
+    return helper(a)
+
+fn main() -> none:
+    let p = Point(1)
+    if scale > 1:
+        print(helper(p.moved(2)))
+        return none
+        print(0)
+    else:
+        print(1)
+"""
+
+
+def eliminate(code: str, lean: bool = True) -> tuple[dict, Parser, int]:
+    lexer = TableLexer(filename="dead_code.sl", lines=dedent(code).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=lean)
+    ast = parser.parse()
+    SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
+    return ast, parser, DeadCodeEliminator(ast).eliminate()
+
+
+def names(nodes: list[ASTNode]) -> list[str]:
+    """The names of the functions, methods and classes among nodes."""
+    found = []
+    for node in nodes:
+        if node.type == ASTType.CLASS_DECLARATION:
+            found.append(node.value)
+        elif node.type == ASTType.CLASS_METHOD:
+            found.append(node.value.fn.name)
+        elif node.type in (ASTType.FUNCTION_DECLARATION, ASTType.MAIN_DECLARATION):
+            found.append(node.value.name)
+    return found
+
+
+def test_unreachable_declarations_are_removed():
+    ast, _, removed = eliminate(CODE)
+    body = ast["body"]
+    assert names(body) == ["Point", "helper", "MAIN"]
+    point, helper = body[1], body[2]
+    assert names(point.children) == ["new", "moved"]
+    assert names(helper.children) == ["twice"]
+    # print(a) and print(0) after returns, thrice, Point.unused, Unused and unreachable
+    assert removed == 6
+
+
+def test_statements_after_a_return_are_removed():
+    ast, _, _ = eliminate(CODE)
+    helper, main = ast["body"][2], ast["body"][3]
+    assert [node.type for node in helper.children] == [ASTType.RETURN_STATEMENT, ASTType.FUNCTION_DECLARATION]
+    if_statement = main.children[1]
+    assert [node.type for node in if_statement.children] == [
+        ASTType.CALL_EXPRESSION,
+        ASTType.RETURN_STATEMENT,
+        ASTType.ELSE_STATEMENT,
+    ]
+
+
+def test_layout_is_kept():
+    ast, _, removed = eliminate(CODE, lean=False)
+    assert removed == 6
+    assert names(ast["body"]) == ["Point", "helper", "MAIN"]
+    assert ast["body"][-1].type == ASTType.EOF
+
+
+def test_programs_without_main_keep_their_declarations():
+    code = "fn f() -> int64:\n    return 1\n    print(2)\n\nfn g() -> int64:\n    return 2\n"
+    ast, _, removed = eliminate(code)
+    assert removed == 1
+    assert names(ast["body"]) == ["f", "g"]
+
+
+def test_unreachable_functions_are_not_generated():
+    code = "fn used() -> int64:\n    return 1\n\nfn unused() -> int64:\n    return 2\n\nfn main() -> none:\n    print(used())\n"
+    ast, parser, _ = eliminate(code)
+    ir = CodeGenerator(ast, parser.constants).generate()
+    assert '@"used"' in ir and '@"main"' in ir and "unused" not in ir
+
+
+def test_classes_named_only_in_annotations_are_kept():
+    code = dedent(
+        """
+        class Point:
+            pub x: int64 = 0
+
+        class Holder:
+            pub point: Point
+
+        fn main() -> none:
+            let h = Holder()
+            print(1)
+        """
+    )
+    ast, parser, _ = eliminate(code)
+    assert names(ast["body"]) == ["Point", "Holder", "MAIN"]
+    ir = CodeGenerator(ast, parser.constants).generate()
+    assert '%"Holder" = type {%"Point"*}' in ir
+
+    code = dedent(
+        """
+        class Line:
+            pub x: int64 = 0
+
+        class Shape:
+            pub x: int64 = 0
+
+        class Unused:
+            pub x: int64 = 0
+
+        fn first(shape: Shape) -> Line:
+            let line: Line = shape
+            return line
+
+        fn main() -> none:
+            print(first)
+        """
+    )
+    ast, _, _ = eliminate(code)
+    assert names(ast["body"]) == ["Line", "Shape", "first", "MAIN"]
@@ -0,0 +1,195 @@
+from textwrap import dedent
+
+from src.analyzer import SemanticAnalyzer, SymbolKind
+from src.lexer import TableLexer
+from src.optimizer import EscapeAnalysis
+from src.parser import ASTNode, ASTType, Parser
+
+CLASS = """
+class Point:
+    pub x: int64 = 0
+
+    fn new(x: int64) -> Point:
+        self.x = x
+
+    fn moved(dx: int64) -> int64:
+        return self.x + dx
+
+    fn me() -> Point:
+        return self
+
+class Box:
+    pub item: Point
+    pub next: Box
+
+    fn new() -> Box:
+        self.item = Point(0)
+
+    fn put(p: Point) -> none:
+        self.item = p
+
+fn length(p: Point) -> int64:
+    return p.x
+
+fn keep(p: Point) -> Point:
+    return p
+"""
+
+
+def analyze(code: str) -> tuple[EscapeAnalysis, list[bool]]:
+    """Analyzes a program, and returns the analysis with whether each class call of main escapes, in order."""
+    lexer = TableLexer(filename="escape.sl", lines=(CLASS + dedent(code)).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True)
+    ast = parser.parse()
+    SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
+    analysis = EscapeAnalysis(ast)
+    analysis.analyze()
+    main = next(node for node in ast["body"] if node.type == ASTType.MAIN_DECLARATION)
+    return analysis, [site.escapes for site in class_calls(main)]
+
+
+def class_calls(node: ASTNode) -> list[ASTNode]:
+    found = []
+    stack = list(reversed(node.children))
+    while stack:
+        child = stack.pop()
+        if (
+            child.type == ASTType.CALL_EXPRESSION
+            and child.binding is not None
+            and child.binding.kind == SymbolKind.CLASS
+        ):
+            found.append(child)
+        stack.extend(reversed(child.children))
+    return found
+
+
+def test_local_objects_do_not_escape():
+    code = """
+    fn main() -> none:
+        let p = Point(1)
+        let q: Point = Point(2)
+        let x = q.x
+        print(p.moved(x))
+        p.x = length(q)
+    """
+    analysis, escapes = analyze(code)
+    assert escapes == [False, False]
+    # Box.new stores its Point into an attribute
+    assert (analysis.sites, analysis.stack_allocated) == (3, 2)
+
+
+def test_returned_objects_escape():
+    code = """
+    fn make() -> Point:
+        return Point(1)
+
+    fn main() -> none:
+        let p = Point(1)
+        let q = Point(2)
+        let r = Point(3)
+        let m = make()
+        let k = keep(p)
+        let s = q.me()
+        print(length(r))
+    """
+    _, escapes = analyze(code)
+    assert escapes == [True, True, False]
+
+
+def test_objects_stored_into_attributes_escape():
+    code = """
+    fn main() -> none:
+        let box = Box()
+        let p = Point(1)
+        box.put(p)
+        let q = Point(2)
+        box.item = q
+        let r = Point(3)
+        box.item.x = r.x
+    """
+    _, escapes = analyze(code)
+    assert escapes == [False, True, True, False]
+
+
+def test_objects_passed_to_methods_of_attributes_escape():
+    code = """
+    fn main() -> none:
+        let box = Box()
+        let p = Point(5)
+        box.next.put(p)
+        let q = Point(6)
+        print(length(q))
+    """
+    _, escapes = analyze(code)
+    # The box too, whose attribute's method may keep it
+    assert escapes == [True, True, False]
+
+
+def test_copied_and_captured_objects_escape():
+    code = """
+    let shared = 0
+
+    fn main() -> none:
+        let p = Point(1)
+        let q = p
+        let r = Point(2)
+        let f = lambda dx => r.moved(dx)
+        let s = Point(3)
+        let g = lambda dx => s
+        let t = Point(4)
+        t = Point(5)
+        print(t.x)
+    """
+    _, escapes = analyze(code)
+    assert escapes == [True, True, True, False, False]
+
+
+def test_objects_passed_to_unknown_calls_escape():
+    code = """
+    fn main() -> none:
+        let f = lambda p => p.x
+        let p = Point(1)
+        print(f(p))
+        let q = Point(2)
+        print(q)
+    """
+    _, escapes = analyze(code)
+    assert escapes == [True, False]
+
+
+def test_recursive_functions_reach_a_fixpoint():
+    code = """
+    fn forward(p: Point, n: int64) -> Point:
+        if n > 0:
+            return back(p, n - 1)
+        return p
+
+    fn back(p: Point, n: int64) -> Point:
+        return forward(p, n)
+
+    fn spin(p: Point, n: int64) -> int64:
+        if n > 0:
+            return spin(p, n - 1)
+        return p.x
+
+    fn main() -> none:
+        let p = Point(1)
+        let r = back(p, 2)
+        let q = Point(2)
+        print(spin(q, 2))
+    """
+    _, escapes = analyze(code)
+    assert escapes == [True, False]
+
+
+def test_deeply_nested_ternaries_do_not_recurse():
+    depth = 5000
+    code = f"""
+    fn main() -> none:
+        let p = Point(1)
+        let c = p.x > 0
+        let q = {"c ? Point(2) : " * depth}Point(3)
+    """
+    analysis, escapes = analyze(code)
+    assert escapes == [False] * (depth + 2)
+    assert analysis.sites == depth + 3
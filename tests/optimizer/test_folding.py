@@ -0,0 +1,127 @@
+from textwrap import dedent
+
+import pytest
+
+from src.analyzer import SemanticAnalyzer, SemanticError
+from src.lexer import TableLexer
+from src.optimizer import ConstantFolder, arithmetic, negate
+from src.parser import ASTNode, ASTType, Parser
+
+
+def fold(code: str) -> tuple[dict, Parser]:
+    lexer = TableLexer(filename="folding.sl", lines=dedent(code).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True)
+    ast = parser.parse()
+    ConstantFolder(ast, parser.constants).fold()
+    return ast, parser
+
+
+def returned(ast: dict, parser: Parser, function: int = 0) -> list:
+    """The values the return statements of a top-level function return, literals by their constant."""
+    found, stack = [], list(ast["body"][function].children)
+    while stack:
+        node = stack.pop()
+        if node.type == ASTType.RETURN_STATEMENT:
+            value = node.children[0]
+            found.append(parser.constants[value.const] if value.const >= 0 else value.type)
+        stack.extend(child for child in node.children if isinstance(child, ASTNode))
+        if isinstance(node.value, ASTNode):
+            stack.append(node.value)
+    return found[::-1]
+
+
+@pytest.mark.parametrize(
+    ("operator", "left", "right", "expected"),
+    [
+        ("//", -7, 2, -4),
+        ("%", 7, -2, -1),
+        ("%", -7.5, 2.0, 0.5),
+        ("//", -7.5, 2, -4.0),
+        ("/", 7, 2, 3.5),
+        ("**", 2, -1, 0),
+        ("**", -1, -3, -1),
+        ("**", 2, 63, -(2**63)),
+        ("+", True, True, 2),
+        ("*", 1 + 2j, 3j, -6 + 3j),
+        ("/", 1, 0, None),
+        ("//", 1, 0, None),
+        ("%", 1.0, 0.0, None),
+        ("**", 0.0, -1.0, None),
+        ("+", "a", "b", None),
+    ],
+)
+def test_arithmetic_follows_sigil_semantics(operator, left, right, expected):
+    result = arithmetic(operator, left, right)
+    assert result == expected and type(result) is type(expected)
+
+
+def test_negate():
+    assert negate(True) == -1 and negate(-(2**63)) == -(2**63) and negate(2.5) == -2.5
+    assert negate("text") is None
+
+
+def test_expressions_fold_into_literals():
+    ast, parser = fold(
+        """
+        fn values(x: int64) -> int64:
+            return 2 * 3 + 4
+            return -(5 - 7)
+            return not (true and false)
+            return `plain text`
+            return x + 2 * 3
+            return 1 // 0
+        """
+    )
+    assert returned(ast, parser) == [10, 2, True, "plain text", ASTType.BINARY_EXPRESSION, ASTType.BINARY_EXPRESSION]
+    kept = ast["body"][0].children[4].children[0]
+    assert kept.children[1].type == ASTType.NUMBER_LITERAL and parser.constants[kept.children[1].const] == 6
+
+
+def test_constants_are_propagated_through_scopes():
+    ast, parser = fold(
+        """
+        const LIMIT = 10 * 2
+        const NAME = 'sigil'
+        const VERSION = 1.5
+
+        fn values(x: int64) -> int64:
+            return LIMIT + 1
+            const LIMIT = 3
+            if x > LIMIT:
+                let LIMIT = x
+                return LIMIT
+            for NAME in x:
+                return NAME
+            let f = λ LIMIT => LIMIT
+            return `{NAME} {VERSION}!`
+            return LIMIT
+
+        fn shadowed(LIMIT: int64) -> int64:
+            return LIMIT
+        """
+    )
+    assert returned(ast, parser, 3) == [21, ASTType.IDENTIFIER, ASTType.IDENTIFIER, "sigil 1.5!", 3]
+    assert returned(ast, parser, 4) == [ASTType.IDENTIFIER]
+
+
+def test_variables_and_assignment_targets_are_kept():
+    ast, parser = fold(
+        """
+        fn main() -> none:
+            let count = 1
+            const step = 2
+            count = count + step
+            count = step
+        """
+    )
+    _, _, update, assign = ast["body"][0].children
+    target, value = update.children
+    assert target.type == value.children[0].type == ASTType.IDENTIFIER
+    assert parser.constants[value.children[1].const] == 2
+    assert assign.children[0].type == ASTType.IDENTIFIER and assign.children[1].type == ASTType.NUMBER_LITERAL
+
+
+def test_assigning_a_constant_is_an_error():
+    ast, parser = fold("fn main() -> none:\n    const step = 2\n    step = 3\n")
+    with pytest.raises(SemanticError, match="Cannot assign to constant step"):
+        SemanticAnalyzer(ast, parser.constants, parser.symbols).analyze()
@@ -10,6 +10,7 @@ from src.parser import (
     ASTType,
     ASTTypeValue,
     Parser,
+    member_chain,
 )
 
 
@@ -423,3 +424,18 @@ def test_parse_class_with_static_and_const_attributes():
         ],
     }
     assert ast == expected_ast
+
+
+def test_member_chain_lists_members_and_call_arguments():
+    chains = {}
+    for code in ("h.box.put(p)", "p.x", "p.moved(1, 2)", "a.b.c"):
+        lexer = Lexer(filename="member_chain.sl", lines=[code])
+        node = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=True).parse()["body"][0]
+        members, arguments = member_chain(node)
+        chains[code] = ([member.value for member in members], [argument.value for argument in arguments])
+    assert chains == {
+        "h.box.put(p)": (["box", "put"], ["p"]),
+        "p.x": (["x"], []),
+        "p.moved(1, 2)": (["moved"], ["1", "2"]),
+        "a.b.c": (["b", "c"], []),
+    }
@@ -0,0 +1,102 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import Lexer
+from src.parser import ASTNode, ASTType, Parser, ParserError
+
+
+def parse_body(code: str, lean: bool = True) -> list[ASTNode]:
+    lexer = Lexer(filename="match.sl", lines=dedent(code).splitlines())
+    body = Parser(lexer.tokenize(), lean=lean).parse()["body"]
+    return next(node for node in body if node.type == ASTType.FUNCTION_DECLARATION).children
+
+
+def number(value: str) -> ASTNode:
+    return ASTNode(type=ASTType.NUMBER_LITERAL, value=value)
+
+
+def returns(node: ASTNode) -> ASTNode:
+    return ASTNode(type=ASTType.RETURN_STATEMENT, value="RETURN", children=[node])
+
+
+def test_parse_match_arms():
+    code = """
+    fn sign(x: int64) -> int64:
+        match x:
+            0:
+                return 0
+            1, -1:
+                return 1
+
+            _:
+                return 2
+    """
+    (match,) = parse_body(code)
+    assert match == ASTNode(
+        type=ASTType.MATCH_STATEMENT,
+        value=ASTNode(type=ASTType.IDENTIFIER, value="x"),
+        children=[
+            ASTNode(
+                type=ASTType.MATCH_CASE,
+                value=ASTNode(type=ASTType.MATCH_PATTERN, children=[number("0")]),
+                children=[returns(number("0"))],
+            ),
+            ASTNode(
+                type=ASTType.MATCH_CASE,
+                value=ASTNode(
+                    type=ASTType.MATCH_PATTERN,
+                    children=[number("1"), ASTNode(type=ASTType.UNARY_EXPRESSION, value="-", children=[number("1")])],
+                ),
+                children=[returns(number("1"))],
+            ),
+            ASTNode(
+                type=ASTType.MATCH_CASE,
+                value=ASTNode(type=ASTType.MATCH_PATTERN),
+                children=[returns(number("2"))],
+            ),
+        ],
+    )
+    assert match.children[1].span == (6, 8, 7, 20)
+
+
+def test_parse_match_string_and_boolean_patterns():
+    code = """
+    fn run() -> none:
+        match name:
+            'a', 'b':
+                print(1)
+        match flag:
+            true, _:
+                print(2)
+        print(3)
+    """
+    first, second, call = parse_body(code)
+    pattern = first.children[0].value
+    assert [child.type for child in pattern.children] == [ASTType.STRING_LITERAL] * 2
+    # A wildcard alternative matches anything
+    assert second.children[0].value.children == []
+    assert call.type == ASTType.CALL_EXPRESSION
+
+
+def test_concrete_match_keeps_layout():
+    code = """
+    fn run() -> none:
+        match x:
+            1:
+                print(1)
+    """
+    match = parse_body(code, lean=False)[2]
+    assert [child.type for child in match.children] == [ASTType.INDENT, ASTType.MATCH_CASE, ASTType.DEDENT]
+
+
+@pytest.mark.parametrize("pattern", ["y", "1 + 2", "-'a'", "f(1)"])
+def test_patterns_must_be_literals(pattern):
+    code = f"""
+    fn run() -> none:
+        match x:
+            {pattern}:
+                print(1)
+    """
+    with pytest.raises(ParserError, match="Match patterns must be literals or _"):
+        parse_body(code)
@@ -0,0 +1,112 @@
+from textwrap import dedent
+
+from src.lexer import Lexer, TableLexer
+from src.parser import ArenaNode, ASTArena, ASTNode, ASTType, Parser
+from src.parser.arena import NO_SPAN
+
+CODE = dedent(
+    """
+    class Point:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    fn main() -> none:
+        let total = 1 + 2 * 3
+        if total > 5:
+            print(`big {total}`)
+        else:
+            print('small')
+        let twice = λ n => n * 2
+        let label = total > 6 ? 'yes' : 'no'
+    """
+)
+
+
+def parse_body(code: str = CODE) -> list[ASTNode]:
+    lexer = TableLexer(filename="arena.sl", lines=code.splitlines())
+    return Parser(lexer.tokenize(), lexer.constants, lexer.symbols).parse()["body"]
+
+
+def test_round_trip():
+    body = parse_body()
+    arena = ASTArena.from_ast(body)
+    rebuilt = arena.to_ast()
+    assert rebuilt == body
+    for node, expected in zip(arena.to_ast(), body, strict=True):
+        stack = [(node, expected)]
+        while stack:
+            node, expected = stack.pop()
+            assert (node.const, node.symbol) == (expected.const, expected.symbol)
+            stack.extend(zip(node.children, expected.children, strict=True))
+
+
+def test_nodes_are_stored_in_pre_order():
+    arena = ASTArena.from_ast(parse_body())
+    assert list(arena.preorder()) == list(range(len(arena)))
+    condition = next(node for node in arena.walk() if node.type == ASTType.IF_STATEMENT).value
+    assert isinstance(condition, ArenaNode)
+    assert condition.type == ASTType.LOGICAL_EXPRESSION
+
+
+def test_handles_read_the_columns():
+    body = parse_body("let total = 1 + x")
+    arena = ASTArena.from_ast(body)
+    declaration = arena.roots[0]
+    assert declaration.type == ASTType.VARIABLE_DECLARATION
+    assert declaration.value == body[0].value
+    expression = declaration.first_child
+    assert expression is not None and expression.value == "+"
+    one, x = expression.children
+    assert one.next_sibling == x and x.next_sibling is None
+    assert one.const == body[0].children[0].children[0].const >= 0
+    assert x.symbol == body[0].children[0].children[1].symbol >= 0
+    assert x.span == NO_SPAN
+    assert x.to_ast() == ASTNode(type=ASTType.IDENTIFIER, value="x")
+
+
+def test_indices_of_scans_kinds():
+    arena = ASTArena.from_ast(parse_body())
+    identifiers = list(arena.indices_of(ASTType.IDENTIFIER))
+    assert identifiers == [node.index for node in arena.walk() if node.type == ASTType.IDENTIFIER]
+    assert {arena[index].value for index in identifiers} == {"dx", "total", "n"}
+
+
+def test_values_are_deduplicated():
+    arena = ASTArena.from_ast(parse_body("let a = b + b + b"))
+    assert [arena[index].value for index in arena.indices_of(ASTType.IDENTIFIER)] == ["b", "b", "b"]
+    assert len(arena._value_table) == 3  # The declaration, "+" and "b"
+    assert arena.nbytes() == len(arena) * 33
+
+
+def test_builds_and_converts_deep_trees():
+    depth = 20_000
+    node = ASTNode(type=ASTType.IDENTIFIER, value="x")
+    for _ in range(depth):
+        node = ASTNode(type=ASTType.UNARY_EXPRESSION, value="-", children=[node])
+    arena = ASTArena.from_ast([node])
+    assert len(arena) == depth + 1
+    assert len(arena._value_table) == 2
+    leaf = arena.to_ast()[0]
+    for _ in range(depth):
+        leaf = leaf.children[0]
+    assert leaf == ASTNode(type=ASTType.IDENTIFIER, value="x")
+
+
+def test_add_and_attach():
+    arena = ASTArena()
+    call = arena.add(ASTType.CALL_EXPRESSION, "print", span=(1, 1, 1, 9))
+    argument = arena.add(ASTType.STRING_LITERAL, "hi", span=(1, 7, 1, 9))
+    arena.attach(call, [argument])
+    arena.add_root(call)
+    assert arena.to_ast() == [
+        ASTNode(type=ASTType.CALL_EXPRESSION, value="print", children=[ASTNode(ASTType.STRING_LITERAL, "hi")])
+    ]
+    assert arena[argument].span == (1, 7, 1, 9)
+
+
+def test_lexer_tokens_round_trip():
+    tokens = Lexer(filename="arena.sl", lines=CODE.splitlines()).tokenize()
+    body = Parser(tokens).parse()["body"]
+    assert ASTArena.from_ast(body).to_ast() == body
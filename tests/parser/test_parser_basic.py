@@ -316,7 +316,7 @@ def test_parser_main_and_complex_numbers():
                     ASTNode(type=ASTType.NEWLINE),
                     ASTNode(
                         type=ASTType.VARIABLE_DECLARATION,
-                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE),
+                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE, is_const=True),
                         children=[
                             ASTNode(
                                 type=ASTType.BINARY_EXPRESSION,
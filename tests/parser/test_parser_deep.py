@@ -0,0 +1,82 @@
+import pytest
+
+from src.lexer import TableLexer, TokenIndentation
+from src.parser import ASTNode, ASTType, Parser, ParserError
+
+
+def parse_expression(expression: str, lean: bool = False) -> ASTNode:
+    lexer = TableLexer(filename="deep.sl", lines=[f"let x = {expression}"])
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, lean=lean)
+    return parser.parse()["body"][0].children[0]
+
+
+def left_spine(node: ASTNode) -> list[ASTNode]:
+    """The nodes of a left-leaning chain, from the root to its first operand."""
+    spine = [node]
+    while node.type == ASTType.BINARY_EXPRESSION:
+        node = node.children[0]
+        spine.append(node)
+    return spine
+
+
+def test_long_binary_chain():
+    terms = 100_000
+    root = parse_expression(" + ".join(f"a{i % 10}" for i in range(terms)), lean=True)
+    spine = left_spine(root)
+    assert len(spine) == terms
+    assert spine[-1] == ASTNode(ASTType.IDENTIFIER, "a0")
+    assert [node.children[1].value for node in spine[:3]] == ["a9", "a8", "a7"]
+    assert root.span[:2] == spine[-2].span[:2] == (1, 8)
+
+
+def test_long_mixed_chain_respects_precedence():
+    terms = 20_000
+    root = parse_expression(" + ".join(["a * b"] * terms))
+    spine = left_spine(root)
+    assert len(spine) == terms + 1  # Down to the a of the first a * b
+    assert all(node.value == "+" and node.children[1].value == "*" for node in spine[:-2])
+    assert spine[-2].value == "*"
+
+
+def test_deeply_nested_parentheses():
+    depth = 10_000
+    assert parse_expression("(" * depth + "a" + ")" * depth) == ASTNode(ASTType.IDENTIFIER, "a")
+
+    node = parse_expression("(a + " * depth + "b" + ")" * depth)
+    for _ in range(depth):
+        assert node.type == ASTType.BINARY_EXPRESSION and node.children[0].value == "a"
+        node = node.children[1]
+    assert node == ASTNode(ASTType.IDENTIFIER, "b")
+
+
+def test_deeply_nested_unary_and_ternaries():
+    depth = 10_000
+    node = parse_expression("- " * depth + "a")
+    for _ in range(depth):
+        assert node.type == ASTType.UNARY_EXPRESSION
+        node = node.children[0]
+    assert node.value == "a"
+
+    node = parse_expression("a ? b : " * depth + "c", lean=True)
+    for _ in range(depth):
+        assert node.type == ASTType.TERNARY_EXPRESSION and node.children[1].value == "b"
+        node = node.children[2]
+    assert node.value == "c"
+
+
+def test_long_member_chain():
+    node = parse_expression("a" + ".b" * 100_000)
+    assert node.type == ASTType.CLASS_MEMBER_ACCESS
+    assert node.value == "a"
+    members = 0
+    while node.children:
+        node = node.children[0]
+        assert node.value == "b"
+        members += 1
+    assert members == 100_000
+
+
+def test_unclosed_parenthesis_is_reported():
+    with pytest.raises(ParserError) as error:
+        parse_expression("(" * 5_000 + "a" + ")" * 4_999)
+    assert (error.value.type, error.value.line) == (TokenIndentation.NEWLINE, 1)
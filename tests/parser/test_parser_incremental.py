@@ -0,0 +1,98 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import IncrementalLexer
+from src.parser import ASTType, IncrementalParser, Parser
+
+CODE = dedent(
+    """
+    fn add(a: int32, b: int32) -> int32:
+        return a + b
+
+    class Point:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    let offset = 3
+
+    fn main() -> none:
+        let total: int32 = add(3, offset)
+        if total > 5:
+            print(`total is {total}`)
+    """
+).splitlines()
+
+
+def full_parse(lexer: IncrementalLexer, lean: bool = False) -> dict:
+    return Parser(lexer.tokens, lexer.constants, lexer.symbols, lean=lean).parse()
+
+
+def test_initial_parse_matches_parser():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    edit = IncrementalParser(lexer.constants, lexer.symbols).parse(lexer.tokens)
+    assert edit.ast == full_parse(lexer)
+    body = edit.ast["body"]
+    assert [body[index].type for index in edit.reparsed] == [
+        ASTType.FUNCTION_DECLARATION,
+        ASTType.CLASS_DECLARATION,
+        ASTType.MAIN_DECLARATION,
+    ]
+    assert edit.reused == []
+
+
+def test_only_changed_declarations_are_reparsed():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    parser = IncrementalParser(lexer.constants, lexer.symbols)
+    previous = parser.parse(lexer.tokens).ast["body"]
+
+    lexer.edit(3, 3, "    return a - b")
+    edit = parser.parse(lexer.tokens)
+    body = edit.ast["body"]
+    assert edit.ast == full_parse(lexer)
+    assert [body[index].value.name for index in edit.reparsed] == ["add"]
+    assert [body[index].type for index in edit.reused] == [ASTType.CLASS_DECLARATION, ASTType.MAIN_DECLARATION]
+    for index in edit.reused:
+        assert body[index] is previous[index]
+
+
+@pytest.mark.parametrize("lean", [False, True])
+def test_moved_declarations_are_reused(lean: bool):
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    parser = IncrementalParser(lexer.constants, lexer.symbols, lean=lean)
+    parser.parse(lexer.tokens)
+
+    # Inserting lines moves every following declaration down without changing it
+    lexer.edit(5, 4, "fn sub(a: int32, b: int32) -> int32:\n    return a - b\n")
+    edit = parser.parse(lexer.tokens)
+    body = edit.ast["body"]
+    expected = full_parse(lexer, lean)
+    assert edit.ast == expected
+    assert [body[index].value.name for index in edit.reparsed] == ["sub"]
+    assert len(edit.reused) == 3
+    if lean:
+        assert [node.span for node in body] == [node.span for node in expected["body"]]
+        main = body[edit.reused[-1]]
+        assert main.children[0].span == expected["body"][-1].children[0].span
+
+
+def test_top_level_statements_are_always_parsed():
+    lexer = IncrementalLexer("incremental.sl", CODE)
+    parser = IncrementalParser(lexer.constants, lexer.symbols)
+    parser.parse(lexer.tokens)
+    lexer.edit(11, 11, "let offset = 4")
+    edit = parser.parse(lexer.tokens)
+    assert edit.ast == full_parse(lexer)
+    assert edit.reparsed == []
+    assert len(edit.reused) == 3
+
+
+def test_identical_declarations_are_not_shared():
+    lexer = IncrementalLexer("incremental.sl", CODE[1:4] * 2)
+    parser = IncrementalParser(lexer.constants, lexer.symbols)
+    parser.parse(lexer.tokens)
+    edit = parser.parse(lexer.tokens)
+    first, second = (edit.ast["body"][index] for index in edit.reused)
+    assert first == second and first is not second
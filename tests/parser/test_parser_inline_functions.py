@@ -335,7 +335,7 @@ def test_parser_simple_lambda_function(lambda_symbol):
             ASTNode(type=ASTType.NEWLINE),
             ASTNode(
                 type=ASTType.VARIABLE_DECLARATION,
-                value=ASTDeclaration(name="sum", var_type=TokenAnnotationTypes.NONE),
+                value=ASTDeclaration(name="sum", var_type=TokenAnnotationTypes.NONE, is_const=True),
                 children=[
                     ASTNode(
                         type=ASTType.LAMBDA_EXPRESSION,
@@ -374,7 +374,7 @@ def test_parser_simple_lambda_function(lambda_symbol):
                     ASTNode(type=ASTType.INDENT),
                     ASTNode(
                         type=ASTType.VARIABLE_DECLARATION,
-                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE),
+                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE, is_const=True),
                         children=[
                             ASTNode(
                                 type=ASTType.CALL_EXPRESSION,
@@ -419,7 +419,7 @@ def test_parser_lambda_function(lambda_symbol):
             ASTNode(type=ASTType.NEWLINE),
             ASTNode(
                 type=ASTType.VARIABLE_DECLARATION,
-                value=ASTDeclaration(name="sum", var_type=TokenAnnotationTypes.NONE),
+                value=ASTDeclaration(name="sum", var_type=TokenAnnotationTypes.NONE, is_const=True),
                 children=[
                     ASTNode(
                         type=ASTType.LAMBDA_EXPRESSION,
@@ -458,7 +458,7 @@ def test_parser_lambda_function(lambda_symbol):
                     ASTNode(type=ASTType.INDENT),
                     ASTNode(
                         type=ASTType.VARIABLE_DECLARATION,
-                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE),
+                        value=ASTDeclaration(name="total", var_type=TokenAnnotationTypes.NONE, is_const=True),
                         children=[
                             ASTNode(
                                 type=ASTType.CALL_EXPRESSION,
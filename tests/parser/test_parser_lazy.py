@@ -0,0 +1,116 @@
+import pickle
+from textwrap import dedent
+
+import pytest
+
+from src.analyzer import SemanticAnalyzer
+from src.lexer import TableLexer, TokenBuffer
+from src.parser import ASTType, LazyBlock, Parser, ParserError
+
+CODE = dedent(
+    """
+    fn add(a: int32, b: int32) -> int32:
+        if a > b:
+            return a - b
+        fn twice(x: int32) -> int32:
+            return x * 2
+        return twice(a + b)
+
+    class Point:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    let offset = add(1, 2)
+
+    fn main() -> none:
+        print(`offset is {offset}`)
+    """
+)
+
+
+def parse(code: str = CODE, buffered: bool = False, **options) -> dict:
+    lexer = TableLexer(filename="lazy.sl", lines=code.splitlines())
+    tokens = lexer.tokenize()
+    if buffered:
+        tokens = TokenBuffer.from_tokens(tokens)
+    return Parser(tokens, lexer.constants, lexer.symbols, **options).parse()
+
+
+def functions(ast: dict) -> list:
+    return [node for node in ast["body"] if node.type in (ASTType.FUNCTION_DECLARATION, ASTType.MAIN_DECLARATION)]
+
+
+@pytest.mark.parametrize("lean", [False, True])
+@pytest.mark.parametrize("buffered", [False, True])
+def test_lazy_parse_matches_eager(lean: bool, buffered: bool):
+    ast = parse(lean=lean, buffered=buffered, lazy=True)
+    assert all(isinstance(node.children, LazyBlock) for node in functions(ast))
+    assert ast == parse(lean=lean)
+
+
+def test_bodies_are_parsed_on_first_use():
+    add, main = functions(parse(lazy=True, lean=True))
+    assert not add.children.loaded and not main.children.loaded
+    assert add.value.name == "add" and [param.name for param in add.value.params] == ["a", "b"]
+    assert add.span is not None
+
+    assert [node.type for node in add.children] == [
+        ASTType.IF_STATEMENT,
+        ASTType.FUNCTION_DECLARATION,
+        ASTType.RETURN_STATEMENT,
+    ]
+    assert add.children.loaded and not main.children.loaded
+    nested = add.children[1]
+    assert isinstance(nested.children, LazyBlock) and not nested.children.loaded
+    assert nested.children[0].type == ASTType.RETURN_STATEMENT
+
+
+def test_method_bodies_are_lazy():
+    point = parse(lazy=True, lean=True)["body"][1]
+    method = point.children[-1]
+    assert method.type == ASTType.CLASS_METHOD
+    assert not method.children.loaded
+    assert method.children[0].type == ASTType.ASSIGNMENT_EXPRESSION
+
+
+def test_signature_passes_leave_bodies_unparsed():
+    ast = parse(lazy=True, lean=True)
+    assert SemanticAnalyzer(ast).index() == {
+        "add": ASTType.FUNCTION_DECLARATION,
+        "Point": ASTType.CLASS_DECLARATION,
+        "offset": ASTType.VARIABLE_DECLARATION,
+        "MAIN": ASTType.MAIN_DECLARATION,
+    }
+    assert not any(node.children.loaded for node in functions(ast))
+
+
+def test_errors_in_bodies_are_raised_on_first_use():
+    code = "fn broken() -> none:\n    let = 1\n\nfn fine() -> int32:\n    return 1\n"
+    with pytest.raises(ParserError):
+        parse(code)
+    broken, fine = parse(code, lazy=True, lean=True)["body"]
+    assert fine.children[0].type == ASTType.RETURN_STATEMENT
+    with pytest.raises(ParserError) as error:
+        len(broken.children)
+    assert error.value.line == 2
+
+
+def test_body_at_end_of_input():
+    code = "fn last() -> int32:\n    return 1"
+    assert parse(code, lazy=True) == parse(code)
+
+
+def test_pickles_as_plain_lists():
+    ast = parse(lazy=True, lean=True)
+    loaded = pickle.loads(pickle.dumps(ast))
+    assert loaded == ast
+    assert all(type(node.children) is list for node in functions(loaded))
+
+
+def test_lazy_token_iterables_are_parsed_eagerly():
+    lexer = TableLexer(filename="lazy.sl", lines=CODE.splitlines())
+    parser = Parser(lexer.iter_tokens(), lexer.constants, lexer.symbols, lazy=True)
+    assert not parser.lazy
+    assert not any(isinstance(node.children, LazyBlock) for node in functions(parser.parse()))
@@ -0,0 +1,98 @@
+from textwrap import dedent
+
+from src.lexer import Lexer
+from src.parser import ASTArena, ASTNode, ASTType, Parser
+
+LAYOUT_TYPES = {ASTType.NEWLINE, ASTType.INDENT, ASTType.DEDENT, ASTType.EOF}
+
+CODE = dedent(
+    """
+    class Point:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    fn main() -> none:
+        let total = 1 + 2 * 3
+        if total > 5:
+            print(`big {total}`)
+        else:
+            print('small')
+        let label = total > 6 ?
+            'yes'
+            : 'no'
+        for i in range(3):
+            print(i)
+    """
+)
+
+
+def parse(code: str, lean: bool) -> list[ASTNode]:
+    tokens = Lexer(filename="lean.sl", lines=code.splitlines()).tokenize()
+    return Parser(tokens, lean=lean).parse()["body"]
+
+
+def strip_layout(node: ASTNode) -> ASTNode:
+    if isinstance(node.value, ASTNode):
+        strip_layout(node.value)
+    node.children = [strip_layout(child) for child in node.children if child.type not in LAYOUT_TYPES]
+    return node
+
+
+def iter_nodes(body: list[ASTNode]):
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.children)
+        if isinstance(node.value, ASTNode):
+            stack.append(node.value)
+
+
+def test_lean_tree_is_the_concrete_tree_without_layout():
+    concrete = parse(CODE, lean=False)
+    assert any(node.type in LAYOUT_TYPES for node in iter_nodes(concrete))
+    expected = [strip_layout(node) for node in concrete if node.type not in LAYOUT_TYPES]
+    lean = parse(CODE, lean=True)
+    assert lean == expected
+    assert not any(node.type in LAYOUT_TYPES for node in iter_nodes(lean))
+
+
+def test_concrete_tree_has_no_spans():
+    assert all(node.span is None for node in iter_nodes(parse(CODE, lean=False)))
+
+
+def test_lean_nodes_record_spans():
+    for node in iter_nodes(parse(CODE, lean=True)):
+        if node.type == ASTType.NONE_LITERAL and node.value is None:
+            continue  # Implicit attribute value, with no source of its own
+        line, column, end_line, end_column = node.span
+        assert (line, column) <= (end_line, end_column)
+
+
+def test_span_positions():
+    point, main = parse(CODE, lean=True)
+    assert point.span == (2, 0, 6, 28)
+    assert [member.span for member in point.children] == [(3, 4, 3, 18), (5, 4, 6, 28)]
+    assert main.span == (8, 0, 18, 16)
+    declaration, if_statement, ternary_declaration, for_statement = main.children
+    assert declaration.span == (9, 4, 9, 25)
+    expression = declaration.children[0]
+    assert expression.span == (9, 16, 9, 25)
+    assert expression.children[1].span == (9, 20, 9, 25)
+    assert if_statement.span == (10, 4, 13, 22)
+    assert if_statement.value.span == (10, 7, 10, 16)
+    assert if_statement.children[-1].type == ASTType.ELSE_STATEMENT
+    assert if_statement.children[-1].span == (12, 4, 13, 22)
+    # Spans end on the last real token, not on the layout tokens a ternary or block consumes
+    assert ternary_declaration.span == (14, 4, 16, 12)
+    assert [child.span for child in for_statement.children] == [(17, 8, 17, 9), (17, 13, 17, 21), (18, 8, 18, 16)]
+
+
+def test_arena_keeps_spans():
+    body = parse(CODE, lean=True)
+    arena = ASTArena.from_ast(body)
+    assert arena.roots[1].span == body[1].span
+    rebuilt = arena.to_ast()
+    assert [node.span for node in iter_nodes(rebuilt)] == [node.span for node in iter_nodes(body)]
@@ -0,0 +1,87 @@
+import pickle
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import TableLexer
+from src.parser import ASTNode, ASTType, Parser, ParserError
+from src.parser.parser import _parse_chunk
+
+DECLARATIONS = dedent(
+    """
+    fn add{n}(a: int32, b: int32) -> int32:
+        return a + b * {n}
+
+    class Point{n}:
+        pub x: float64
+
+        fn move(dx: float64) -> none:
+            self.x = self.x + dx
+
+    let offset{n} = add{n}({n}, 2)
+    """
+)
+
+
+def parse(code: str, **options) -> dict:
+    lexer = TableLexer(filename="parallel.sl", lines=code.splitlines())
+    return Parser(lexer.tokenize(), lexer.constants, lexer.symbols, **options).parse()
+
+
+def source(count: int) -> str:
+    return "".join(DECLARATIONS.format(n=n) for n in range(count))
+
+
+@pytest.mark.parametrize("lean", [False, True])
+def test_parallel_parse_matches_single_process(lean: bool):
+    code = source(20)
+    expected = parse(code, lean=lean)
+    ast = parse(code, lean=lean, parallel=2, parallel_threshold=0)
+    assert ast == expected
+    nodes = [(node.const, node.symbol, node.span) for node in ast["body"]]
+    assert nodes == [(node.const, node.symbol, node.span) for node in expected["body"]]
+
+
+def test_small_inputs_are_parsed_in_process():
+    code = source(2)
+    assert parse(code, parallel=2) == parse(code)
+
+
+def test_errors_keep_their_position():
+    lines = source(20).splitlines()
+    lines[40] = "fn broken(: int32) -> int32:"
+    with pytest.raises(ParserError) as expected:
+        parse("\n".join(lines))
+    with pytest.raises(ParserError) as error:
+        parse("\n".join(lines), parallel=2, parallel_threshold=0)
+    assert (error.value.line, error.value.column) == (expected.value.line, expected.value.column) == (41, 10)
+    assert str(error.value) == str(expected.value)
+
+
+def test_statement_running_past_a_chunk_is_parsed_again():
+    lexer = TableLexer(filename="parallel.sl", lines=source(2).splitlines())
+    parser = Parser(lexer.tokenize(), lexer.constants, lexer.symbols, parallel=2)
+    kinds = bytes([token.type.code for token in parser.tokens])
+    end = next(index for index, token in enumerate(parser.tokens) if token.value == "*")
+    assert _parse_chunk("parallel.sl", parser._pack_chunk(parser.tokens, 0, end, kinds), lean=False) is None
+    assert (
+        _parse_chunk("parallel.sl", parser._pack_chunk(parser.tokens, 0, len(kinds), kinds), lean=False)
+        == parse(source(2))["body"]
+    )
+
+
+def test_multi_line_statements_match_single_process():
+    code = (
+        source(10) + "fn pick(a: bool) -> int32:\n    let q = a ?\n        1\n        : 2\n    return q\n" + source(10)
+    )
+    assert parse(code, parallel=2, parallel_threshold=0) == parse(code)
+
+
+def test_nodes_and_errors_pickle():
+    node = parse(source(1), lean=True)["body"][0]
+    copy = pickle.loads(pickle.dumps(node))
+    assert copy == node and copy.span == node.span
+    assert (copy.children[0].symbol, copy.children[0].span) == (node.children[0].symbol, node.children[0].span)
+    error = pickle.loads(pickle.dumps(ParserError("Unexpected token", "NEWLINE", "\n", 3, 7)))
+    assert (error.message, error.line, error.column) == ("Unexpected token", 3, 7)
+    assert pickle.loads(pickle.dumps(ASTNode(ASTType.IDENTIFIER, "x", symbol=4))).symbol == 4
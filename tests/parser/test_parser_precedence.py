@@ -0,0 +1,76 @@
+from typing import Any
+
+import pytest
+
+from src.lexer import Lexer, TokenKeyword, TokenOperator
+from src.parser import ASTNode, ASTType, Parser, ParserError
+from src.parser.pratt import BINDING_POWERS, INFIX_OPERATORS, NO_POWER
+
+
+def parse_expression(code: str) -> ASTNode:
+    tokens = Lexer(filename="precedence.sl", lines=[f"let v = {code}"]).tokenize()
+    declaration = Parser(tokens).parse()["body"][0]
+    return declaration.children[0]
+
+
+def shape(node: ASTNode) -> Any:
+    """Reduces an expression to nested tuples: (operator, operands...) or the leaf's value."""
+    if node.type in {ASTType.BINARY_EXPRESSION, ASTType.LOGICAL_EXPRESSION, ASTType.UNARY_EXPRESSION}:
+        return (node.value, *map(shape, node.children))
+    if node.type == ASTType.ASSIGNMENT_EXPRESSION:
+        return ("=", *map(shape, node.children))
+    if node.type == ASTType.PIPE_EXPRESSION:
+        return ("|>", *map(shape, node.children))
+    if node.type == ASTType.CALL_EXPRESSION:
+        return (node.value, [shape(child) for child in node.children])
+    return node.value
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("a + b * c", ("+", "a", ("*", "b", "c"))),
+        ("a - b - c", ("-", ("-", "a", "b"), "c")),
+        ("a ** b ** c", ("**", ("**", "a", "b"), "c")),
+        ("a // b % c * d", ("*", ("%", ("//", "a", "b"), "c"), "d")),
+        ("-a ** 2", ("**", ("-", "a"), "2")),
+        ("- - a * b", ("*", ("-", ("-", "a")), "b")),
+        ("(a + b) * c", ("*", ("+", "a", "b"), "c")),
+        ("a + b < c * d", (TokenOperator.LESS, ("+", "a", "b"), ("*", "c", "d"))),
+        ("a < b == c", (TokenOperator.EQUAL_EQUAL, (TokenOperator.LESS, "a", "b"), "c")),
+        (
+            "not a and b or c and d",
+            (TokenKeyword.OR, (TokenKeyword.AND, (TokenKeyword.NOT, "a"), "b"), (TokenKeyword.AND, "c", "d")),
+        ),
+        ("x = a or b", ("=", "x", (TokenKeyword.OR, "a", "b"))),
+        ("f(a + 1, b) * 2", ("*", ("f", [("+", "a", "1"), "b"]), "2")),
+        ("a |> f |> g(1)", ("|>", ("|>", "a", "f"), ("g", ["1"]))),
+        ("a + b |> f", ("|>", ("+", "a", "b"), "f")),
+    ],
+)
+def test_binding_powers(code: str, expected: Any):
+    assert shape(parse_expression(code)) == expected
+
+
+def test_ternary_binds_looser_than_or():
+    node = parse_expression("a or b ? c : d")
+    assert node.type == ASTType.TERNARY_EXPRESSION
+    assert shape(node.children[0]) == (TokenKeyword.OR, "a", "b")
+
+
+@pytest.mark.parametrize("code", ["a + b = 1", "f(a) = 2"])
+def test_invalid_assignment_target(code: str):
+    with pytest.raises(ParserError, match="Invalid assignment target"):
+        parse_expression(code)
+
+
+@pytest.mark.parametrize("code", ["x = y = 1", "a |> f + 1"])
+def test_expression_does_not_continue(code: str):
+    with pytest.raises(ParserError):
+        parse_expression(code)
+
+
+def test_binding_power_table_covers_operators():
+    for operator, (power, _, _) in INFIX_OPERATORS.items():
+        assert BINDING_POWERS[operator.code] == power
+    assert BINDING_POWERS[TokenOperator.ARROW.code] == NO_POWER
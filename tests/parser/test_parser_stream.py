@@ -0,0 +1,39 @@
+from textwrap import dedent
+
+import pytest
+
+from src.lexer import Lexer
+from src.parser import Parser, TokenStream
+
+CODE = dedent(
+    """
+    fn add(a: int32, b: int32) -> int32:
+        return a + b
+
+    fn main() -> none:
+        let total: int32 = add(3, 3)
+        if total > 5:
+            print(`total is {total}`)
+    """
+)
+
+
+def test_parse_token_stream_matches_list():
+    expected = Parser(Lexer(filename="stream.sl", lines=CODE.splitlines()).tokenize()).parse()
+    lexer = Lexer(filename="stream.sl")
+    assert Parser(lexer.iter_tokens(CODE.splitlines())).parse() == expected
+
+
+def test_parse_token_stream_bounded_window():
+    lines = CODE.splitlines() * 200
+    parser = Parser(Lexer(filename="window.sl").iter_tokens(lines))
+    parser.parse()
+    assert isinstance(parser.tokens, TokenStream)
+    assert len(parser.tokens._buffer) <= parser.tokens._release_every
+
+
+def test_parse_token_stream_lexing_errors_at_end():
+    parser = Parser(Lexer(filename="errors.sl").iter_tokens(["let x = 1", "let y = 2 $"]))
+    with pytest.raises(ExceptionGroup):
+        parser.parse()
+    assert len(parser.ast["body"]) > 0